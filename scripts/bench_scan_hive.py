@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+bench_scan_hive.py
+Mesure le débit (fichiers/s) du scanner Hive :
+ - "before" : l'ancien scan, une regex par catégorie sur tout le texte de chaque fichier
+ - "after"  : l'alternation unique de scan_hive.scan_text (un seul passage par fichier)
+
+Les fichiers sont lus une fois en mémoire avant la mesure, seul le scan est chronométré.
+
+Ensuite, garde-fou de non-régression sur un fichier synthétique de type *.g.dart
+(50 000 lignes par défaut) : résolution des numéros de ligne par text[:pos].count
+contre scan_hive.line_counter, puis scan_text complet qui doit tenir dans
+--budget-ms (code de sortie 1 sinon).
+
+Avant toute mesure, vérifie sur un fichier à plusieurs adapters que chaque typeId
+revient à la classe qui le déclare, et que Hive.openBox(Classe.membre) est résolu
+vers le membre static de cette classe dans un fichier importé (code de sortie 1 sinon).
+
+Usage:
+  python3 scripts/bench_scan_hive.py
+  python3 scripts/bench_scan_hive.py --root . --repeat 5
+  python3 scripts/bench_scan_hive.py --synthetic-lines 50000 --budget-ms 1000
+"""
+
+import re
+import sys
+import time
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import scan_hive  # noqa: E402
+
+# Regex de l'ancien scanner multi-passes, gardées ici uniquement comme point de comparaison
+BOX_CALL_RE = re.compile(
+    r"Hive\.(?:openBox|box|openLazyBox)\s*(?:<[^>]+>)?\s*\(\s*(['\"])([^'\"]+)\1\s*\)",
+    re.MULTILINE
+)
+BOX_CALL_VAR_RE = re.compile(
+    r"Hive\.(?:openBox|box|openLazyBox)\s*(?:<[^>]+>)?\s*\(\s*([A-Za-z_][A-Za-z0-9_]*)\s*\)",
+    re.MULTILINE
+)
+CONST_STR_RE = re.compile(
+    r"(?:const|final)\s+String\s+([A-Za-z_][A-Za-z0-9_]*)\s*=\s*['\"]([^'\"]+)['\"]",
+    re.MULTILINE
+)
+REGISTER_ADAPTER_RE = re.compile(
+    r"Hive\.registerAdapter\s*\(\s*([A-Za-z_][A-Za-z0-9_]*)\s*\(",
+    re.MULTILINE
+)
+CLASS_ADAPTER_RE = re.compile(
+    r"class\s+([A-Za-z_][A-Za-z0-9_]*)\s+extends\s+TypeAdapter(?:<([^>]+)>)?",
+    re.MULTILINE
+)
+TYPEID_PATTERNS = [
+    re.compile(r"@override\s+final\s+int\s+typeId\s*=\s*(\d+)\s*;", re.MULTILINE),
+    re.compile(r"@override\s+int\s+get\s+typeId\s*=>\s*(\d+)\s*;", re.MULTILINE),
+    re.compile(r"final\s+int\s+typeId\s*=\s*(\d+)\s*;", re.MULTILINE),
+    re.compile(r"int\s+get\s+typeId\s*=>\s*(\d+)\s*;", re.MULTILINE),
+]
+HIVETYPE_RE = re.compile(
+    r"@HiveType\s*\(\s*typeId\s*:\s*(\d+)\s*\)\s*(?:class|abstract\s+class)\s+([A-Za-z_][A-Za-z0-9_]*)",
+    re.MULTILINE
+)
+
+def legacy_find_line_of_pos(text, pos):
+    return text[:pos].count("\n") + 1
+
+def legacy_scan_text(text):
+    """Ancien scan : chaque regex reparcourt le texte complet."""
+    hits = 0
+    for m in BOX_CALL_RE.finditer(text):
+        legacy_find_line_of_pos(text, m.start())
+        hits += 1
+    for m in BOX_CALL_VAR_RE.finditer(text):
+        legacy_find_line_of_pos(text, m.start())
+        hits += 1
+    for m in CONST_STR_RE.finditer(text):
+        legacy_find_line_of_pos(text, m.start())
+        hits += 1
+    for m in REGISTER_ADAPTER_RE.finditer(text):
+        legacy_find_line_of_pos(text, m.start())
+        hits += 1
+    for m in CLASS_ADAPTER_RE.finditer(text):
+        legacy_find_line_of_pos(text, m.start())
+        snippet_region = text[m.start():m.start()+8000]
+        for pat in TYPEID_PATTERNS:
+            if pat.search(snippet_region):
+                break
+        hits += 1
+    for m in HIVETYPE_RE.finditer(text):
+        legacy_find_line_of_pos(text, m.start())
+        hits += 1
+    return hits
+
+def synthetic_adapters_file(n_lines):
+    """Fichier Dart généré façon *.g.dart : un TypeAdapter + registerAdapter tous les 10 lignes."""
+    block = (
+        "class Model{i}Adapter extends TypeAdapter<Model{i}> {{\n"
+        "  @override\n"
+        "  final int typeId = {i};\n"
+        "  @override\n"
+        "  Model{i} read(BinaryReader reader) => Model{i}(reader.readString());\n"
+        "  @override\n"
+        "  void write(BinaryWriter writer, Model{i} obj) => writer.writeString(obj.id);\n"
+        "}}\n"
+        "void register{i}() => Hive.registerAdapter(Model{i}Adapter());\n"
+        "const String kBox{i} = 'box_{i}';\n"
+    )
+    return "".join(block.format(i=i) for i in range(n_lines // 10))
+
+# Plusieurs adapters dans un même fichier : typeId absent, accolades dans des chaînes
+# et commentaires, classe voisine portant un typeId, typeId en commentaire.
+MULTI_ADAPTERS_FILE = """
+class AlphaAdapter extends TypeAdapter<Alpha> {
+  @override
+  final int typeId = 1;
+  String get label => '}}} not the end';
+  // } pas la fin non plus
+}
+
+class BetaAdapter extends TypeAdapter<Beta> {
+  @override
+  Beta read(BinaryReader reader) => Beta();
+}
+
+class NotAnAdapter {
+  final int typeId = 99;
+}
+
+class GammaAdapter extends TypeAdapter<Gamma> {
+  void helper() { if (true) { print("{"); } }
+  @override
+  int get typeId => 3;
+}
+
+class DeltaAdapter extends TypeAdapter<Delta> {
+  /* final int typeId = 98; */
+  @override
+  final int typeId = 4;
+}
+"""
+MULTI_ADAPTERS_EXPECTED = {"AlphaAdapter": 1, "BetaAdapter": None, "GammaAdapter": 3, "DeltaAdapter": 4}
+
+def check_multi_adapters():
+    found = scan_hive.scan_text(MULTI_ADAPTERS_FILE, "multi_adapters.dart")
+    got = {a["name"]: a["typeId"] for a in found["adapters"]}
+    if got != MULTI_ADAPTERS_EXPECTED:
+        print(f"ERREUR typeId : attendu {MULTI_ADAPTERS_EXPECTED}, obtenu {got}")
+        return False
+    print(f"typeId de {len(got)} adapters dans un même fichier : OK")
+    return True
+
+# Membres static homonymes dans deux classes et une constante de premier niveau :
+# Classe.membre ne doit retenir que le membre de sa classe.
+BOX_CONSTANTS_FILES = {
+    "lib/boxes.dart": """
+const String plants = 'legacy_plants';
+
+class Boxes {
+  static const String plants = 'plants_box';
+  // static const String gardens = 'commented_out';
+  static const String gardens = 'gardens_box';
+}
+
+class OtherBoxes {
+  static final String plants = 'other_plants_box';
+}
+""",
+    "lib/main.dart": """
+import 'boxes.dart';
+
+Future<void> openBoxes() async {
+  await Hive.openBox<Plant>(Boxes.plants);
+  await Hive.openBox(Boxes.gardens);
+  Hive.box(OtherBoxes.plants);
+  Hive.box(plants);
+}
+""",
+}
+BOX_CONSTANTS_EXPECTED = {
+    "Boxes.plants": "plants_box",
+    "Boxes.gardens": "gardens_box",
+    "OtherBoxes.plants": "other_plants_box",
+    "plants": "legacy_plants",
+}
+
+def check_box_constants():
+    partials = [scan_hive.scan_text(text, name) for name, text in BOX_CONSTANTS_FILES.items()]
+    report = scan_hive.merge_results(partials)
+    got = {var: occ[0]["value"] for var, occ in report["box_vars"].items()}
+    if got != BOX_CONSTANTS_EXPECTED:
+        print(f"ERREUR Classe.membre : attendu {BOX_CONSTANTS_EXPECTED}, obtenu {got}")
+        return False
+    print(f"{len(got)} boxes passées par constante (dont Classe.membre) : OK")
+    return True
+
+def bench_synthetic(n_lines, budget_ms):
+    text = synthetic_adapters_file(n_lines)
+    positions = [m.start() for m in scan_hive.HIVE_TOKENS_RE.finditer(text)]
+    print(f"\nFichier synthétique : {text.count(chr(10))} lignes, {len(positions)} tokens")
+
+    t0 = time.perf_counter()
+    before = [legacy_find_line_of_pos(text, pos) for pos in positions]
+    before_ms = (time.perf_counter() - t0) * 1000
+
+    t0 = time.perf_counter()
+    line_of = scan_hive.line_counter(text)
+    after = [line_of(pos) for pos in positions]
+    after_ms = (time.perf_counter() - t0) * 1000
+
+    assert before == after, "les deux résolutions de ligne divergent"
+    found = scan_hive.scan_text(text, "synthetic.g.dart")
+    assert all(a["typeId"] == int(a["name"][5:-7]) for a in found["adapters"]), "typeId mal attribué"
+    print(f"lignes   text[:pos].count {before_ms:9.1f} ms   line_counter {after_ms:7.1f} ms")
+
+    t0 = time.perf_counter()
+    scan_hive.scan_text(text, "synthetic.g.dart")
+    scan_ms = (time.perf_counter() - t0) * 1000
+    print(f"scan_text complet {scan_ms:9.1f} ms (budget {budget_ms} ms)")
+    return scan_ms <= budget_ms
+
+def time_scan(label, texts, scan, repeat):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for name, text in texts:
+            scan(text, name)
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    rate = len(texts) / best if best else float("inf")
+    print(f"{label:<8} {best*1000:9.1f} ms   {rate:10.0f} fichiers/s")
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark of the Hive scanner (files/sec)")
+    parser.add_argument("--root", "-r", default=".", help="Root of repository (default current dir)")
+    parser.add_argument("--repeat", "-n", type=int, default=5, help="Number of runs, best one is kept")
+    parser.add_argument("--synthetic-lines", type=int, default=50000, help="Size of the synthetic generated file")
+    parser.add_argument("--budget-ms", type=float, default=1000, help="Max time for scan_text on the synthetic file")
+    args = parser.parse_args()
+
+    if not (check_multi_adapters() and check_box_constants()):
+        sys.exit(1)
+
+    root = Path(args.root).resolve()
+    texts = [(str(f), scan_hive.read_dart_file(f)) for f in root.rglob("*.dart")]
+    total_bytes = sum(len(t) for _, t in texts)
+    print(f"{len(texts)} fichiers Dart, {total_bytes / 1024:.0f} Ko, meilleur de {args.repeat} passages")
+
+    before = time_scan("before", texts, lambda text, name: legacy_scan_text(text), args.repeat)
+    after = time_scan("after", texts, scan_hive.scan_text, args.repeat)
+    print(f"Gain : x{before / after:.2f}")
+
+    if not bench_synthetic(args.synthetic_lines, args.budget_ms):
+        print("REGRESSION : scan_text dépasse le budget sur le fichier synthétique.")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+bench_zone_calendar.py
+Mesure les recherches (zone, plante, phase) -> mois sur toutes les zones x toutes les plantes :
+ - "resolve" : calcul à la demande à partir de plants.json (surcharge zoneProfiles,
+   sinon referenceProfile décalé du monthShift), comme chaque consommateur le faisait
+ - "lookup"  : lecture d'une case de la matrice précalculée (zone_calendar.bin)
+ - "month"   : toutes les plantes d'une (zone, phase) pour un mois, une tranche de la matrice
+
+Avant toute mesure, vérifie que la matrice lue depuis le fichier donne exactement les
+mois du calcul à la demande pour chaque case (code de sortie 1 sinon).
+
+Usage:
+  python3 scripts/bench_zone_calendar.py
+  python3 scripts/bench_zone_calendar.py --repeat 10
+"""
+
+import sys
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import zone_calendar  # noqa: E402
+from month_masks import (np, PHASES, ZONES_JSON, reference_masks, zone_overrides,  # noqa: E402
+                         rotate_mask, load_zone_shifts)
+from plant_catalog import DEFAULT_PLANTS, load_catalog  # noqa: E402
+
+def resolve(plant, zone_id, phase, shift):
+    """Calcul à la demande d'une case, sans la table : ce que la matrice remplace."""
+    override = zone_overrides(plant).get(zone_id, {})
+    if phase in override:
+        return override[phase]
+    return rotate_mask(reference_masks(plant)[PHASES.index(phase)], shift)
+
+def check_matrix(cal, plants, shifts):
+    mismatches = 0
+    for zone_id, shift in shifts.items():
+        for plant in plants:
+            for phase in PHASES:
+                if zone_calendar.lookup(cal, zone_id, plant["id"], phase) != resolve(plant, zone_id, phase, shift):
+                    mismatches += 1
+    cells = len(shifts) * len(plants) * len(PHASES)
+    if mismatches:
+        print(f"ERREUR : {mismatches}/{cells} cases de la matrice diffèrent du calcul à la demande")
+        return False
+    print(f"{cells} cases ({len(shifts)} zones x {len(plants)} plantes x {len(PHASES)} phases) : OK")
+    return True
+
+def best_of(label, fn, repeat, ops):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    rate = ops / best if best else float("inf")
+    print(f"{label:<8} {best*1000:9.2f} ms   {rate:12.0f} recherches/s")
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark of zone calendar lookups (all zones x all plants)")
+    parser.add_argument("--plants", "-p", default=str(DEFAULT_PLANTS), help="Path to plants.json")
+    parser.add_argument("--zones", default=str(ZONES_JSON), help="Path to zones.json")
+    parser.add_argument("--repeat", "-n", type=int, default=5, help="Number of runs, best one is kept")
+    args = parser.parse_args()
+
+    plants = load_catalog(args.plants)["plants"]
+    shifts = load_zone_shifts(args.zones)
+    with tempfile.TemporaryDirectory() as tmp:
+        out = Path(tmp) / "zone_calendar.bin"
+        zone_calendar.build_calendar(args.plants, args.zones, out, force=True)
+        t0 = time.perf_counter()
+        cal = zone_calendar.read_calendar(out)
+        load_ms = (time.perf_counter() - t0) * 1000
+        size = out.stat().st_size
+
+    if not check_matrix(cal, plants, shifts):
+        sys.exit(1)
+    backend = "NumPy" if np is not None else "array('H')"
+    print(f"matrice {size / 1024:.1f} Ko, lecture + sha256 {load_ms:.2f} ms ({backend}), "
+          f"meilleur de {args.repeat} passages")
+
+    cells = [(z, s, p, ph) for z, s in shifts.items() for p in plants for ph in PHASES]
+    before = best_of("resolve", lambda: [resolve(p, z, ph, s) for z, s, p, ph in cells], args.repeat, len(cells))
+    keys = [(z, p["id"], ph) for z, _, p, ph in cells]
+    after = best_of("lookup", lambda: [zone_calendar.lookup(cal, z, pid, ph) for z, pid, ph in keys],
+                    args.repeat, len(cells))
+    print(f"Gain : x{before / after:.2f}")
+
+    months = [(z, ph, m) for z in shifts for ph in PHASES for m in range(1, 13)]
+    best_of("month", lambda: [zone_calendar.plants_in_month(cal, z, ph, m) for z, ph, m in months],
+            args.repeat, len(months))
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,11 @@
 
-import json
+from plant_catalog import load_catalog
 
 ids = ["lentil", "climbing_bean", "gobo", "beetroot"]
-with open('assets/data/plants.json', 'r', encoding='utf-8') as f:
-    data = json.load(f)
-    for p in data['plants']:
-        if p['id'] in ids:
-            print(f"ID: {p['id']}")
-            print(f"  Sowing: {p.get('sowingMonths3')}")
-            print(f"  Planting: {p.get('plantingMonths3')}")
+catalog = load_catalog()
+for pid in ids:
+    p = catalog['by_id'].get(pid)
+    if p:
+        print(f"ID: {p['id']}")
+        print(f"  Sowing: {p.get('sowingMonths3')}")
+        print(f"  Planting: {p.get('plantingMonths3')}")
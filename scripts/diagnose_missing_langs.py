@@ -2,22 +2,15 @@
 import json
 import os
 
+from plant_catalog import load_catalog
+
 def find_ids_and_data():
     base_dir = r"c:\Users\roman\Documents\apppklod\permacalendarv2\assets\data"
     
     # 1. Load Reference Data (Source of Truth)
     # Try plants.json first
     ref_file = os.path.join(base_dir, "plants.json")
-    ref_data = {}
-    with open(ref_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-        if "plants" in data and isinstance(data["plants"], list):
-            for p in data["plants"]:
-                ref_data[p['id']] = {
-                    "sowing": p.get("sowingMonths3"),
-                    "planting": p.get("plantingMonths3"),
-                    "commonName_en": p.get("commonName") # usually english or mixed
-                }
+    ref_data = load_catalog(ref_file)['by_id']
 
     print(f"Reference data loaded: {len(ref_data)} plants.")
 
@@ -63,7 +56,7 @@ def find_ids_and_data():
                     print(f"  Found '{desired}' -> ID: '{pid}', commonName: '{cn}'")
                     # Check what we have in Ref for this ID
                     if pid in ref_data:
-                        print(f"    Ref Data ({pid}): Sowing={ref_data[pid]['sowing']}, Planting={ref_data[pid]['planting']}")
+                        print(f"    Ref Data ({pid}): Sowing={ref_data[pid].get('sowingMonths3')}, Planting={ref_data[pid].get('plantingMonths3')}")
                     else:
                         print(f"    WARNING: ID '{pid}' not found in Reference plants.json")
                     found = True
@@ -1,5 +1,5 @@
 
-import json
+from plant_catalog import load_catalog, normalize_name
 
 target_names = [
     "Brocoli", "Chou-fleur", "Chou de Bruxelles", "Chou cabus rouge",
@@ -9,27 +9,21 @@ target_names = [
     "Artichaut", "Thym", "Romarin", "Aneth", "Coriandre", "Roquette"
 ]
 
-# Normalize for fuzzy search
-def normalize(s):
-    return s.lower().replace("é", "e").replace("è", "e").replace("à", "a").replace("-", " ").replace("(", "").replace(")", "").replace("/", " ")
-
 try:
-    with open('assets/data/plants.json', 'r', encoding='utf-8') as f:
-        data = json.load(f)
-        
+    catalog = load_catalog()
+
     found_map = {}
-    for p in data['plants']:
-        cn = p.get('commonName', '')
-        # Direct match check or partial
-        for t in target_names:
-            if t == cn:
-                found_map[t] = p['id']
-            elif t in cn or cn in t:
-                # Store potential match
-                if t not in found_map:
-                    found_map[t] = []
-                if isinstance(found_map[t], list):
-                    found_map[t].append((p['id'], cn))
+    for t in target_names:
+        # Exact match through the normalized name index
+        pid = catalog['by_name'].get(normalize_name(t))
+        if pid is not None:
+            found_map[t] = pid
+            continue
+        # Partial match: store potential matches
+        candidates = [(p['id'], p.get('commonName', '')) for p in catalog['plants']
+                      if t in p.get('commonName', '') or p.get('commonName', '') in t]
+        if candidates:
+            found_map[t] = candidates
 
     for t, content in found_map.items():
         print(f"Target: '{t}' -> {content}")
@@ -1,8 +1,11 @@
 
-import json
 import os
 import re
 
+from plant_catalog import REPO_ROOT, load_catalog, find_plant_id
+from month_masks import range_mask, mask_to_months
+from json_patch import load_indexed, patch_file
+
 # ---------------------------------------------------------
 # 1. DATA DEFINITIONS
 # ---------------------------------------------------------
@@ -12,6 +15,8 @@ MONTH_MAP = {
     "jan": "Jan", "fév": "Feb", "mar": "Mar", "avr": "Apr", "mai": "May", "jun": "Jun",
     "jul": "Jul", "aoû": "Aug", "sep": "Sep", "oct": "Oct", "nov": "Nov", "déc": "Dec"
 }
+# Month index (0 = jan) of each French abbreviation, i.e. its bit in a month mask
+FR_MONTH_INDEX = {fr: i for i, fr in enumerate(MONTH_MAP)}
 
 # User provided data
 # Fields: name, semis (sowing), plantation (planting)
@@ -65,8 +70,7 @@ def parse_month_range(range_str):
     if not range_str or range_str == "—" or range_str.strip() == "":
         return []
     
-    months_ordered = ["jan", "fév", "mar", "avr", "mai", "jun", "jul", "aoû", "sep", "oct", "nov", "déc"]
-    result = set()
+    mask = 0
     
     parts = range_str.split(',')
     for part in parts:
@@ -77,64 +81,34 @@ def parse_month_range(range_str):
             start, end = part.split('-')
         else:
             # Single month
-            if part in MONTH_MAP:
-                result.add(MONTH_MAP[part])
+            if part in FR_MONTH_INDEX:
+                mask |= 1 << FR_MONTH_INDEX[part]
             continue
         
         start = start.strip()
         end = end.strip()
         
-        if start in months_ordered and end in months_ordered:
-            s_idx = months_ordered.index(start)
-            e_idx = months_ordered.index(end)
-            
-            if e_idx >= s_idx:
-                # Normal range
-                for i in range(s_idx, e_idx + 1):
-                    result.add(MONTH_MAP[months_ordered[i]])
-            else:
-                # Wrap-around (e.g. nov-feb)
-                for i in range(s_idx, 12):
-                    result.add(MONTH_MAP[months_ordered[i]])
-                for i in range(0, e_idx + 1):
-                    result.add(MONTH_MAP[months_ordered[i]])
+        if start in FR_MONTH_INDEX and end in FR_MONTH_INDEX:
+            # range_mask handles wrap-around ranges (e.g. nov-fév)
+            mask |= range_mask(FR_MONTH_INDEX[start], FR_MONTH_INDEX[end])
                     
-    # Sort logically jan -> dec
-    final_list = []
-    eng_months_ordered = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
-    for m in eng_months_ordered:
-        if m in result:
-            final_list.append(m)
-            
-    return final_list
+    # Bits come back in calendar order, jan -> dec
+    return mask_to_months(mask)
 
-def get_plant_id(user_name, plants_data):
+def get_plant_id(user_name, catalog):
     """
-    Finds the plant ID based on user_name matching commonName.
+    Finds the plant ID based on user_name matching commonName
+    (normalized exact match first, then contains match).
     """
     target_name = NAME_OVERRIDES.get(user_name, user_name)
-    
-    # 1. Exact match on commonName
-    for p in plants_data:
-        if p.get('commonName', '').lower() == target_name.lower():
-            return p['id']
-            
-    # 2. Fuzzy / Contains math
-    for p in plants_data:
-        if target_name.lower() in p.get('commonName', '').lower():
-             # Avoid false positives (e.g. 'Chou' matches everything)
-             # But 'Chou kale' -> 'Chou kale' ok.
-             # 'Courge' -> 'Courge' ok.
-             return p['id']
-             
-    return None
+    return find_plant_id(catalog, target_name)
 
 # ---------------------------------------------------------
 # 3. MAIN SCRIPT
 # ---------------------------------------------------------
 
 def main():
-    base_dir = r"c:\Users\roman\Documents\apppklod\permacalendarv2"
+    base_dir = str(REPO_ROOT)
     # Files to update: main plants.json AND all localized chunks if they exist
     files_to_update = [
         os.path.join(base_dir, "assets", "data", "plants.json"),
@@ -149,16 +123,14 @@ def main():
     
     # Load Main Data to get ID mapping
     main_file = files_to_update[0]
-    with open(main_file, 'r', encoding='utf-8') as f:
-        main_json = json.load(f)
-        main_plants = main_json['plants']
+    catalog = load_catalog(main_file)
         
     # Pre-calculate updates for each ID
     id_updates = {} # id -> {sowing: [], planting: []}
     
     print("--- Mapping Plants ---")
     for entry in RAW_DATA:
-        pid = get_plant_id(entry['name'], main_plants)
+        pid = get_plant_id(entry['name'], catalog)
         if pid:
             sowing = parse_month_range(entry['semis'])
             planting = parse_month_range(entry['plantation'])
@@ -175,8 +147,8 @@ def main():
             
         print(f"Updating {fp}...")
         try:
-            with open(fp, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            # Indexed load: only the plants changed below are rewritten on save
+            data, index = load_indexed(fp)
             
             modified = False
             
@@ -227,10 +199,9 @@ def main():
                             p['plantingMonths3'] = updates['plantingMonths3']
                             modified = True
 
-            if modified:
-                with open(fp, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, indent=2, ensure_ascii=False)
-                print("Saved.")
+            rewritten, written = patch_file(fp, data, index) if modified else (0, 0)
+            if rewritten:
+                print(f"Saved ({rewritten} plant(s) rewritten, {written} bytes written).")
             else:
                 print("No changes needed.")
                 
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+json_patch.py
+Réécriture ciblée des catalogues JSON : seules les plantes modifiées sont
+re-sérialisées, le reste du fichier garde ses octets d'origine.
+
+ - load_indexed(path) : document + index des plages (début, fin) de chaque plante,
+   pour {"plants": [...]}, une liste [...] ou un dictionnaire {id: {...}} (i18n)
+ - patch_file(path, doc, index) : compare chaque plante (et chaque autre valeur de
+   premier niveau : schema_version, metadata...) à sa version d'origine et remplace
+   uniquement les plages modifiées, dans le style du fichier (indentation 2 ou 4,
+   fins de ligne, échappement ASCII)
+
+Si les remplacements ont la même taille, ils sont écrits en place ; sinon le fichier
+patché est écrit dans un fichier temporaire du même dossier puis mis en place par
+os.replace, pour qu'une interruption ne laisse jamais un fichier à moitié écrit.
+Dans ce second cas, les octets qui précèdent la première valeur modifiée sont
+recopiés tels quels depuis le fichier d'origine, par blocs ; seule la suite est
+ré-encodée. La copie reste proportionnelle à la taille du fichier : seuls les patchs
+de même taille évitent de réécrire le fichier entier.
+Si la structure a changé (plante ajoutée, supprimée ou déplacée, clé de premier niveau
+ajoutée, supprimée ou déplacée), tout le document est réécrit de façon atomique,
+toujours dans le style détecté.
+
+Usage (depuis un autre script de scripts/) :
+  from json_patch import load_indexed, patch_file
+  data, index = load_indexed(fp)
+  ...  # modifier data en place
+  patch_file(fp, data, index)
+"""
+
+import os
+import json
+import codecs
+
+WHITESPACE = " \t\r\n"
+COPY_BLOCK = 1 << 20
+
+
+def skip_ws(text, pos):
+    while pos < len(text) and text[pos] in WHITESPACE:
+        pos += 1
+    return pos
+
+def expect(text, pos, char):
+    pos = skip_ws(text, pos)
+    if not text.startswith(char, pos):
+        raise json.JSONDecodeError(f"Expecting {char!r}", text, pos)
+    return pos + 1
+
+def scan_array(text, pos, decoder, spans):
+    """Décode le tableau ouvert à pos ; note la plage de chaque élément. Renvoie (liste, fin)."""
+    items = []
+    pos = skip_ws(text, pos + 1)
+    if text.startswith("]", pos):
+        return items, pos + 1
+    while True:
+        start = skip_ws(text, pos)
+        item, pos = decoder.raw_decode(text, start)
+        spans.append((start, pos))
+        items.append(item)
+        pos = skip_ws(text, pos)
+        if text.startswith("]", pos):
+            return items, pos + 1
+        pos = expect(text, pos, ",")
+
+def scan_document(text):
+    """(document, forme, plages des plantes, plages des autres clés de premier niveau)."""
+    decoder = json.JSONDecoder()
+    spans = []
+    others = {}
+    pos = skip_ws(text, 0)
+    if text.startswith("[", pos):
+        doc, pos = scan_array(text, pos, decoder, spans)
+        kind = "list"
+    else:
+        pos = expect(text, pos, "{")
+        doc = {}
+        kind = "dict"
+        pos = skip_ws(text, pos)
+        if text.startswith("}", pos):
+            pos += 1
+        else:
+            entries = []
+            while True:
+                key, pos = decoder.raw_decode(text, skip_ws(text, pos))
+                start = skip_ws(text, expect(text, pos, ":"))
+                if key == "plants" and text.startswith("[", start):
+                    doc[key], pos = scan_array(text, start, decoder, spans)
+                    kind = "plants"
+                else:
+                    doc[key], pos = decoder.raw_decode(text, start)
+                    entries.append((key, start, pos))
+                pos = skip_ws(text, pos)
+                if text.startswith("}", pos):
+                    pos += 1
+                    break
+                pos = expect(text, pos, ",")
+            if kind == "dict":
+                # dictionnaire {id: {...}} : chaque valeur est une plante
+                spans = [(start, end) for _, start, end in entries]
+            else:
+                others = {key: (start, end) for key, start, end in entries}
+    if skip_ws(text, pos) != len(text):
+        raise json.JSONDecodeError("Extra data", text, pos)
+    return doc, kind, spans, others
+
+def detect_style(text):
+    """Indentation (None si compact), fin de ligne et ensure_ascii du fichier."""
+    newline = "\r\n" if "\r\n" in text else "\n"
+    first_break = text.find("\n")
+    indent = None
+    if first_break != -1:
+        line = text[first_break + 1:]
+        indent = line[:len(line) - len(line.lstrip(" \t"))] or None
+    ensure_ascii = text.isascii() and "\\u" in text
+    return {"indent": indent, "newline": newline, "ensure_ascii": ensure_ascii}
+
+def dumps(obj, style):
+    text = json.dumps(obj, indent=style["indent"], ensure_ascii=style["ensure_ascii"])
+    return text.replace("\n", style["newline"]) if style["newline"] != "\n" else text
+
+def entries_of(doc, kind):
+    if kind == "plants":
+        return doc.get("plants") if isinstance(doc, dict) else None
+    if kind == "list":
+        return doc if isinstance(doc, list) else None
+    return list(doc.values()) if isinstance(doc, dict) else None
+
+def load_indexed(path):
+    """Charge un catalogue et l'indexe pour patch_file. Renvoie (document, index)."""
+    with open(path, "rb") as f:
+        raw = f.read()
+    bom = codecs.BOM_UTF8 if raw.startswith(codecs.BOM_UTF8) else b""
+    text = raw[len(bom):].decode("utf-8")
+    doc, kind, spans, others = scan_document(text)
+    style = detect_style(text)
+    # versions d'origine, copiées par la sérialisation : le document peut être modifié en place
+    original = [dumps(e, style) for e in entries_of(doc, kind)]
+    st = os.stat(path)
+    index = {
+        "text": text,
+        "bom": bom,
+        "kind": kind,
+        "spans": spans,
+        "original": original,
+        "keys": list(doc) if isinstance(doc, dict) else None,
+        "others": {k: (span, dumps(doc[k], style)) for k, span in others.items()},
+        "style": style,
+        "stamp": (st.st_mtime_ns, st.st_size),
+    }
+    return doc, index
+
+def line_prefix(text, pos):
+    """Indentation de la ligne où commence pos (la plante peut suivre sa clé : "id": {)."""
+    line_start = text.rfind("\n", 0, pos) + 1
+    line = text[line_start:pos]
+    return line[:len(line) - len(line.lstrip(" \t"))]
+
+def same_structure(doc, index):
+    entries = entries_of(doc, index["kind"])
+    if entries is None or len(entries) != len(index["original"]):
+        return False
+    return index["kind"] == "list" or list(doc) == index["keys"]
+
+def write_atomic(path, data, head=0):
+    """
+    Remplace path par ses head premiers octets suivis de data, via un fichier
+    temporaire et os.replace. La tête est recopiée par blocs, sans être décodée.
+    """
+    tmp_path = str(path) + ".tmp"
+    with open(tmp_path, "wb") as f:
+        if head:
+            with open(path, "rb") as src:
+                remaining = head
+                while remaining:
+                    block = src.read(min(COPY_BLOCK, remaining))
+                    if not block:
+                        raise RuntimeError(f"{path} is shorter than {head} bytes")
+                    f.write(block)
+                    remaining -= len(block)
+        f.write(data)
+    os.replace(tmp_path, path)
+
+def patch_file(path, doc, index):
+    """
+    Écrit doc dans path en ne remplaçant que les valeurs modifiées depuis load_indexed.
+    Renvoie (valeurs réécrites, octets écrits) ; (0, 0) si rien n'a changé. La tête
+    recopiée telle quelle d'un patch de taille différente n'est pas comptée.
+    """
+    st = os.stat(path)
+    if (st.st_mtime_ns, st.st_size) != index["stamp"]:
+        raise RuntimeError(f"{path} changed on disk since it was indexed")
+    text, style = index["text"], index["style"]
+
+    if not same_structure(doc, index):
+        out = dumps(doc, style)
+        trailing = text[len(text.rstrip(WHITESPACE)):]
+        data = index["bom"] + (out + trailing).encode("utf-8")
+        write_atomic(path, data)
+        return len(entries_of(doc, index["kind"]) or []), len(data)
+
+    candidates = list(zip(index["spans"], index["original"], entries_of(doc, index["kind"])))
+    candidates += [(span, old, doc[key]) for key, (span, old) in index["others"].items()]
+    patches = []
+    for (start, end), old, value in candidates:
+        new = dumps(value, style)
+        if new != old:
+            prefix = line_prefix(text, start)
+            if prefix:
+                new = new.replace(style["newline"], style["newline"] + prefix)
+            patches.append((start, end, new))
+    if not patches:
+        return 0, 0
+    patches.sort()
+
+    pieces = [(text[start:end].encode("utf-8"), new.encode("utf-8")) for start, end, new in patches]
+    if all(len(old) == len(new) for old, new in pieces):
+        offset = len(index["bom"])
+        written = 0
+        pos = 0
+        with open(path, "r+b") as f:
+            for (start, _, _), (_, new) in zip(patches, pieces):
+                offset += len(text[pos:start].encode("utf-8"))
+                pos = start
+                f.seek(offset)
+                f.write(new)
+                written += len(new)
+        return len(patches), written
+
+    # les longueurs changent : tout ce qui suit la première valeur modifiée se décale ;
+    # le fichier temporaire reprend les octets d'avant, seule la suite est ré-encodée
+    first = patches[0][0]
+    head = len(index["bom"]) + len(text[:first].encode("utf-8"))
+    out = []
+    pos = first
+    for start, end, new in patches:
+        out.append(text[pos:start])
+        out.append(new)
+        pos = end
+    out.append(text[pos:])
+    data = "".join(out).encode("utf-8")
+    write_atomic(path, data, head)
+    return len(patches), len(data)
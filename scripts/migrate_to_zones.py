@@ -1,14 +1,4 @@
 
-import json
-import os
-import shutil
-from collections import OrderedDict
-
-# Configuration
-BASE_DIR = r"c:\Users\roman\Documents\apppklod\permacalendarv2"
-PLANTS_JSON = os.path.join(BASE_DIR, 'assets', 'data', 'plants.json')
-ZONES_JSON = os.path.join(BASE_DIR, 'assets', 'data', 'zones.json')
-
 # New logic: 
 # Move specific month fields to referenceProfile
 # Create zoneProfiles structure
@@ -78,32 +68,12 @@ def migrate_plant(plant):
     return plant, True
 
 def main():
-    print(f"Reading {PLANTS_JSON}...")
-    with open(PLANTS_JSON, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-
-    plants = data.get('plants', [])
-    migrated_count = 0
-    
-    for p in plants:
-        _, changed = migrate_plant(p)
-        if changed:
-            migrated_count += 1
-
+    # The migration is now one step of the versioned runner, which covers plants.json
+    # and every locale file, records applied steps and only rewrites changed files.
+    from migrations import run_migrations
+    report = run_migrations()
+    migrated_count = sum(changes.get('zone_profiles', 0) for changes in report.values())
     print(f"Migrated {migrated_count} plants.")
 
-    # Save
-    if migrated_count > 0:
-        # Backup first
-        backup_path = PLANTS_JSON + ".bak"
-        shutil.copy(PLANTS_JSON, backup_path)
-        print(f"Backup created at {backup_path}")
-        
-        with open(PLANTS_JSON, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-        print("File updated successfully.")
-    else:
-        print("No changes needed.")
-
 if __name__ == '__main__':
     main()
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+migrations.py
+Exécuteur de migrations des catalogues de plantes : plants.json et tous les fichiers
+de langue (json_multilangue_doc/plants_*.json, i18n/plants_*.json) en un seul passage.
+
+Chaque migration est une étape versionnée de MIGRATIONS, appliquée dans l'ordre de
+leur schema_version :
+ - une étape n'est appliquée qu'une fois par fichier : les étapes faites sont notées
+   dans .dart_tool/migrations/ledger.json (avec le sha256 du fichier obtenu), et un
+   fichier dont le schema_version est plus récent que celui de l'étape la saute ;
+ - un fichier dont le sha256 correspond au registre et sans étape en attente n'est
+   même pas relu ;
+ - un fichier n'est réécrit que si une étape l'a réellement modifié, par
+   json_patch.patch_file : seules les plantes modifiées et le schema_version sont
+   re-sérialisés, dans l'indentation du fichier, après sauvegarde de la version
+   précédente dans le magasin de tool/backup_store.py.
+
+Une étape est un dict {"id", "version", "description", "apply"} où apply(doc) modifie
+le document en place et renvoie le nombre de plantes modifiées.
+
+Usage:
+  python3 scripts/migrations.py              # applique les étapes en attente
+  python3 scripts/migrations.py --dry-run    # indique ce qui serait modifié, sans écrire
+  python3 scripts/migrations.py --status     # étapes appliquées par fichier
+"""
+
+import os
+import sys
+import json
+import hashlib
+import argparse
+from pathlib import Path
+
+from plant_catalog import REPO_ROOT
+from migrate_to_zones import migrate_plant
+from json_patch import load_indexed, patch_file
+
+sys.path.insert(0, str(REPO_ROOT / "tool"))
+from backup_store import snapshot  # noqa: E402
+
+DATA_DIR = REPO_ROOT / "assets" / "data"
+LEDGER_PATH = REPO_ROOT / ".dart_tool" / "migrations" / "ledger.json"
+
+# Catalogues migrés (motifs relatifs à DATA_DIR)
+CATALOG_PATTERNS = ["plants.json", "json_multilangue_doc/plants_*.json", "i18n/plants_*.json"]
+
+
+def plant_list(doc):
+    """Liste des plantes d'un catalogue ({'plants': [...]}), None pour les autres formes."""
+    if isinstance(doc, dict) and isinstance(doc.get("plants"), list):
+        return doc["plants"]
+    return None
+
+def apply_zone_profiles(doc):
+    """referenceProfile + zoneProfiles pour chaque plante (migrate_to_zones.migrate_plant)."""
+    return sum(1 for p in plant_list(doc) or [] if migrate_plant(p)[1])
+
+MIGRATIONS = [
+    {
+        "id": "zone_profiles",
+        "version": "2.1.0",
+        "description": "Move sowing/planting/harvest months to referenceProfile, add zoneProfiles",
+        "apply": apply_zone_profiles,
+    },
+]
+
+
+def parse_version(version):
+    """'2.1.0' -> (2, 1, 0), pour comparer les schema_version."""
+    return tuple(int(x) for x in str(version).split("."))
+
+def ordered_migrations(migrations=MIGRATIONS):
+    return sorted(migrations, key=lambda m: parse_version(m["version"]))
+
+def catalog_files(data_dir=DATA_DIR, patterns=CATALOG_PATTERNS):
+    files = []
+    for pattern in patterns:
+        files.extend(sorted(Path(data_dir).glob(pattern)))
+    return files
+
+def load_ledger(path=LEDGER_PATH):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"files": {}}
+
+def save_ledger(ledger, path=LEDGER_PATH):
+    atomic_write_text(path, json.dumps(ledger, indent=2, ensure_ascii=False, sort_keys=True) + "\n")
+
+def atomic_write_text(path, text):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+def covered(schema_version, migration):
+    """Une étape est déjà contenue dans tout schema_version strictement plus récent."""
+    return bool(schema_version) and parse_version(schema_version) > parse_version(migration["version"])
+
+def migrate_file(path, entry, migrations, dry_run=False, reapply=False):
+    """
+    Applique les étapes en attente à un fichier. Renvoie (entrée de registre à jour,
+    {id d'étape: plantes modifiées}) ; le fichier n'est réécrit que si une étape a modifié
+    quelque chose. Avec reapply, les étapes notées au registre sont rejouées (elles sont
+    idempotentes), par exemple après l'ajout de plantes.
+    """
+    raw = path.read_bytes()
+    digest = hashlib.sha256(raw).hexdigest()
+    done = [] if reapply else list(entry.get("applied", []))
+    if entry.get("sha256") == digest and {m["id"] for m in migrations} <= set(done):
+        return entry, {}
+
+    doc, index = load_indexed(path)
+    schema_version = doc.get("schema_version") if isinstance(doc, dict) else None
+    applied = list(done)
+    changes = {}
+    for m in migrations:
+        if m["id"] in done:
+            continue
+        applied.append(m["id"])
+        if covered(schema_version, m):
+            continue
+        changed = m["apply"](doc)
+        if changed:
+            changes[m["id"]] = changed
+        # schema_version n'avance que pour les fichiers qui en portent un
+        if schema_version and parse_version(schema_version) < parse_version(m["version"]):
+            doc["schema_version"] = schema_version = m["version"]
+            changes.setdefault(m["id"], 0)
+
+    if changes and not dry_run:
+        snapshot(path, label="migrations")
+        patch_file(path, doc, index)
+        digest = hashlib.sha256(path.read_bytes()).hexdigest()
+
+    new_entry = {"applied": applied, "sha256": digest}
+    if schema_version:
+        new_entry["schema_version"] = schema_version
+    return new_entry, changes
+
+def ledger_key(path):
+    """Chemin relatif à la racine du dépôt quand c'est possible, pour un registre portable."""
+    path = Path(path).resolve()
+    try:
+        return path.relative_to(REPO_ROOT).as_posix()
+    except ValueError:
+        return str(path)
+
+def run_migrations(files=None, migrations=MIGRATIONS, ledger_path=LEDGER_PATH, dry_run=False, reapply=False,
+                   log=print):
+    """Migre tous les catalogues ; renvoie {chemin relatif: {id d'étape: plantes modifiées}}."""
+    files = catalog_files() if files is None else files
+    migrations = ordered_migrations(migrations)
+    ledger = load_ledger(ledger_path)
+    report = {}
+    for path in files:
+        path = Path(path)
+        key = ledger_key(path)
+        entry, changes = migrate_file(path, ledger["files"].get(key, {}), migrations, dry_run, reapply)
+        ledger["files"][key] = entry
+        report[key] = changes
+        if changes:
+            detail = ", ".join(f"{mid}: {n} plante(s)" for mid, n in changes.items())
+            log(f"{'[dry-run] ' if dry_run else ''}{key} : {detail}")
+    if not dry_run:
+        save_ledger(ledger, ledger_path)
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply pending migrations to plants.json and every locale file")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would change, write nothing")
+    parser.add_argument("--reapply", action="store_true", help="Re-run recorded migrations too (they are idempotent)")
+    parser.add_argument("--status", action="store_true", help="Show the migrations recorded for each file")
+    parser.add_argument("files", nargs="*", help="Catalog files (default: plants.json and every locale file)")
+    args = parser.parse_args()
+
+    if args.status:
+        ledger = load_ledger()
+        for key, entry in sorted(ledger["files"].items()):
+            print(f"{key} : {', '.join(entry.get('applied', [])) or '-'}")
+        print(f"Étapes connues : {', '.join(m['id'] for m in ordered_migrations())}")
+        return
+
+    report = run_migrations(args.files or None, dry_run=args.dry_run, reapply=args.reapply)
+    changed = sum(1 for c in report.values() if c)
+    print(f"{len(report)} fichier(s) examiné(s), {changed} {'à modifier' if args.dry_run else 'modifié(s)'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+month_masks.py
+Calendriers de semis / plantation / récolte en masques de 12 bits (bit 0 = janvier).
+
+ - months_to_mask / mask_to_months : ['Mar', 'Apr'] <-> 0b000000001100
+ - rotate_mask : le monthShift d'une zone (6 pour l'hémisphère sud) est une rotation
+ - build_mask_table : une ligne de 3 masques (sowing, planting, harvest) par plante,
+   résolus comme PhaseResolver côté app (referenceProfile, sinon champs *Months3)
+ - plants_in_phase : "que semer en zone X ce mois-ci" en une opération sur toute la
+   colonne ; avec NumPy si disponible, sinon sur un array('H') de la bibliothèque standard
+
+Usage:
+  python3 scripts/month_masks.py --zone SH_temperate --phase sowing --month 9
+  python3 scripts/month_masks.py --zone NH_temperate_europe --phase harvest   # mois courant
+"""
+
+import json
+import argparse
+from array import array
+from datetime import date
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:  # NumPy est facultatif
+    np = None
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+ZONES_JSON = REPO_ROOT / "assets" / "data" / "zones.json"
+
+MONTHS3 = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+MONTH_INDEX = {m: i for i, m in enumerate(MONTHS3)}
+ALL_MONTHS = 0xFFF
+
+PHASES = ("sowing", "planting", "harvest")
+# Champs racine lus quand la plante n'a pas de referenceProfile (comme PhaseResolver)
+LEGACY_FIELDS = {"sowing": "sowingMonths3", "planting": "plantingMonths3", "harvest": "harvestMonths3"}
+
+
+def months_to_mask(months):
+    """['Mar', 'Apr'] -> masque ; les codes inconnus sont ignorés, comme côté app."""
+    mask = 0
+    for m in months or ():
+        i = MONTH_INDEX.get(m)
+        if i is not None:
+            mask |= 1 << i
+    return mask
+
+def mask_to_months(mask):
+    """Masque -> codes 3 lettres dans l'ordre du calendrier."""
+    return [m for i, m in enumerate(MONTHS3) if mask >> i & 1]
+
+def range_mask(start, end):
+    """Mois start..end inclus (index 0-11), avec passage d'année si end < start."""
+    if end >= start:
+        return ((1 << (end - start + 1)) - 1) << start
+    return range_mask(start, 11) | range_mask(0, end)
+
+def rotate_mask(mask, shift):
+    """Décale chaque mois de shift (modulo 12) : bit i -> bit (i + shift) % 12."""
+    shift %= 12
+    if not shift:
+        return mask
+    return ((mask << shift) | (mask >> (12 - shift))) & ALL_MONTHS
+
+def rule_mask(rule):
+    """Masque d'une règle de phase ; seules les règles 'months' se résolvent sans date de gel."""
+    if isinstance(rule, dict) and rule.get("type") == "months":
+        return months_to_mask(rule.get("months"))
+    return 0
+
+def reference_masks(plant):
+    """(sowing, planting, harvest) de référence (Europe), avant tout décalage de zone."""
+    profile = plant.get("referenceProfile")
+    if profile is not None:
+        phases = profile.get("phases") or {}
+        return tuple(rule_mask(phases[p]) if p in phases else 0 for p in PHASES)
+    return tuple(months_to_mask(plant.get(LEGACY_FIELDS[p])) for p in PHASES)
+
+def zone_overrides(plant):
+    """{zone: {phase: masque}} des phases redéfinies explicitement dans zoneProfiles."""
+    overrides = {}
+    for zone_id, profile in (plant.get("zoneProfiles") or {}).items():
+        phases = profile.get("phases") if isinstance(profile, dict) else None
+        if phases:
+            overrides[zone_id] = {p: rule_mask(phases[p]) for p in PHASES if p in phases}
+    return overrides
+
+def load_zone_shifts(path=ZONES_JSON):
+    """{zone id: monthShift} d'après zones.json (0 si absent)."""
+    with open(path, "r", encoding="utf-8") as f:
+        zones = json.load(f).get("zones", [])
+    return {z["id"]: z.get("monthShift", 0) or 0 for z in zones}
+
+def build_mask_table(plants):
+    """
+    Table des masques de toutes les plantes : ids, une colonne uint16 par phase
+    (ndarray si NumPy est installé, array('H') sinon) et les surcharges par zone
+    {zone: {phase: {ligne: masque}}}, qui remplacent la rotation comme dans l'app.
+    """
+    ids = []
+    columns = {p: array("H") for p in PHASES}
+    overrides = {}
+    for row, plant in enumerate(plants):
+        ids.append(plant["id"])
+        for phase, mask in zip(PHASES, reference_masks(plant)):
+            columns[phase].append(mask)
+        for zone_id, phases in zone_overrides(plant).items():
+            for phase, mask in phases.items():
+                overrides.setdefault(zone_id, {}).setdefault(phase, {})[row] = mask
+    if np is not None:
+        columns = {p: np.frombuffer(col, dtype=np.uint16).copy() for p, col in columns.items()}
+    return {"ids": ids, "columns": columns, "overrides": overrides}
+
+def zone_phase_masks(table, zone_id, phase, shift):
+    """Colonne des masques d'une phase pour une zone : rotation de toute la colonne, puis surcharges."""
+    col = table["columns"][phase]
+    shift %= 12
+    if np is not None:
+        # la rotation crée un nouveau tableau ; sans décalage, copie pour ne pas altérer la table
+        masks = ((col << shift) | (col >> (12 - shift))) & ALL_MONTHS if shift else col.copy()
+    else:
+        masks = array("H", (rotate_mask(m, shift) for m in col)) if shift else array("H", col)
+    for row, mask in table["overrides"].get(zone_id, {}).get(phase, {}).items():
+        masks[row] = mask
+    return masks
+
+def plants_in_phase(table, zone_id, phase, month, shift):
+    """Ids des plantes dont la phase couvre month (1-12) dans la zone."""
+    masks = zone_phase_masks(table, zone_id, phase, shift)
+    bit = 1 << (month - 1)
+    if np is not None:
+        return [table["ids"][i] for i in np.flatnonzero(masks & bit)]
+    return [pid for pid, mask in zip(table["ids"], masks) if mask & bit]
+
+def main():
+    parser = argparse.ArgumentParser(description="Which plants are in a given phase, for a zone and a month")
+    parser.add_argument("--plants", "-p", default=None, help="Path to plants.json (default: shared catalog)")
+    parser.add_argument("--zones", default=str(ZONES_JSON), help="Path to zones.json")
+    parser.add_argument("--zone", "-z", default="NH_temperate_europe", help="Zone id")
+    parser.add_argument("--phase", choices=PHASES, default="sowing")
+    parser.add_argument("--month", "-m", type=int, default=date.today().month, help="Month 1-12 (default: current)")
+    args = parser.parse_args()
+
+    from plant_catalog import DEFAULT_PLANTS, load_catalog
+    catalog = load_catalog(args.plants or DEFAULT_PLANTS)
+    shifts = load_zone_shifts(args.zones)
+    if args.zone not in shifts:
+        parser.error(f"unknown zone {args.zone!r} (known: {', '.join(shifts)})")
+
+    table = build_mask_table(catalog["plants"])
+    ids = plants_in_phase(table, args.zone, args.phase, args.month, shifts[args.zone])
+    backend = "NumPy" if np is not None else "array('H')"
+    print(f"{args.phase} en {MONTHS3[args.month - 1]}, zone {args.zone} (décalage {shifts[args.zone]}, {backend}) : "
+          f"{len(ids)} plante(s)")
+    for pid in ids:
+        print(f"  {pid}")
+
+if __name__ == "__main__":
+    main()
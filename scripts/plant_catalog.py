@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+plant_catalog.py
+Chargement partagé de assets/data/plants.json pour les scripts du dossier scripts/.
+
+Le fichier est lu une seule fois et indexé :
+ - by_id     : id -> plante
+ - by_name   : commonName normalisé (casse, accents, ponctuation) -> id
+ - by_family : famille -> [ids]
+
+Un instantané pickle (catalogue déjà indexé) est gardé dans
+.dart_tool/plant_catalog_cache/ et réutilisé tant que le mtime et la taille du JSON
+n'ont pas bougé : les exécutions suivantes ne refont ni le parsing JSON ni les index.
+
+Usage (depuis un autre script de scripts/) :
+  from plant_catalog import load_catalog, find_plant_id
+  catalog = load_catalog()
+  plant = catalog["by_id"]["broccoli"]
+
+  python3 scripts/plant_catalog.py              # résumé du catalogue
+  python3 scripts/plant_catalog.py --no-cache   # forcer la relecture du JSON
+"""
+
+import os
+import re
+import json
+import pickle
+import hashlib
+import argparse
+import unicodedata
+from pathlib import Path
+from collections import defaultdict
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_PLANTS = REPO_ROOT / "assets" / "data" / "plants.json"
+
+# Instantanés des catalogues indexés, à incrémenter si leur structure change
+SNAPSHOT_DIR = REPO_ROOT / ".dart_tool" / "plant_catalog_cache"
+SNAPSHOT_VERSION = 1
+
+NON_WORD_RE = re.compile(r"[\W_]+")
+
+
+def normalize_name(name):
+    """'Chou-fleur', 'chou fleur' et 'CHOU (FLEUR)' donnent tous 'chou fleur'."""
+    decomposed = unicodedata.normalize("NFKD", name.casefold())
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return NON_WORD_RE.sub(" ", stripped).strip()
+
+def build_catalog(data):
+    """Catalogue indexé à partir du contenu de plants.json ({'plants': [...], ...})."""
+    plants = data.get("plants", [])
+    by_id = {}
+    by_name = {}
+    by_family = defaultdict(list)
+    for p in plants:
+        pid = p["id"]
+        by_id[pid] = p
+        if p.get("commonName"):
+            # en cas d'homonymie, la première plante du fichier garde le nom
+            by_name.setdefault(normalize_name(p["commonName"]), pid)
+        by_family[p.get("family") or ""].append(pid)
+    return {
+        "data": data,
+        "plants": plants,
+        "by_id": by_id,
+        "by_name": by_name,
+        "by_family": dict(by_family),
+    }
+
+def snapshot_path(path: Path):
+    key = hashlib.sha256(str(path.resolve()).encode("utf-8")).hexdigest()[:12]
+    return SNAPSHOT_DIR / f"{path.stem}-{key}.pickle"
+
+def load_snapshot(snap_path: Path, st):
+    try:
+        with open(snap_path, "rb") as fh:
+            snap = pickle.load(fh)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+        return None
+    if snap.get("stamp") != (SNAPSHOT_VERSION, st.st_mtime_ns, st.st_size):
+        return None
+    return snap["catalog"]
+
+def save_snapshot(snap_path: Path, st, catalog):
+    try:
+        snap_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = snap_path.with_name(snap_path.name + ".tmp")
+        with open(tmp_path, "wb") as fh:
+            pickle.dump({"stamp": (SNAPSHOT_VERSION, st.st_mtime_ns, st.st_size), "catalog": catalog},
+                        fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, snap_path)
+    except OSError:
+        pass  # instantané facultatif : dossier en lecture seule, etc.
+
+def load_catalog(path=DEFAULT_PLANTS, use_snapshot=True):
+    """
+    Charge et indexe plants.json. Avec use_snapshot, l'instantané pickle est réutilisé
+    s'il correspond au (mtime, taille) actuel du fichier, et réécrit sinon. Un script
+    qui modifie catalog["data"] et le réécrit dans path change son mtime : le
+    chargement suivant relira donc le JSON.
+    """
+    path = Path(path)
+    st = path.stat()
+    snap_path = snapshot_path(path)
+    if use_snapshot:
+        catalog = load_snapshot(snap_path, st)
+        if catalog is not None:
+            return catalog
+
+    with open(path, "r", encoding="utf-8") as f:
+        catalog = build_catalog(json.load(f))
+    if use_snapshot:
+        save_snapshot(snap_path, st, catalog)
+    return catalog
+
+def find_plant_id(catalog, name):
+    """
+    Id de la plante dont le commonName correspond à name : égalité des noms normalisés
+    (index by_name), sinon premier commonName qui contient name.
+    """
+    key = normalize_name(name)
+    pid = catalog["by_name"].get(key)
+    if pid is not None:
+        return pid
+    for norm, pid in catalog["by_name"].items():
+        if key in norm:
+            return pid
+    return None
+
+def main():
+    parser = argparse.ArgumentParser(description="Load and index the plant catalog")
+    parser.add_argument("--plants", "-p", default=str(DEFAULT_PLANTS), help="Path to plants.json")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore and do not write the pickle snapshot")
+    args = parser.parse_args()
+
+    catalog = load_catalog(args.plants, use_snapshot=not args.no_cache)
+    print(f"{len(catalog['plants'])} plantes, {len(catalog['by_name'])} noms, {len(catalog['by_family'])} familles")
+    for family, ids in sorted(catalog["by_family"].items()):
+        print(f"  {family or '(sans famille)'} : {len(ids)}")
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,26 @@
 
-import json
 import os
 
+from plant_catalog import REPO_ROOT, load_catalog
+from json_patch import load_indexed, patch_file
+
 TARGET_IDS = ["lentil", "climbing_bean", "gobo", "beetroot"]
 
 def main():
-    base_dir = r"c:\Users\roman\Documents\apppklod\permacalendarv2\assets\data"
+    base_dir = str(REPO_ROOT / "assets" / "data")
     source_file = os.path.join(base_dir, "plants.json")
     
     # Load Source
     source_map = {}
-    with open(source_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-        for p in data['plants']:
-            if p['id'] in TARGET_IDS:
-                source_map[p['id']] = {
-                    "sowing": p.get("sowingMonths3", []),
-                    "planting": p.get("plantingMonths3", [])
-                }
-                print(f"Loaded source for {p['id']}: Sowing={len(source_map[p['id']]['sowing'])} months")
+    by_id = load_catalog(source_file)['by_id']
+    for pid in TARGET_IDS:
+        p = by_id.get(pid)
+        if p:
+            source_map[pid] = {
+                "sowing": p.get("sowingMonths3", []),
+                "planting": p.get("plantingMonths3", [])
+            }
+            print(f"Loaded source for {pid}: Sowing={len(source_map[pid]['sowing'])} months")
 
     # Target Files
     targets = [
@@ -38,8 +40,7 @@ def main():
             
         print(f"Updating {t_rel}...")
         try:
-            with open(fp, 'r', encoding='utf-8') as f:
-                t_data = json.load(f)
+            t_data, index = load_indexed(fp)
             
             modified = False
             
@@ -82,10 +83,9 @@ def main():
                                  content['plantingMonths3'] = src['planting']
                                  modified = True
                                  
-            if modified:
-                with open(fp, 'w', encoding='utf-8') as f:
-                    json.dump(t_data, f, indent=2, ensure_ascii=False)
-                print("  -> Saved changes.")
+            rewritten, written = patch_file(fp, t_data, index) if modified else (0, 0)
+            if rewritten:
+                print(f"  -> Saved changes ({rewritten} plant(s) rewritten, {written} bytes written).")
             else:
                 print("  -> No changes needed.")
 
@@ -5,241 +5,877 @@ scan_hive.py
 Parcourt le repo Dart/Flutter pour :
  - trouver les noms de Hive.box/openBox/openLazyBox(...)
  - trouver les constantes String susceptibles d'être des noms de box
+ - résoudre les Hive.openBox(variable) et Hive.openBox(Classe.membre) vers leur nom
+   de box concret, via les constantes String (static const compris) du fichier et
+   des fichiers importés
  - trouver les Hive.registerAdapter(...) et les classes TypeAdapter avec leur typeId
  - trouver les @HiveType(typeId: N) sur les classes modèles
 
 Résultats :
  - docs/hive_inventory.md (rapport lisible)
  - docs/hive_inventory.json (structure exploitable)
+   (écrits en flux, et laissés intacts si leur contenu n'a pas changé)
 
 Usage:
   python3 scripts/scan_hive.py
   python3 scripts/scan_hive.py -o docs/hive_inventory.md -j docs/hive_inventory.json
+  python3 scripts/scan_hive.py --jobs 8     # scan réparti sur 8 processus (0 = un par CPU)
+  python3 scripts/scan_hive.py --hash       # cache : comparer aussi le contenu (sha256)
+  python3 scripts/scan_hive.py --no-cache   # tout rescanner sans lire ni écrire le cache
+  python3 scripts/scan_hive.py -x test/ -x "*.g.dart"   # exclusions en plus de .gitignore
+  python3 scripts/scan_hive.py --watch      # résident : rapports mis à jour à chaque changement
+  python3 scripts/scan_hive.py --check      # CI : diagnostic JSON compact, code 1 si incohérences
 """
 
+import os
 import re
+import sys
 import json
+import time
+import fnmatch
+import hashlib
 import argparse
+import contextlib
+from bisect import bisect_right
 from pathlib import Path
 from collections import defaultdict
 
-BOX_CALL_RE = re.compile(
-    r"Hive\.(?:openBox|box|openLazyBox)\s*(?:<[^>]+>)?\s*\(\s*(['\"])([^'\"]+)\1\s*\)",
-    re.MULTILINE
-)
-BOX_CALL_VAR_RE = re.compile(
-    r"Hive\.(?:openBox|box|openLazyBox)\s*(?:<[^>]+>)?\s*\(\s*([A-Za-z_][A-Za-z0-9_]*)\s*\)",
-    re.MULTILINE
+IDENT = r"[A-Za-z_][A-Za-z0-9_]*"
+
+# Tokens recherchés, combinés en une seule alternation parcourue une fois par fichier.
+# (token, catégorie, motif). Chaque motif commence par un caractère littéral : re
+# saute alors directement aux caractères candidats au lieu d'essayer chaque branche
+# à chaque position. Le nom du token est un groupe vide ajouté en fin de branche
+# (dernier groupe fermé, donc m.lastgroup) ; "{t}" préfixe les groupes internes pour
+# que deux branches d'une même catégorie puissent coexister.
+TOKEN_SPEC = [
+    ("box_call", "box_call",
+     r"Hive\.(?:openBox|box|openLazyBox)\s*(?:<[^>]+>)?\s*\(\s*"
+     r"(?:(?P<{t}_quote>['\"])(?P<{t}_name>[^'\"]+)(?P={t}_quote)|(?P<{t}_var>" + IDENT + r"(?:\." + IDENT + r")?))\s*\)"),
+    ("register_adapter", "register_adapter",
+     r"Hive\.registerAdapter\s*\(\s*(?P<{t}_name>" + IDENT + r")\s*\("),
+    ("const_string", "const_string",
+     r"const\s+String\s+(?P<{t}_name>" + IDENT + r")\s*=\s*['\"](?P<{t}_value>[^'\"]+)['\"]"),
+    ("final_string", "const_string",
+     r"final\s+String\s+(?P<{t}_name>" + IDENT + r")\s*=\s*['\"](?P<{t}_value>[^'\"]+)['\"]"),
+    ("adapter_class", "adapter_class",
+     r"class\s+(?P<{t}_name>" + IDENT + r")\s+extends\s+TypeAdapter(?:<(?P<{t}_model>[^>]+)>)?"),
+    ("type_id_field", "type_id", r"final\s+int\s+typeId\s*=\s*(?P<{t}_value>\d+)\s*;"),
+    ("type_id_getter", "type_id", r"int\s+get\s+typeId\s*=>\s*(?P<{t}_value>\d+)\s*;"),
+    ("hive_type", "hive_type",
+     r"@HiveType\s*\(\s*typeId\s*:\s*(?P<{t}_value>\d+)\s*\)\s*(?:class|abstract\s+class)\s+"
+     r"(?P<{t}_model>" + IDENT + r")"),
+]
+TOKEN_CATEGORY = {token: category for token, category, _ in TOKEN_SPEC}
+HIVE_TOKENS_RE = re.compile("|".join(
+    pattern.replace("{t}", token) + f"(?P<{token}>)" for token, _, pattern in TOKEN_SPEC
+))
+
+# Début de ligne jusqu'à un token : code, chaînes fermées et commentaires /* */ fermés.
+# S'il ne va pas jusqu'au token, celui-ci est dans un commentaire // ou une chaîne.
+LINE_CODE_RE = re.compile(
+    r"(?:[^/'\"]+|/(?![/*])|/\*.*?\*/|'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\")*"
 )
-CONST_STR_RE = re.compile(
-    r"(?:const|final)\s+String\s+([A-Za-z_][A-Za-z0-9_]*)\s*=\s*['\"]([^'\"]+)['\"]",
-    re.MULTILINE
+# Commentaires /* */ ; chaînes et commentaires // sont consommés pour ne pas
+# prendre un '**/*.dart' ou un "// voir /*" pour un début de commentaire.
+BLOCK_COMMENT_RE = re.compile(
+    r"'(?:''[\s\S]*?'''|[^'\\\n]*(?:\\.[^'\\\n]*)*')"
+    r"|\"(?:\"\"[\s\S]*?\"\"\"|[^\"\\\n]*(?:\\.[^\"\\\n]*)*\")"
+    r"|//[^\n]*"
+    r"|(?P<block>/\*[\s\S]*?\*/)"
 )
-REGISTER_ADAPTER_RE = re.compile(
-    r"Hive\.registerAdapter\s*\(\s*([A-Za-z_][A-Za-z0-9_]*)\s*\(",
-    re.MULTILINE
+
+# Déclarations pouvant porter des membres static (Classe.membre), et le "static"
+# qui précède un const/final String membre de l'une d'elles. Le motif commence par
+# un littéral (pas de \b) : le caractère précédent est vérifié à part.
+DECLARATION_RE = re.compile(r"(?:class|mixin|enum|extension)\s+(?!on\b)(?P<name>" + IDENT + r")")
+STATIC_BEFORE_RE = re.compile(r"\bstatic\s+\Z")
+
+# En-tête d'un fichier Dart : les directives précèdent toute déclaration, il suffit
+# donc de les enchaîner depuis le début du fichier (hors de l'alternation principale,
+# où des motifs en "i"/"e" ralentiraient tout le parcours).
+DIRECTIVE_RE = re.compile(
+    r"[\s\ufeff]+|//[^\n]*|/\*[\s\S]*?\*/"
+    r"|(?P<kind>import|export)\s+['\"](?P<uri>[^'\"]+)['\"][^;]*;"
+    r"|(?:library|part)\b[^;]*;"
 )
-CLASS_ADAPTER_RE = re.compile(
-    r"class\s+([A-Za-z_][A-Za-z0-9_]*)\s+extends\s+TypeAdapter(?:<([^>]+)>)?",
-    re.MULTILINE
+
+# Accolades hors chaînes et commentaires, pour apparier le corps d'une classe.
+BRACE_RE = re.compile(
+    r"'(?:''[\s\S]*?'''|[^'\\\n]*(?:\\.[^'\\\n]*)*')"
+    r"|\"(?:\"\"[\s\S]*?\"\"\"|[^\"\\\n]*(?:\\.[^\"\\\n]*)*\")"
+    r"|//[^\n]*|/\*[\s\S]*?\*/"
+    r"|[{}]"
 )
-TYPEID_PATTERNS = [
-    re.compile(r"@override\s+final\s+int\s+typeId\s*=\s*(\d+)\s*;", re.MULTILINE),
-    re.compile(r"@override\s+int\s+get\s+typeId\s*=>\s*(\d+)\s*;", re.MULTILINE),
-    re.compile(r"final\s+int\s+typeId\s*=\s*(\d+)\s*;", re.MULTILINE),
-    re.compile(r"int\s+get\s+typeId\s*=>\s*(\d+)\s*;", re.MULTILINE),
+
+# Corps supposé d'un TypeAdapter dont l'accolade fermante est introuvable
+TYPEID_WINDOW = 8000
+
+# Cache des résultats par fichier (relatif à --root), à incrémenter si le format change
+DEFAULT_CACHE = ".dart_tool/hive_scan_cache/scan_cache.json"
+CACHE_VERSION = 4
+
+# Dossiers jamais parcourus (syntaxe .gitignore, relative à --root), complétés par --exclude
+DEFAULT_EXCLUDES = [
+    ".git/",
+    ".dart_tool/",
+    "build/",
+    "Pods/",
+    ".gradle/",
+    ".symlinks/",
+    "node_modules/",
+    "/backups/",
 ]
-HIVETYPE_RE = re.compile(
-    r"@HiveType\s*\(\s*typeId\s*:\s*(\d+)\s*\)\s*(?:class|abstract\s+class)\s+([A-Za-z_][A-Za-z0-9_]*)",
-    re.MULTILINE
-)
 
-def find_line_of_pos(text, pos):
-    return text[:pos].count("\n") + 1
+def line_counter(text):
+    """
+    Renvoie line_of(pos) pour des positions croissantes : seuls les \\n entre deux
+    appels sont comptés, chaque caractère du fichier n'est donc lu qu'une fois.
+    """
+    state = {"line": 1, "pos": 0}
+
+    def line_of(pos):
+        state["line"] += text.count("\n", state["pos"], pos)
+        state["pos"] = pos
+        return state["line"]
+    return line_of
+
+def find_block_comments(text):
+    """(débuts, fins) triés des commentaires /* */ du fichier."""
+    starts, ends = [], []
+    if "/*" in text:
+        for m in BLOCK_COMMENT_RE.finditer(text):
+            if m.lastgroup == "block":
+                starts.append(m.start())
+                ends.append(m.end())
+    return starts, ends
+
+def is_code_pos(text, pos, block_comments):
+    """False si pos tombe dans un commentaire ou dans une chaîne (hors chaînes multi-lignes)."""
+    starts, ends = block_comments
+    i = bisect_right(starts, pos) - 1
+    if i >= 0 and pos < ends[i]:
+        return False
+    line_start = text.rfind("\n", 0, pos) + 1
+    return LINE_CODE_RE.match(text, line_start, pos).end() == pos
+
+def class_body(text, pos):
+    """
+    (début, fin) du corps { ... } de la classe déclarée à pos, par appariement des
+    accolades. Sans accolade fermante, le corps est borné à TYPEID_WINDOW caractères.
+    """
+    open_pos = text.find("{", pos)
+    if open_pos < 0:
+        return pos, min(len(text), pos + TYPEID_WINDOW)
+    depth = 0
+    for m in BRACE_RE.finditer(text, open_pos):
+        c = m.group()
+        if c == "{":
+            depth += 1
+        elif c == "}":
+            depth -= 1
+            if depth == 0:
+                return open_pos, m.end()
+    return open_pos, min(len(text), open_pos + TYPEID_WINDOW)
+
+def scan_directives(text):
+    """[(import|export, uri)] des directives en tête du fichier."""
+    directives = []
+    pos = 0
+    while True:
+        m = DIRECTIVE_RE.match(text, pos)
+        if m is None or m.end() == pos:
+            return directives
+        if m.group("kind"):
+            directives.append((m.group("kind"), m.group("uri")))
+        pos = m.end()
+
+def decode_dart(data: bytes):
+    try:
+        text = data.decode("utf-8")
+    except UnicodeDecodeError:
+        # try latin-1 fallback
+        text = data.decode("latin-1")
+    # mêmes fins de ligne que Path.read_text
+    return text.replace("\r\n", "\n").replace("\r", "\n")
+
+def read_dart_file(f: Path):
+    return decode_dart(f.read_bytes())
+
+def scan_text(text, file_label):
+    """
+    Parcourt le texte d'un fichier Dart une seule fois et renvoie ses résultats partiels :
+    boxes, box_vars, const_strings, registered, adapters, hive_types, imports, exports
+    (listes de dicts).
+    Les occurrences situées dans un commentaire ou une chaîne sont ignorées.
+    """
+    found = {
+        "boxes": [],
+        "box_vars": [],
+        "const_strings": [],
+        "registered": [],
+        "adapters": [],
+        "hive_types": [],
+        "imports": [],
+        "exports": [],
+    }
+    open_adapters = []  # (début, fin du corps, adapter) dont le corps n'est pas encore refermé
+    line_of = line_counter(text)
+    block_comments = None  # calculés au premier token rencontré
+    owner = {"pos": 0, "name": None}  # dernière déclaration de classe vue, jusqu'à owner["pos"]
+
+    def enclosing_class(pos):
+        # Un membre static est forcément dans un corps de classe et Dart n'imbrique pas
+        # les classes : c'est la dernière déclaration avant lui. Les positions croissent,
+        # le texte n'est donc parcouru qu'une fois.
+        for d in DECLARATION_RE.finditer(text, owner["pos"], pos):
+            start = d.start()
+            if (start == 0 or not (text[start - 1].isalnum() or text[start - 1] in "_$")) \
+                    and is_code_pos(text, start, block_comments):
+                owner["name"] = d.group("name")
+        owner["pos"] = pos
+        return owner["name"]
+
+    def on_box_call(m, tok, line):
+        if m.group(tok + "_name") is not None:
+            found["boxes"].append({"name": m.group(tok + "_name"), "file": file_label, "line": line})
+        else:
+            found["box_vars"].append({"name": m.group(tok + "_var"), "file": file_label, "line": line})
+
+    def on_register_adapter(m, tok, line):
+        snippet = text[m.start():m.start()+120].split("\n")[0]
+        found["registered"].append({"name": m.group(tok + "_name"), "file": file_label, "line": line, "snippet": snippet})
+
+    def on_const_string(m, tok, line):
+        pos = m.start()
+        cls = enclosing_class(pos) if STATIC_BEFORE_RE.search(text, max(0, pos - 40), pos) else None
+        found["const_strings"].append({"name": m.group(tok + "_name"), "value": m.group(tok + "_value"),
+                                       "class": cls, "file": file_label, "line": line})
+
+    def on_adapter_class(m, tok, line):
+        adapter = {
+            "name": m.group(tok + "_name"),
+            "file": file_label,
+            "line": line,
+            "model": m.group(tok + "_model"),
+            "typeId": None,
+        }
+        found["adapters"].append(adapter)
+        body_start, body_end = class_body(text, m.end())
+        open_adapters.append((body_start, body_end, adapter))
+
+    def on_type_id(m, tok, line):
+        # Le typeId revient à l'adapter le plus interne dont le corps contient le token ;
+        # les corps refermés avant lui sont oubliés, tout se résout dans le même parcours.
+        pos = m.start()
+        open_adapters[:] = [entry for entry in open_adapters if entry[1] > pos]
+        for body_start, _, adapter in reversed(open_adapters):
+            if body_start < pos:
+                if adapter["typeId"] is None:
+                    adapter["typeId"] = int(m.group(tok + "_value"))
+                break
+
+    def on_hive_type(m, tok, line):
+        found["hive_types"].append({"model": m.group(tok + "_model"), "typeId": int(m.group(tok + "_value")), "file": file_label, "line": line})
+
+    handlers = {
+        "box_call": on_box_call,
+        "register_adapter": on_register_adapter,
+        "const_string": on_const_string,
+        "adapter_class": on_adapter_class,
+        "type_id": on_type_id,
+        "hive_type": on_hive_type,
+    }
+
+    for m in HIVE_TOKENS_RE.finditer(text):
+        pos = m.start()
+        if block_comments is None:
+            block_comments = find_block_comments(text)
+        if not is_code_pos(text, pos, block_comments):
+            continue
+        tok = m.lastgroup
+        handlers[TOKEN_CATEGORY[tok]](m, tok, line_of(pos))
+
+    for kind, uri in scan_directives(text):
+        found[kind + "s"].append({"uri": uri, "file": file_label})
+    return found
+
+def parse_ignore_lines(lines, base):
+    """
+    Règles au format .gitignore, relatives au dossier base ("" = racine) :
+    (base, motif compilé, négation, dossiers seulement, ancré).
+    """
+    rules = []
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        negate = line.startswith("!")
+        if negate:
+            line = line[1:]
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        if line.startswith("**/"):
+            line = line[3:]
+        # un motif contenant "/" est ancré au dossier du .gitignore, sinon il vise le nom
+        anchored = "/" in line
+        line = line.lstrip("/")
+        if line:
+            match = re.compile(fnmatch.translate(line)).match
+            rules.append((base, match, negate, dir_only, anchored))
+    return rules
+
+def is_ignored(rules, rel_path, is_dir):
+    ignored = False
+    for base, match, negate, dir_only, anchored in rules:
+        if dir_only and not is_dir:
+            continue
+        if base:
+            if not rel_path.startswith(base + "/"):
+                continue
+            sub_path = rel_path[len(base) + 1:]
+        else:
+            sub_path = rel_path
+        target = sub_path if anchored else sub_path.rsplit("/", 1)[-1]
+        if match(target):
+            # la dernière règle qui correspond l'emporte, comme pour git
+            ignored = not negate
+    return ignored
+
+def walk_dart_files(root: Path, excludes=DEFAULT_EXCLUDES, use_gitignore=True, stats=None):
+    """
+    Liste les *.dart sous root avec os.scandir, en ordre trié. Les dossiers exclus
+    (excludes, puis les .gitignore rencontrés) sont élagués sans être parcourus.
+    stats["dirs_skipped"] compte les dossiers élagués.
+    """
+    if stats is None:
+        stats = {}
+    stats.setdefault("dirs_skipped", 0)
+    dart_files = []
+    stack = [("", parse_ignore_lines(excludes, ""))]
+    while stack:
+        rel_dir, rules = stack.pop()
+        dir_path = os.path.join(root, rel_dir)
+        if use_gitignore:
+            gitignore = os.path.join(dir_path, ".gitignore")
+            if os.path.isfile(gitignore):
+                with open(gitignore, encoding="utf-8", errors="replace") as f:
+                    rules = rules + parse_ignore_lines(f, rel_dir)
+        try:
+            with os.scandir(dir_path) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            continue
+        subdirs = []
+        for entry in entries:
+            rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+            if entry.is_dir(follow_symlinks=False):
+                if is_ignored(rules, rel_path, True):
+                    stats["dirs_skipped"] += 1
+                else:
+                    subdirs.append((rel_path, rules))
+            elif entry.name.endswith(".dart") and entry.is_file():
+                if not is_ignored(rules, rel_path, False):
+                    dart_files.append(root / rel_path)
+        stack.extend(reversed(subdirs))
+    return dart_files
+
+def scan_file(f: Path):
+    """Scanne un fichier et renvoie son entrée de cache : stat, sha256 et résultats partiels."""
+    st = f.stat()
+    data = f.read_bytes()
+    return {
+        "mtime_ns": st.st_mtime_ns,
+        "size": st.st_size,
+        "sha256": hashlib.sha256(data).hexdigest(),
+        "found": scan_text(decode_dart(data), str(f)),
+    }
+
+def scan_files(dart_files, jobs=1):
+    """
+    Entrées (voir scan_file) de chaque fichier, dans l'ordre de dart_files.
+    Avec jobs > 1 les fichiers sont répartis sur un pool de processus ; pool.map
+    conserve l'ordre, la fusion qui suit est donc identique au mode série.
+    """
+    if jobs <= 1 or len(dart_files) < 2:
+        return [scan_file(f) for f in dart_files]
+    # import tardif : inutile (et coûteux au démarrage) en série ou sur cache chaud
+    from concurrent.futures import ProcessPoolExecutor
+    chunksize = max(1, len(dart_files) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(scan_file, dart_files, chunksize=chunksize))
+
+def cache_signature():
+    # Un changement des motifs invalide le cache sans avoir à y penser
+    return f"{CACHE_VERSION}:{hashlib.sha256(HIVE_TOKENS_RE.pattern.encode()).hexdigest()[:16]}"
+
+def load_cache(cache_path: Path):
+    try:
+        data = json.loads(cache_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if data.get("signature") != cache_signature():
+        return {}
+    return data.get("files", {})
 
-def scan_repo(root: Path):
+def save_cache(cache_path: Path, entries):
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_name(cache_path.name + ".tmp")
+    tmp_path.write_text(json.dumps({"signature": cache_signature(), "files": entries}, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp_path, cache_path)
+
+def refresh_entries(dart_files, previous, jobs=1, use_hash=False):
+    """
+    Entrées à jour pour dart_files : celles de previous (chemin -> entrée) sont
+    reprises si (mtime, taille) n'a pas bougé, ou avec use_hash si le contenu est
+    identique ; les autres fichiers sont rescannés. Renvoie (entrées, nb rescannés).
+    """
+    entries = [None] * len(dart_files)
+    to_scan = []
+    for i, f in enumerate(dart_files):
+        entry = previous.get(str(f))
+        if entry is not None:
+            st = f.stat()
+            if entry["mtime_ns"] == st.st_mtime_ns and entry["size"] == st.st_size:
+                entries[i] = entry
+                continue
+            if use_hash and entry["size"] == st.st_size:
+                if hashlib.sha256(f.read_bytes()).hexdigest() == entry["sha256"]:
+                    entries[i] = dict(entry, mtime_ns=st.st_mtime_ns)
+                    continue
+        to_scan.append(i)
+
+    for i, entry in zip(to_scan, scan_files([dart_files[i] for i in to_scan], jobs)):
+        entries[i] = entry
+    return entries, len(to_scan)
+
+def build_report(entries, walk_stats, packages=None):
+    report = merge_results([e["found"] for e in entries], packages)
+    report["skipped_dirs_count"] = walk_stats["dirs_skipped"]
+    return report
+
+def scan_repo(root: Path, jobs=1, cache_path=None, use_hash=False,
+              excludes=DEFAULT_EXCLUDES, use_gitignore=True):
+    """
+    Scanne tous les *.dart sous root (voir walk_dart_files pour l'élagage). Avec
+    cache_path, seuls les fichiers nouveaux ou modifiés sont relus (voir
+    refresh_entries) et les fichiers disparus sortent du cache.
+    """
+    walk_stats = {}
+    dart_files = walk_dart_files(root, excludes, use_gitignore, walk_stats)
+    print(f"{len(dart_files)} fichier(s) Dart, {walk_stats['dirs_skipped']} dossier(s) élagué(s)")
+    if cache_path is None:
+        return build_report(scan_files(dart_files, jobs), walk_stats, local_packages(root))
+
+    cache = load_cache(cache_path)
+    entries, scanned = refresh_entries(dart_files, cache, jobs, use_hash)
+    print(f"Cache : {len(dart_files) - scanned} fichier(s) réutilisé(s), {scanned} scanné(s)")
+
+    new_cache = {str(f): entry for f, entry in zip(dart_files, entries)}
+    if new_cache != cache:
+        save_cache(cache_path, new_cache)
+    return build_report(entries, walk_stats, local_packages(root))
+
+def watch_repo(root: Path, md_path: Path, json_path: Path, interval=1.0, jobs=1, cache_path=None,
+               use_hash=False, excludes=DEFAULT_EXCLUDES, use_gitignore=True):
+    """
+    Mode résident : l'inventaire reste en mémoire et l'arbre est ré-examiné toutes les
+    `interval` secondes (stat seulement). Seuls les fichiers touchés sont rescannés, et
+    les rapports ne sont réécrits que si l'inventaire a réellement changé.
+    """
+    known = load_cache(cache_path) if cache_path is not None else {}
+    last_report = None
+    print(f"Surveillance de {root} toutes les {interval:g} s (Ctrl+C pour arrêter) ...")
+    try:
+        while True:
+            walk_stats = {}
+            dart_files = walk_dart_files(root, excludes, use_gitignore, walk_stats)
+            entries, scanned = refresh_entries(dart_files, known, jobs, use_hash)
+            current = {str(f): entry for f, entry in zip(dart_files, entries)}
+            if last_report is None or current != known:
+                removed = len(known.keys() - current.keys())
+                known = current
+                if cache_path is not None:
+                    save_cache(cache_path, known)
+                report = build_report(entries, walk_stats, local_packages(root))
+                if report != last_report:
+                    print(f"[{time.strftime('%H:%M:%S')}] {scanned} fichier(s) rescanné(s), {removed} supprimé(s)")
+                    write_reports(report, md_path, json_path)
+                    last_report = report
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        print("Surveillance arrêtée.")
+
+def local_packages(root: Path):
+    """{nom du package: dossier lib} d'après pubspec.yaml, pour résoudre les imports package:."""
+    try:
+        pubspec = (root / "pubspec.yaml").read_text(encoding="utf-8")
+    except OSError:
+        return {}
+    m = re.search(r"^name:\s*([A-Za-z0-9_]+)", pubspec, re.MULTILINE)
+    return {m.group(1): str(root / "lib")} if m else {}
+
+def resolve_uri(uri, from_file, packages):
+    """Chemin du fichier Dart désigné par un import/export, None s'il est hors du repo."""
+    if uri.startswith("package:"):
+        package, _, rest = uri[len("package:"):].partition("/")
+        lib_dir = packages.get(package)
+        return os.path.normpath(os.path.join(lib_dir, rest)) if lib_dir else None
+    if ":" in uri:  # dart:, http:, ...
+        return None
+    return os.path.normpath(os.path.join(os.path.dirname(from_file), uri))
+
+def resolve_box_vars(box_vars, const_strings, imports, exports, packages):
+    """
+    Second passage sur les seuls appels Hive.openBox(variable) : chaque variable est
+    cherchée dans l'index des constantes (fichier, nom), d'abord dans le fichier de
+    l'appel (définition la plus proche au-dessus), puis dans les fichiers importés et
+    ce qu'ils ré-exportent. Une variable Classe.membre ne retient que les membres
+    static de cette classe. Les valeurs interpolées ('box_$id') ne sont pas des noms
+    concrets et restent non résolues. Complète chaque occurrence de box_vars (value,
+    defined_in) et renvoie {nom de box résolu: occurrences}.
+    """
+    symbols = defaultdict(list)   # (fichier, nom) -> définitions, dans l'ordre du fichier
+    for name, defs in const_strings.items():
+        for d in defs:
+            if "$" not in d["value"]:
+                symbols[(d["file"], name)].append(d)
+
+    def targets(uris_by_file, file):
+        return [t for t in (resolve_uri(u, file, packages) for u in uris_by_file.get(file, ())) if t]
+
+    def candidates(file, name, owner):
+        defs = symbols.get((file, name), [])
+        return [d for d in defs if d["class"] == owner] if owner else defs
+
+    def lookup(file, var, line):
+        owner, _, name = var.rpartition(".")
+        defs = candidates(file, name, owner)
+        if defs:
+            above = [d for d in defs if d["line"] <= line]
+            return above[-1] if above else defs[0]
+        if name.startswith("_") or owner.startswith("_"):  # privé à la bibliothèque
+            return None
+        seen = set()
+        stack = targets(imports, file)
+        while stack:
+            other = stack.pop()
+            if other in seen:
+                continue
+            seen.add(other)
+            defs = candidates(other, name, owner)
+            if defs:
+                return defs[0]
+            stack.extend(targets(exports, other))
+        return None
+
+    resolved = defaultdict(list)
+    for var, occ in box_vars.items():
+        for o in occ:
+            d = lookup(o["file"], var, o["line"])
+            o["value"] = d["value"] if d else None
+            o["defined_in"] = {"file": d["file"], "line": d["line"]} if d else None
+            if d:
+                resolved[d["value"]].append({"file": o["file"], "line": o["line"], "var": var})
+    return {k: v for k, v in sorted(resolved.items())}
+
+def merge_results(partials, packages=None):
+    """Fusionne les résultats partiels (dans l'ordre des fichiers) en un rapport."""
     boxes = defaultdict(list)            # box_name -> list of (file, line)
     box_vars = defaultdict(list)        # varName -> list of (file, line)
     const_strings = defaultdict(list)   # constName -> list of (value, file, line)
     adapters_registered = defaultdict(list)  # adapterClass -> list of (file, line, snippet)
-    adapters_defined = {}               # adapterClass -> {file, model, typeId or None, line}
+    adapters_defined = defaultdict(list)  # adapterClass -> list of {file, model, typeId or None, line}
     hive_types = []                     # list of {modelClass, typeId, file, line}
+    imports = defaultdict(list)         # file -> imported uris
+    exports = defaultdict(list)         # file -> exported uris
 
-    dart_files = list(root.rglob("*.dart"))
-
-    for f in dart_files:
-        try:
-            text = f.read_text(encoding="utf-8")
-        except Exception:
-            # try latin-1 fallback
-            text = f.read_text(encoding="latin-1")
-        # box literal calls
-        for m in BOX_CALL_RE.finditer(text):
-            box_name = m.group(2)
-            line = find_line_of_pos(text, m.start())
-            boxes[box_name].append({"file": str(f), "line": line})
-
-        # box variable calls (openBox(VAR))
-        for m in BOX_CALL_VAR_RE.finditer(text):
-            # ensure it's not a quoted match (the previous regex already captured quoted)
-            var = m.group(1)
-            line = find_line_of_pos(text, m.start())
-            char_after_paren = text[m.start():m.start()+20]
-            if "'" in char_after_paren or '"' in char_after_paren:
-                continue
-            box_vars[var].append({"file": str(f), "line": line})
-
-        # const/final strings
-        for m in CONST_STR_RE.finditer(text):
-            name = m.group(1)
-            val = m.group(2)
-            line = find_line_of_pos(text, m.start())
-            const_strings[name].append({"value": val, "file": str(f), "line": line})
-
-        # registerAdapter
-        for m in REGISTER_ADAPTER_RE.finditer(text):
-            adapter = m.group(1)
-            line = find_line_of_pos(text, m.start())
-            snippet = text[m.start():m.start()+120].split("\n")[0]
-            adapters_registered[adapter].append({"file": str(f), "line": line, "snippet": snippet})
-
-        # adapter class definitions
-        for m in CLASS_ADAPTER_RE.finditer(text):
-            adapter_class = m.group(1)
-            model = m.group(2) if m.group(2) else None
-            cls_pos = m.start()
-            line = find_line_of_pos(text, cls_pos)
-            snippet_region = text[cls_pos:cls_pos+8000]
-            found_typeid = None
-            for pat in TYPEID_PATTERNS:
-                mm = pat.search(snippet_region)
-                if mm:
-                    found_typeid = int(mm.group(1))
-                    break
-            adapters_defined[adapter_class] = {
-                "file": str(f),
-                "line": line,
-                "model": model,
-                "typeId": found_typeid,
-            }
-
-        # HiveType annotations (models)
-        for m in HIVETYPE_RE.finditer(text):
-            type_id = int(m.group(1))
-            model = m.group(2)
-            line = find_line_of_pos(text, m.start())
-            hive_types.append({"model": model, "typeId": type_id, "file": str(f), "line": line})
+    for found in partials:
+        for b in found["boxes"]:
+            boxes[b["name"]].append({"file": b["file"], "line": b["line"]})
+        for v in found["box_vars"]:
+            box_vars[v["name"]].append({"file": v["file"], "line": v["line"]})
+        for c in found["const_strings"]:
+            const_strings[c["name"]].append({"value": c["value"], "class": c["class"], "file": c["file"], "line": c["line"]})
+        for r in found["registered"]:
+            adapters_registered[r["name"]].append({"file": r["file"], "line": r["line"], "snippet": r["snippet"]})
+        for a in found["adapters"]:
+            adapters_defined[a["name"]].append({
+                "file": a["file"],
+                "line": a["line"],
+                "model": a["model"],
+                "typeId": a["typeId"],
+            })
+        hive_types.extend(found["hive_types"])
+        for i in found["imports"]:
+            imports[i["file"]].append(i["uri"])
+        for e in found["exports"]:
+            exports[e["file"]].append(e["uri"])
 
     adapters = {}
     all_adapter_names = set(list(adapters_defined.keys()) + list(adapters_registered.keys()))
     for name in sorted(all_adapter_names):
-        defined = adapters_defined.get(name)
+        defined = adapters_defined.get(name, [])
         registered = adapters_registered.get(name, [])
         adapters[name] = {
             "defined": defined,
             "registered": registered
         }
 
+    box_vars = {k: v for k, v in sorted(box_vars.items())}
+    const_strings = {k: v for k, v in sorted(const_strings.items())}
+    resolved_boxes = resolve_box_vars(box_vars, const_strings, imports, exports, packages or {})
+
     result = {
         "boxes": {k: v for k, v in sorted(boxes.items())},
-        "box_vars": {k: v for k, v in sorted(box_vars.items())},
-        "const_strings": {k: v for k, v in sorted(const_strings.items())},
+        "box_vars": box_vars,
+        "resolved_boxes": resolved_boxes,
+        "const_strings": const_strings,
         "adapters": adapters,
         "hive_types": hive_types,
-        "scanned_files_count": len(dart_files),
+        "scanned_files_count": len(partials),
     }
     return result
 
-def render_markdown(report, md_path: Path):
-    lines = []
-    lines.append("# Inventaire Hive - PermaCalendar V2\n")
-    lines.append("Généré automatiquement.\n")
-    lines.append(f"- Fichiers Dart scannés : **{report.get('scanned_files_count',0)}**\n")
+def check_report(report):
+    """
+    Contrôles de cohérence pour la CI, calculés sur le rapport déjà en mémoire :
+     - duplicate_type_ids : typeId revendiqué par plusieurs modèles (adapters et @HiveType)
+     - duplicate_adapter_names : classes adapter définies plusieurs fois sous le même nom
+       (registerAdapter ne permet pas de savoir laquelle est enregistrée)
+     - registered_not_defined : adapters passés à registerAdapter mais jamais définis
+     - models_without_adapter : modèles @HiveType dont aucun adapter n'est enregistré
+    """
+    claims = defaultdict(list)  # typeId -> [{model, file, line, source}]
+    registered_models = set()
+    duplicate_adapter_names = []
+    registered_not_defined = []
+    for name, info in report["adapters"].items():
+        defined = info["defined"]
+        if not defined:
+            if info["registered"]:
+                registered_not_defined.append({
+                    "adapter": name,
+                    "registered": [{"file": r["file"], "line": r["line"]} for r in info["registered"]],
+                })
+            continue
+        if len(defined) > 1:
+            duplicate_adapter_names.append({
+                "adapter": name,
+                "defined": [{"file": d["file"], "line": d["line"], "typeId": d["typeId"]} for d in defined],
+            })
+        for d in defined:
+            model = d["model"] or (name[:-len("Adapter")] if name.endswith("Adapter") else name)
+            if info["registered"]:
+                registered_models.add(model)
+            if d["typeId"] is not None:
+                claims[d["typeId"]].append({"model": model, "file": d["file"], "line": d["line"], "source": "adapter"})
+    for h in report["hive_types"]:
+        claims[h["typeId"]].append({"model": h["model"], "file": h["file"], "line": h["line"], "source": "hive_type"})
+
+    duplicate_type_ids = [
+        {"typeId": type_id, "claims": owners}
+        for type_id, owners in sorted(claims.items())
+        if len({o["model"] for o in owners}) > 1
+    ]
+    models_without_adapter = [
+        {"model": h["model"], "typeId": h["typeId"], "file": h["file"], "line": h["line"]}
+        for h in report["hive_types"]
+        if h["model"] not in registered_models
+    ]
+    return {
+        "ok": not (duplicate_type_ids or duplicate_adapter_names or registered_not_defined
+                   or models_without_adapter),
+        "duplicate_type_ids": duplicate_type_ids,
+        "duplicate_adapter_names": duplicate_adapter_names,
+        "registered_not_defined": registered_not_defined,
+        "models_without_adapter": models_without_adapter,
+    }
+
+def iter_markdown(report):
+    """Lignes du rapport Markdown, produites une à une (jointes par iter_joined)."""
+    yield "# Inventaire Hive - PermaCalendar V2\n"
+    yield "Généré automatiquement.\n"
+    yield f"- Fichiers Dart scannés : **{report.get('scanned_files_count',0)}**"
+    yield f"- Dossiers élagués (build, .gitignore, --exclude) : **{report.get('skipped_dirs_count',0)}**\n"
 
-    lines.append("## Boxes détectées (littérales)\n")
+    yield "## Boxes détectées (littérales)\n"
     if report["boxes"]:
         for box, occ in report["boxes"].items():
-            lines.append(f"### `{box}` ({len(occ)} occurrence(s))")
+            yield f"### `{box}` ({len(occ)} occurrence(s))"
             for o in occ:
-                lines.append(f"- `{o['file']}` : ligne {o['line']}")
-            lines.append("")
+                yield f"- `{o['file']}` : ligne {o['line']}"
+            yield ""
     else:
-        lines.append("Aucune box littérale trouvée via `Hive.openBox('name')` ou `Hive.box('name')`.\n")
+        yield "Aucune box littérale trouvée via `Hive.openBox('name')` ou `Hive.box('name')`.\n"
 
-    lines.append("## Boxes passées par variable (nom dynamique)\n")
+    yield "## Boxes passées par variable (nom dynamique)\n"
     if report["box_vars"]:
         for var, occ in report["box_vars"].items():
-            lines.append(f"- Variable `{var}` :")
+            yield f"- Variable `{var}` :"
             for o in occ:
-                lines.append(f"  - `{o['file']}` : ligne {o['line']}")
+                value = f"→ `{o['value']}`" if o.get("value") is not None else "(non résolue)"
+                yield f"  - `{o['file']}` : ligne {o['line']} {value}"
     else:
-        lines.append("Aucune utilisation évidente de variable passée à `Hive.openBox()`.\n")
+        yield "Aucune utilisation évidente de variable passée à `Hive.openBox()`.\n"
 
-    lines.append("\n## Constantes String (candidates noms de box)\n")
+    yield "\n## Boxes résolues via constantes\n"
+    if report["resolved_boxes"]:
+        for box, occ in report["resolved_boxes"].items():
+            yield f"### `{box}` ({len(occ)} occurrence(s))"
+            for o in occ:
+                yield f"- `{o['file']}` : ligne {o['line']} (via `{o['var']}`)"
+            yield ""
+    else:
+        yield "Aucune variable de box résolue vers une constante String.\n"
+
+    yield "\n## Constantes String (candidates noms de box)\n"
     if report["const_strings"]:
         for name, occ in report["const_strings"].items():
-            lines.append(f"- `{name}` :")
+            yield f"- `{name}` :"
             for o in occ:
-                lines.append(f"  - `{o['file']}` : ligne {o['line']} => valeur `{o['value']}`")
+                owner = f" (membre static de `{o['class']}`)" if o.get("class") else ""
+                yield f"  - `{o['file']}` : ligne {o['line']} => valeur `{o['value']}`{owner}"
     else:
-        lines.append("Aucune constante string trouvée.\n")
+        yield "Aucune constante string trouvée.\n"
 
-    lines.append("\n## TypeAdapters et enregistrements\n")
+    yield "\n## TypeAdapters et enregistrements\n"
     if report["adapters"]:
         for adapter, info in report["adapters"].items():
-            lines.append(f"### Adapter `{adapter}`")
-            if info["defined"]:
-                d = info["defined"]
-                lines.append(f"- Défini dans `{d['file']}` : ligne {d['line']}")
+            yield f"### Adapter `{adapter}`"
+            if len(info["defined"]) > 1:
+                yield f"- **Défini {len(info['defined'])} fois** sous ce nom :"
+            for d in info["defined"]:
+                yield f"- Défini dans `{d['file']}` : ligne {d['line']}"
                 if d.get("model"):
-                    lines.append(f"- Model générique : `{d.get('model')}`")
-                lines.append(f"- typeId : `{d.get('typeId')}`")
-            else:
-                lines.append("- **Non défini** dans le code scanné.")
+                    yield f"- Model générique : `{d.get('model')}`"
+                yield f"- typeId : `{d.get('typeId')}`"
+            if not info["defined"]:
+                yield "- **Non défini** dans le code scanné."
             if info["registered"]:
-                lines.append("- Enregistrements (registerAdapter):")
+                yield "- Enregistrements (registerAdapter):"
                 for r in info["registered"]:
-                    lines.append(f"  - `{r['file']}` : ligne {r['line']} → `{r['snippet']}`")
+                    yield f"  - `{r['file']}` : ligne {r['line']} → `{r['snippet']}`"
             else:
-                lines.append("- Aucun enregistrement `Hive.registerAdapter(...)` trouvé.")
-            lines.append("")
+                yield "- Aucun enregistrement `Hive.registerAdapter(...)` trouvé."
+            yield ""
     else:
-        lines.append("Aucun TypeAdapter trouvé.\n")
+        yield "Aucun TypeAdapter trouvé.\n"
 
-    lines.append("\n## @HiveType (modèles annotés)\n")
+    yield "\n## @HiveType (modèles annotés)\n"
     if report["hive_types"]:
         for h in report["hive_types"]:
-            lines.append(f"- `{h['model']}` — typeId **{h['typeId']}** — `{h['file']}` (ligne {h['line']})")
+            yield f"- `{h['model']}` — typeId **{h['typeId']}** — `{h['file']}` (ligne {h['line']})"
     else:
-        lines.append("Aucune annotation @HiveType trouvée.\n")
+        yield "Aucune annotation @HiveType trouvée.\n"
+
+    yield "\n---\n"
+    yield "**Notes** :\n"
+    yield "- Si un nom de box est passé via une variable ou construit dynamiquement, le script ne peut pas résoudre sa valeur statiquement sauf s'il est défini comme constante String.\n"
+    yield "- Les `typeId` sont définis dans les classes `TypeAdapter` (ou via `@HiveType(typeId: N)` sur les modèles). `--check` vérifie qu'ils ne sont pas dupliqués.\n"
 
-    lines.append("\n---\n")
-    lines.append("**Notes** :\n")
-    lines.append("- Si un nom de box est passé via une variable ou construit dynamiquement, le script ne peut pas résoudre sa valeur statiquement sauf s'il est défini comme constante String.\n")
-    lines.append("- Les `typeId` sont définis dans les classes `TypeAdapter` (ou via `@HiveType(typeId: N)` sur les modèles). Vérifie que les `typeId` ne sont pas dupliqués.\n")
 
-    md_path.parent.mkdir(parents=True, exist_ok=True)
-    md_path.write_text("\n".join(lines), encoding="utf-8")
-    print(f"Wrote markdown report to: {md_path}")
+def iter_joined(lines, sep="\n"):
+    """Équivalent paresseux de sep.join(lines)."""
+    first = True
+    for line in lines:
+        if first:
+            first = False
+            yield line
+        else:
+            yield sep + line
+
+def iter_json(report):
+    return json.JSONEncoder(indent=2, ensure_ascii=False).iterencode(report)
+
+def file_sha256(path: Path):
+    try:
+        with open(path, "rb") as fh:
+            digest = hashlib.sha256()
+            for block in iter(lambda: fh.read(1 << 16), b""):
+                digest.update(block)
+            return digest.hexdigest()
+    except OSError:
+        return None
+
+def write_if_changed(path: Path, make_chunks):
+    """
+    Écrit en flux les morceaux de make_chunks() dans path, sans jamais assembler le
+    contenu complet en mémoire. Un premier passage ne fait que hacher : si le fichier
+    existant a déjà ce contenu, il n'est pas touché (mtime intact). Sinon un second
+    passage écrit dans un .tmp, remplacé atomiquement. Renvoie True si écrit.
+    """
+    digest = hashlib.sha256()
+    for chunk in make_chunks():
+        digest.update(chunk.encode("utf-8"))
+    if digest.hexdigest() == file_sha256(path):
+        return False
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8", newline="") as fh:
+        for chunk in make_chunks():
+            fh.write(chunk)
+    os.replace(tmp_path, path)
+    return True
+
+def write_reports(report, md_path: Path, json_path: Path):
+    for label, path, make_chunks in (
+        ("markdown", md_path, lambda: iter_joined(iter_markdown(report))),
+        ("JSON", json_path, lambda: iter_json(report)),
+    ):
+        if write_if_changed(path, make_chunks):
+            print(f"Wrote {label} report to: {path}")
+        else:
+            print(f"{label} report unchanged: {path}")
 
 def main():
     parser = argparse.ArgumentParser(description="Scan repository for Hive boxes and TypeAdapters")
     parser.add_argument("--root", "-r", default=".", help="Root of repository (default current dir)")
     parser.add_argument("--out", "-o", default="docs/hive_inventory.md", help="Markdown output path")
     parser.add_argument("--json", "-j", default="docs/hive_inventory.json", help="JSON output path")
+    parser.add_argument("--jobs", "-J", type=int, default=1,
+                        help="Number of worker processes (default 1 = serial, 0 = one per CPU)")
+    parser.add_argument("--cache", default=DEFAULT_CACHE, help="Per-file result cache, relative to --root")
+    parser.add_argument("--no-cache", action="store_true", help="Rescan every file and leave the cache untouched")
+    parser.add_argument("--exclude", "-x", action="append", default=[], metavar="PATTERN",
+                        help="Extra path to skip, .gitignore syntax (repeatable)")
+    parser.add_argument("--no-gitignore", action="store_true", help="Do not honor .gitignore files")
+    parser.add_argument("--hash", action="store_true",
+                        help="Re-hash files whose mtime changed and reuse their results if content is identical")
+    parser.add_argument("--watch", "-w", action="store_true",
+                        help="Stay resident and rewrite the reports whenever the inventory changes")
+    parser.add_argument("--interval", type=float, default=1.0, help="Polling interval in seconds for --watch")
+    parser.add_argument("--check", action="store_true",
+                        help="Print a compact JSON diagnostic (duplicate typeIds or adapter names, missing adapters) "
+                             "instead of the reports, exit 1 if anything is found")
     args = parser.parse_args()
+    if args.check and args.watch:
+        parser.error("--check and --watch are mutually exclusive")
 
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
     root = Path(args.root).resolve()
-    print(f"Scanning Dart files in {root} ...")
-    report = scan_repo(root)
-
+    cache_path = None if args.no_cache else root / args.cache
     md_path = Path(args.out)
     json_path = Path(args.json)
+    options = dict(jobs=jobs, cache_path=cache_path, use_hash=args.hash,
+                   excludes=DEFAULT_EXCLUDES + args.exclude, use_gitignore=not args.no_gitignore)
+
+    if args.watch:
+        watch_repo(root, md_path, json_path, interval=args.interval, **options)
+        return
 
-    render_markdown(report, md_path)
-    json_path.parent.mkdir(parents=True, exist_ok=True)
-    json_path.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
-    print(f"Wrote JSON report to: {json_path}")
+    if args.check:
+        # stdout ne contient que le diagnostic, la progression part sur stderr
+        with contextlib.redirect_stdout(sys.stderr):
+            report = scan_repo(root, **options)
+        diagnostic = check_report(report)
+        print(json.dumps(diagnostic, ensure_ascii=False, separators=(",", ":")))
+        sys.exit(0 if diagnostic["ok"] else 1)
+
+    print(f"Scanning Dart files in {root} ...")
+    report = scan_repo(root, **options)
+    write_reports(report, md_path, json_path)
     print("Scan terminé.")
 
 if __name__ == "__main__":
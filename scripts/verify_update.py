@@ -1,9 +1,7 @@
 
-import json
+from plant_catalog import load_catalog
 
-with open('assets/data/plants.json', 'r', encoding='utf-8') as f:
-    data = json.load(f)
-    for p in data['plants']:
-        if p['id'] == 'broccoli':
-            print(f"Broccoli Sowing: {p.get('sowingMonths3')}")
-            print(f"Broccoli Planting: {p.get('plantingMonths3')}")
+p = load_catalog()['by_id'].get('broccoli')
+if p:
+    print(f"Broccoli Sowing: {p.get('sowingMonths3')}")
+    print(f"Broccoli Planting: {p.get('plantingMonths3')}")
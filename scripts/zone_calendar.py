@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+zone_calendar.py
+Matrice précalculée (zone, phase, plante) -> masque de mois, pour toutes les zones de
+assets/data/zones.json et toutes les plantes de plants.json.
+
+Chaque case est le masque 12 bits (month_masks) que PhaseResolver calculerait :
+surcharge zoneProfiles, sinon profil de référence décalé du monthShift de la zone.
+Les écrans calendrier et les exports n'ont plus qu'à lire une case.
+
+Format de assets/data/zone_calendar.bin :
+  MAGIC, u32 longueur de l'en-tête, en-tête JSON (zones, phases, ids des plantes,
+  sha256 des sources, sha256 de la matrice), puis la matrice uint16 little-endian
+  rangée [zone][phase][plante] : les plantes d'une zone et d'une phase sont contiguës.
+Le sha256 de la matrice est vérifié à la lecture ; celui des sources (plants.json +
+zones.json) permet de ne pas reconstruire un fichier déjà à jour.
+
+Usage:
+  python3 scripts/zone_calendar.py                       # construit (si les sources ont changé)
+  python3 scripts/zone_calendar.py --check               # intégrité + fraîcheur, code 1 sinon
+  python3 scripts/zone_calendar.py --zone SH_temperate --plant tomato
+"""
+
+import os
+import sys
+import json
+import struct
+import hashlib
+import argparse
+from array import array
+from pathlib import Path
+
+from month_masks import (np, PHASES, ZONES_JSON, build_mask_table, zone_phase_masks,
+                         load_zone_shifts, mask_to_months)
+from plant_catalog import REPO_ROOT, DEFAULT_PLANTS, load_catalog
+
+OUTPUT_CALENDAR = REPO_ROOT / "assets" / "data" / "zone_calendar.bin"
+
+MAGIC = b"ZONECAL\x00"
+FORMAT_VERSION = 1
+HEADER_LEN = struct.Struct("<I")
+
+
+def sources_sha256(plants_path, zones_path):
+    """Empreinte commune des deux fichiers sources."""
+    h = hashlib.sha256()
+    for path in (plants_path, zones_path):
+        with open(path, "rb") as f:
+            h.update(hashlib.sha256(f.read()).digest())
+    return h.hexdigest()
+
+def build_matrix(plants, shifts):
+    """Matrice aplatie [zone][phase][plante] (array('H')) et liste des ids de plantes."""
+    table = build_mask_table(plants)
+    matrix = array("H")
+    for zone_id, shift in shifts.items():
+        for phase in PHASES:
+            masks = zone_phase_masks(table, zone_id, phase, shift)
+            matrix.extend(masks.tolist() if np is not None else masks)
+    return matrix, table["ids"]
+
+def encode_calendar(matrix, zones, plant_ids, source_hash):
+    payload = array("H", matrix)
+    if sys.byteorder == "big":
+        payload.byteswap()
+    payload = payload.tobytes()
+    header = json.dumps({
+        "version": FORMAT_VERSION,
+        "zones": zones,
+        "phases": list(PHASES),
+        "plants": plant_ids,
+        "sources_sha256": source_hash,
+        "matrix_sha256": hashlib.sha256(payload).hexdigest(),
+    }, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return MAGIC + HEADER_LEN.pack(len(header)) + header + payload
+
+def write_calendar(data, path=OUTPUT_CALENDAR):
+    """Écrit data de façon atomique ; ne touche pas un fichier déjà identique. True si écrit."""
+    path = Path(path)
+    if path.exists() and path.read_bytes() == data:
+        return False
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return True
+
+def read_header(data):
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError("not a zone calendar file (bad magic)")
+    pos = len(MAGIC)
+    (n,) = HEADER_LEN.unpack_from(data, pos)
+    pos += HEADER_LEN.size
+    header = json.loads(data[pos:pos + n].decode("utf-8"))
+    if header.get("version") != FORMAT_VERSION:
+        raise ValueError(f"unsupported zone calendar version {header.get('version')}")
+    return header, pos + n
+
+def read_calendar(path=OUTPUT_CALENDAR):
+    """
+    Charge la matrice et vérifie son sha256 (ValueError si le fichier est corrompu).
+    flat est la matrice aplatie en array('H') (accès case par case, plus rapide qu'un
+    scalaire NumPy) ; masks est un ndarray (zones, phases, plantes) avec NumPy, flat sinon.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    header, pos = read_header(data)
+    payload = data[pos:]
+    if hashlib.sha256(payload).hexdigest() != header["matrix_sha256"]:
+        raise ValueError(f"{path}: matrix checksum mismatch")
+    shape = (len(header["zones"]), len(header["phases"]), len(header["plants"]))
+    if len(payload) != 2 * shape[0] * shape[1] * shape[2]:
+        raise ValueError(f"{path}: matrix size does not match its header")
+    flat = array("H")
+    flat.frombytes(payload)
+    if sys.byteorder == "big":
+        flat.byteswap()
+    return {
+        "header": header,
+        "shape": shape,
+        "flat": flat,
+        "masks": np.frombuffer(payload, dtype="<u2").reshape(shape) if np is not None else flat,
+        "zone_index": {z: i for i, z in enumerate(header["zones"])},
+        "phase_index": {p: i for i, p in enumerate(header["phases"])},
+        "plant_index": {p: i for i, p in enumerate(header["plants"])},
+    }
+
+def lookup(cal, zone_id, plant_id, phase):
+    """Masque de mois d'une plante pour une zone et une phase (KeyError si inconnue)."""
+    z = cal["zone_index"][zone_id]
+    ph = cal["phase_index"][phase]
+    row = cal["plant_index"][plant_id]
+    _, n_phases, n_plants = cal["shape"]
+    return cal["flat"][(z * n_phases + ph) * n_plants + row]
+
+def plants_in_month(cal, zone_id, phase, month):
+    """Ids des plantes en phase pendant month (1-12) dans la zone : une tranche de la matrice."""
+    z = cal["zone_index"][zone_id]
+    ph = cal["phase_index"][phase]
+    bit = 1 << (month - 1)
+    ids = cal["header"]["plants"]
+    if np is not None:
+        return [ids[i] for i in np.flatnonzero(cal["masks"][z, ph] & bit)]
+    _, n_phases, n_plants = cal["shape"]
+    start = (z * n_phases + ph) * n_plants
+    return [pid for pid, mask in zip(ids, cal["flat"][start:start + n_plants]) if mask & bit]
+
+def is_up_to_date(path, source_hash):
+    """True si path existe, est intègre et a été construit à partir des sources actuelles."""
+    try:
+        cal = read_calendar(path)
+    except (OSError, ValueError):
+        return False
+    return cal["header"]["sources_sha256"] == source_hash
+
+def build_calendar(plants_path=DEFAULT_PLANTS, zones_path=ZONES_JSON, out=OUTPUT_CALENDAR, force=False):
+    """Reconstruit la matrice si les sources ont changé. Renvoie (écrit, nombre de cases)."""
+    source_hash = sources_sha256(plants_path, zones_path)
+    if not force and is_up_to_date(out, source_hash):
+        return False, None
+    shifts = load_zone_shifts(zones_path)
+    matrix, plant_ids = build_matrix(load_catalog(plants_path)["plants"], shifts)
+    written = write_calendar(encode_calendar(matrix, list(shifts), plant_ids, source_hash), out)
+    return written, len(matrix)
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the (zone, phase, plant) month-mask matrix asset")
+    parser.add_argument("--plants", "-p", default=str(DEFAULT_PLANTS), help="Path to plants.json")
+    parser.add_argument("--zones", default=str(ZONES_JSON), help="Path to zones.json")
+    parser.add_argument("--out", "-o", default=str(OUTPUT_CALENDAR), help="Output matrix file")
+    parser.add_argument("--force", action="store_true", help="Rebuild even if the sources did not change")
+    parser.add_argument("--check", action="store_true", help="Only check integrity and freshness (exit 1 if stale)")
+    parser.add_argument("--zone", "-z", help="Print the calendar of a zone (with --plant)")
+    parser.add_argument("--plant", help="Plant id to print")
+    args = parser.parse_args()
+
+    if args.check:
+        try:
+            read_calendar(args.out)
+        except (OSError, ValueError) as e:
+            print(f"ERREUR : {e}")
+            sys.exit(1)
+        if not is_up_to_date(args.out, sources_sha256(args.plants, args.zones)):
+            print(f"{args.out} est périmé : relancer python3 scripts/zone_calendar.py")
+            sys.exit(1)
+        print(f"{args.out} : intègre et à jour")
+        return
+
+    if args.zone or args.plant:
+        if not (args.zone and args.plant):
+            parser.error("--zone and --plant go together")
+        build_calendar(args.plants, args.zones, args.out)
+        cal = read_calendar(args.out)
+        try:
+            for phase in PHASES:
+                months = mask_to_months(lookup(cal, args.zone, args.plant, phase))
+                print(f"{phase:<9} {' '.join(months) or '-'}")
+        except KeyError as e:
+            parser.error(f"unknown zone or plant: {e}")
+        return
+
+    written, cells = build_calendar(args.plants, args.zones, args.out, force=args.force)
+    if cells is None:
+        print(f"{args.out} déjà à jour")
+    else:
+        size = os.path.getsize(args.out)
+        state = "écrit" if written else "inchangé"
+        print(f"{args.out} {state} : {cells} cases, {size / 1024:.1f} Ko")
+
+if __name__ == "__main__":
+    main()
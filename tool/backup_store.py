@@ -0,0 +1,292 @@
+"""
+Content-addressed backup store for the ARB files and the plant data catalogs.
+
+Instead of a full copy per run (intl_xx.arb.<timestamp>.bak, plants.json.bak), every
+version of a file is stored once under its sha256 in .backups/objects, compressed
+with zlib. A version is stored as a line delta against the previous version of the
+same file when that is smaller, with delta chains capped at MAX_DELTA_DEPTH so that
+a read never replays more than a few deltas.
+
+.backups/manifest.json lists the objects and, for each file (path relative to the
+repository root), its versions from oldest to newest. The latest backup of a file
+is the last entry of its list: no glob, no stat. Only the KEEP_VERSIONS newest
+versions of a file are kept: snapshot() drops the older ones and deletes the objects
+nothing refers to anymore; prune() does the same for every file.
+
+Usage:
+  python tool/backup_store.py list [FILE]          # versions of every file / of FILE
+  python tool/backup_store.py restore FILE [SHA]   # restore the latest (or SHA) version
+  python tool/backup_store.py import-bak           # ingest the legacy *.bak files
+  python tool/backup_store.py prune [--keep N]
+
+From another script:
+  from backup_store import snapshot
+  snapshot(path, label='sync_arb')   # before overwriting path
+"""
+
+import os
+import sys
+import glob
+import json
+import zlib
+import struct
+import difflib
+import hashlib
+import argparse
+import datetime
+import threading
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STORE_DIR = os.path.join(REPO_ROOT, '.backups')
+MANIFEST_VERSION = 1
+MAX_DELTA_DEPTH = 8
+KEEP_VERSIONS = 20
+
+# Legacy backups written before the store existed
+LEGACY_PATTERNS = ['lib/l10n/*.arb.*.bak', 'assets/data/**/*.json.bak']
+
+_lock = threading.Lock()  # sync_arb snapshots its targets from a thread pool
+
+
+def file_key(path):
+    """Path relative to the repository root when possible, for a portable manifest."""
+    path = os.path.abspath(path)
+    rel = os.path.relpath(path, REPO_ROOT)
+    return path if rel.startswith('..') else rel.replace(os.sep, '/')
+
+def object_path(sha, store=STORE_DIR):
+    return os.path.join(store, 'objects', sha[:2], sha)
+
+def load_manifest(store=STORE_DIR):
+    try:
+        with open(os.path.join(store, 'manifest.json'), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {}
+    if manifest.get('version') != MANIFEST_VERSION:
+        manifest = {'version': MANIFEST_VERSION, 'objects': {}, 'files': {}}
+    return manifest
+
+def save_manifest(manifest, store=STORE_DIR):
+    write_atomic(os.path.join(store, 'manifest.json'),
+                 json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8'))
+
+def write_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+# --- Deltas: C <start> <end> copies base lines, I <size> <bytes> inserts new ones ---
+
+def make_delta(base, data):
+    a = base.splitlines(keepends=True)
+    b = data.splitlines(keepends=True)
+    out = []
+    for tag, i1, i2, j1, j2 in difflib.SequenceMatcher(None, a, b).get_opcodes():
+        if tag == 'equal':
+            out.append(b'C' + struct.pack('>II', i1, i2))
+        elif j2 > j1:
+            chunk = b''.join(b[j1:j2])
+            out.append(b'I' + struct.pack('>I', len(chunk)) + chunk)
+    return b''.join(out)
+
+def apply_delta(base, delta):
+    lines = base.splitlines(keepends=True)
+    out = []
+    pos = 0
+    while pos < len(delta):
+        op = delta[pos:pos + 1]
+        if op == b'C':
+            start, end = struct.unpack_from('>II', delta, pos + 1)
+            out.extend(lines[start:end])
+            pos += 9
+        else:
+            (size,) = struct.unpack_from('>I', delta, pos + 1)
+            out.append(delta[pos + 5:pos + 5 + size])
+            pos += 5 + size
+    return b''.join(out)
+
+# --- Objects ---
+
+def read_object(sha, manifest, store=STORE_DIR):
+    """Content of a stored version; raises ValueError if it does not match its hash."""
+    with open(object_path(sha, store), 'rb') as f:
+        payload = zlib.decompress(f.read())
+    base = manifest['objects'][sha].get('base')
+    data = apply_delta(read_object(base, manifest, store), payload) if base else payload
+    if hashlib.sha256(data).hexdigest() != sha:
+        raise ValueError(f"Backup object {sha} is corrupt")
+    return data
+
+def store_object(data, base_sha, manifest, store=STORE_DIR):
+    """Stores data once; as a delta against base_sha when it is smaller. Returns its sha256."""
+    sha = hashlib.sha256(data).hexdigest()
+    if sha in manifest['objects']:
+        return sha
+    payload, info = zlib.compress(data, 9), {'size': len(data)}
+    base_info = manifest['objects'].get(base_sha) if base_sha else None
+    if base_info is not None and base_info.get('depth', 0) < MAX_DELTA_DEPTH:
+        delta = zlib.compress(make_delta(read_object(base_sha, manifest, store), data), 9)
+        if len(delta) < len(payload):
+            payload = delta
+            info.update(base=base_sha, depth=base_info.get('depth', 0) + 1)
+    info['stored'] = len(payload)
+    write_atomic(object_path(sha, store), payload)
+    manifest['objects'][sha] = info
+    return sha
+
+# --- Public API ---
+
+def snapshot(path, label=None, store=STORE_DIR, when=None):
+    """
+    Records the current content of path as its newest version (before it is
+    overwritten). Nothing is added when it is identical to the latest version.
+    Returns the sha256 of the content, None if path does not exist.
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        data = f.read()
+    key = file_key(path)
+    with _lock:
+        manifest = load_manifest(store)
+        history = manifest['files'].setdefault(key, [])
+        latest = history[-1]['sha256'] if history else None
+        sha = store_object(data, latest, manifest, store)
+        if sha != latest:
+            when = when or datetime.datetime.now()
+            history.append({'sha256': sha, 'time': when.isoformat(timespec='seconds'), 'label': label})
+            if prune_history(manifest, key, KEEP_VERSIONS):
+                collect_garbage(manifest, store)
+            save_manifest(manifest, store)
+    return sha
+
+def latest_version(path, store=STORE_DIR, manifest=None):
+    """Newest stored version of path ({'sha256', 'time', 'label'}) or None."""
+    manifest = manifest or load_manifest(store)
+    history = manifest['files'].get(file_key(path))
+    return history[-1] if history else None
+
+def read_version(path, sha=None, store=STORE_DIR, manifest=None):
+    """Content of a version of path (the latest, or the one whose sha256 starts with sha), None if there is none."""
+    manifest = manifest or load_manifest(store)
+    history = manifest['files'].get(file_key(path)) or []
+    if sha is not None:
+        history = [e for e in history if e['sha256'].startswith(sha)]
+    if not history:
+        return None
+    return read_object(history[-1]['sha256'], manifest, store)
+
+def restore(path, sha=None, store=STORE_DIR):
+    """Writes a stored version back to path, after snapshotting the current content."""
+    data = read_version(path, sha, store)
+    if data is None:
+        raise KeyError(f"No such backup of {file_key(path)}")
+    snapshot(path, label='restore', store=store)
+    write_atomic(os.path.abspath(path), data)
+    return hashlib.sha256(data).hexdigest()
+
+def prune_history(manifest, key, keep):
+    """Drops all but the `keep` newest versions of key; returns how many were dropped."""
+    history = manifest['files'][key]
+    dropped = max(len(history) - keep, 0)
+    del history[:dropped]
+    return dropped
+
+def collect_garbage(manifest, store=STORE_DIR):
+    """Deletes the objects no version refers to, directly or as a delta base. Returns their number."""
+    live = set()
+    for history in manifest['files'].values():
+        for entry in history:
+            sha = entry['sha256']
+            while sha and sha not in live:  # delta bases stay while a version needs them
+                live.add(sha)
+                sha = manifest['objects'][sha].get('base')
+    dead = [sha for sha in manifest['objects'] if sha not in live]
+    for sha in dead:
+        del manifest['objects'][sha]
+        try:
+            os.remove(object_path(sha, store))
+        except FileNotFoundError:
+            pass
+    return len(dead)
+
+def prune(keep=KEEP_VERSIONS, store=STORE_DIR):
+    """Keeps the `keep` newest versions of each file and deletes unreferenced objects."""
+    with _lock:
+        manifest = load_manifest(store)
+        for key in manifest['files']:
+            prune_history(manifest, key, keep)
+        dead = collect_garbage(manifest, store)
+        save_manifest(manifest, store)
+    return dead
+
+def import_legacy_backups(patterns=LEGACY_PATTERNS, store=STORE_DIR):
+    """Stores the legacy .bak files as versions of the file they back up, oldest first."""
+    found = []
+    for pattern in patterns:
+        found.extend(glob.glob(os.path.join(REPO_ROOT, pattern), recursive=True))
+    found.sort(key=os.path.getmtime)
+    for bak in found:
+        original = bak[:-len('.bak')]
+        stem, _, stamp = original.rpartition('.')
+        if stamp.replace('_', '').isdigit():  # intl_xx.arb.<timestamp>.bak
+            original = stem
+        with open(bak, 'rb') as f:
+            data = f.read()
+        when = datetime.datetime.fromtimestamp(os.path.getmtime(bak))
+        key = file_key(original)
+        with _lock:
+            manifest = load_manifest(store)
+            history = manifest['files'].setdefault(key, [])
+            latest = history[-1]['sha256'] if history else None
+            sha = store_object(data, latest, manifest, store)
+            if sha != latest:
+                history.append({'sha256': sha, 'time': when.isoformat(timespec='seconds'),
+                                'label': 'legacy ' + os.path.basename(bak)})
+                save_manifest(manifest, store)
+    return found
+
+def main():
+    parser = argparse.ArgumentParser(description="Content-addressed backups of ARB and plant data files")
+    sub = parser.add_subparsers(dest='command', required=True)
+    p_list = sub.add_parser('list', help="Show the stored versions")
+    p_list.add_argument('file', nargs='?')
+    p_restore = sub.add_parser('restore', help="Restore a stored version")
+    p_restore.add_argument('file')
+    p_restore.add_argument('sha', nargs='?', help="Version to restore (default: latest)")
+    sub.add_parser('import-bak', help="Ingest the legacy *.bak files (they are left in place)")
+    p_prune = sub.add_parser('prune', help="Drop old versions and unreferenced objects")
+    p_prune.add_argument('--keep', type=int, default=KEEP_VERSIONS)
+    args = parser.parse_args()
+
+    if args.command == 'list':
+        manifest = load_manifest()
+        keys = [file_key(args.file)] if args.file else sorted(manifest['files'])
+        for key in keys:
+            print(key)
+            for entry in reversed(manifest['files'].get(key, [])):
+                info = manifest['objects'][entry['sha256']]
+                kind = f"delta d{info['depth']}" if info.get('base') else 'full'
+                print(f"  {entry['sha256'][:12]}  {entry['time']}  {info['size']:>8} B -> "
+                      f"{info['stored']:>7} B ({kind})  {entry.get('label') or ''}")
+        objects = manifest['objects'].values()
+        print(f"{len(manifest['objects'])} object(s), {sum(o['size'] for o in objects)} B of content "
+              f"stored in {sum(o['stored'] for o in objects)} B")
+    elif args.command == 'restore':
+        try:
+            sha = restore(args.file, args.sha)
+        except (KeyError, ValueError) as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        print(f"Restored {file_key(args.file)} to {sha[:12]}")
+    elif args.command == 'import-bak':
+        found = import_legacy_backups()
+        print(f"Imported {len(found)} legacy backup(s)")
+    elif args.command == 'prune':
+        print(f"Removed {prune(args.keep)} object(s)")
+
+if __name__ == '__main__':
+    main()
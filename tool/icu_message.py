@@ -0,0 +1,213 @@
+"""
+ICU MessageFormat parser for the ARB messages (the subset used by Flutter gen-l10n).
+
+  {name}                               simple placeholder
+  {name, number|date|time[, style]}    formatted placeholder
+  {name, plural|selectordinal, [offset:N] =0{...} one{...} other{...}}
+  {name, select, male{...} other{...}}
+  #                                    the plural number, inside a plural branch
+
+Branches are messages themselves, so plurals and selects nest. l10n.yaml does not
+enable use-escaping, so apostrophes are literal unless escaping=True is passed.
+
+The AST is made of tuples, so it can be shared:
+  ('text', str) | ('pound',) | ('arg', name, type, style)
+  ('choice', name, type, offset, ((selector, nodes), ...))
+
+analyze(text) is memoized on the message string: a message that appears in several
+locales (an untranslated copy of the source, a key shared by two files) is parsed once
+for the whole run.
+
+Usage:
+  from icu_message import analyze, compare_messages
+  info = analyze("{count, plural, =1{1 jour} other{{count} jours}}")
+  info['arguments'], info['icu'], info['error']
+"""
+
+import re
+from functools import lru_cache
+
+CHOICE_TYPES = ('plural', 'selectordinal', 'select')
+FORMAT_TYPES = ('number', 'date', 'time')
+PLURAL_SELECTOR_RE = re.compile(r'=\d+|zero|one|two|few|many|other')
+NAME_RE = re.compile(r'\w+')
+SELECTOR_RE = re.compile(r'[^\s{}]+')
+OFFSET_RE = re.compile(r'offset:\s*(\d+)')
+
+
+def parse_message(text, escaping=False):
+    """AST of text; raises ValueError with the offset of the first syntax error."""
+    nodes, pos = parse_nodes(text, 0, escaping, in_plural=False)
+    if pos < len(text):
+        raise ValueError(f"unbalanced '}}' at offset {pos}")
+    return nodes
+
+def parse_nodes(text, pos, escaping, in_plural):
+    """Nodes up to an unmatched '}' or the end of text. Returns (nodes, position)."""
+    nodes = []
+    buf = []
+    while pos < len(text):
+        c = text[pos]
+        if c == '}':
+            break
+        if c == '{':
+            if buf:
+                nodes.append(('text', ''.join(buf)))
+                buf = []
+            node, pos = parse_argument(text, pos + 1, escaping, in_plural)
+            nodes.append(node)
+            continue
+        if c == '#' and in_plural:
+            if buf:
+                nodes.append(('text', ''.join(buf)))
+                buf = []
+            nodes.append(('pound',))
+        elif c == "'" and escaping:
+            end = quoted_end(text, pos)
+            buf.append("'" if end == pos + 2 else text[pos + 1:end - 1].replace("''", "'"))
+            pos = end
+            continue
+        else:
+            buf.append(c)
+        pos += 1
+    if buf:
+        nodes.append(('text', ''.join(buf)))
+    return tuple(nodes), pos
+
+def quoted_end(text, pos):
+    """End of the quoted literal starting at text[pos] == "'" ('' is a literal quote)."""
+    if text.startswith("''", pos):
+        return pos + 2
+    end = pos + 1
+    while end < len(text):
+        if text[end] == "'":
+            if not text.startswith("''", end):
+                return end + 1
+            end += 1
+        end += 1
+    raise ValueError(f"unterminated quote at offset {pos}")
+
+def skip_spaces(text, pos):
+    while pos < len(text) and text[pos].isspace():
+        pos += 1
+    return pos
+
+def parse_argument(text, pos, escaping, in_plural=False):
+    """Argument after its '{'. Returns (node, position after its '}')."""
+    start = pos - 1
+    pos = skip_spaces(text, pos)
+    m = NAME_RE.match(text, pos)
+    if not m:
+        raise ValueError(f"argument name expected at offset {pos}")
+    name = m.group()
+    pos = skip_spaces(text, m.end())
+    if text.startswith('}', pos):
+        return ('arg', name, None, None), pos + 1
+    if not text.startswith(',', pos):
+        raise ValueError(f"',' or '}}' expected after '{name}' at offset {pos}")
+    pos = skip_spaces(text, pos + 1)
+    m = NAME_RE.match(text, pos)
+    if not m or m.group() not in CHOICE_TYPES + FORMAT_TYPES:
+        raise ValueError(f"unknown argument type for '{name}' at offset {pos}")
+    kind = m.group()
+    pos = skip_spaces(text, m.end())
+
+    if kind in FORMAT_TYPES:
+        style = None
+        if text.startswith(',', pos):
+            end = text.find('}', pos)
+            if end == -1:
+                raise ValueError(f"unterminated argument '{name}' starting at offset {start}")
+            style, pos = text[pos + 1:end].strip(), end
+        if not text.startswith('}', pos):
+            raise ValueError(f"'}}' expected after '{name}' at offset {pos}")
+        return ('arg', name, kind, style), pos + 1
+
+    if not text.startswith(',', pos):
+        raise ValueError(f"options expected for {kind} '{name}' at offset {pos}")
+    pos = skip_spaces(text, pos + 1)
+    offset = 0
+    m = OFFSET_RE.match(text, pos)
+    if m and kind != 'select':
+        offset = int(m.group(1))
+        pos = skip_spaces(text, m.end())
+    branches = []
+    while not text.startswith('}', pos):
+        if pos >= len(text):
+            raise ValueError(f"unterminated {kind} '{name}' starting at offset {start}")
+        m = SELECTOR_RE.match(text, pos)
+        if not m:
+            raise ValueError(f"selector expected in {kind} '{name}' at offset {pos}")
+        selector = m.group()
+        if kind != 'select' and not PLURAL_SELECTOR_RE.fullmatch(selector):
+            raise ValueError(f"invalid {kind} selector '{selector}' at offset {pos}")
+        if any(s == selector for s, _ in branches):
+            raise ValueError(f"duplicate selector '{selector}' in '{name}' at offset {pos}")
+        pos = skip_spaces(text, m.end())
+        if not text.startswith('{', pos):
+            raise ValueError(f"'{{' expected after selector '{selector}' at offset {pos}")
+        # '#' stays the plural number inside a select nested in a plural
+        nodes, pos = parse_nodes(text, pos + 1, escaping, in_plural or kind != 'select')
+        if not text.startswith('}', pos):
+            raise ValueError(f"unterminated branch '{selector}' of '{name}' at offset {pos}")
+        branches.append((selector, nodes))
+        pos = skip_spaces(text, pos + 1)
+    if not any(s == 'other' for s, _ in branches):
+        raise ValueError(f"{kind} '{name}' has no 'other' branch")
+    return ('choice', name, kind, offset, tuple(branches)), pos + 1
+
+def walk(nodes, depth=1):
+    """Yields (node, nesting depth) for every node, branches included."""
+    for node in nodes:
+        yield node, depth
+        if node[0] == 'choice':
+            for _, branch in node[4]:
+                yield from walk(branch, depth + 1)
+
+@lru_cache(maxsize=None)
+def analyze(text, escaping=False):
+    """
+    Summary of a message, memoized on the string:
+      {'ast', 'error', 'arguments': {name: type}, 'icu', 'depth'}
+    type is None for a simple {name}; 'icu' is True when there is a plural/select.
+    On a syntax error, ast is None and error is the message. The dict is shared
+    between callers: read it, do not modify it.
+    """
+    try:
+        ast = parse_message(text, escaping)
+    except ValueError as e:
+        return {'ast': None, 'error': str(e), 'arguments': {}, 'icu': False, 'depth': 0}
+    arguments = {}
+    depth = 0
+    for node, level in walk(ast):
+        if node[0] in ('arg', 'choice'):
+            arguments.setdefault(node[1], node[2])
+            depth = max(depth, level)
+    icu = any(t in CHOICE_TYPES for t in arguments.values())
+    return {'ast': ast, 'error': None, 'arguments': arguments, 'icu': icu, 'depth': depth}
+
+def has_arguments(value):
+    """True for a message string with at least one argument (or that does not parse)."""
+    if not isinstance(value, str) or '{' not in value:
+        return False
+    info = analyze(value)
+    return bool(info['arguments']) or info['error'] is not None
+
+def compare_messages(source, target):
+    """Placeholder problems of a translation against its source message, as strings."""
+    src, tgt = analyze(source), analyze(target)
+    if src['error']:
+        return [f"source does not parse: {src['error']}"]
+    if tgt['error']:
+        return [f"does not parse: {tgt['error']}"]
+    problems = []
+    missing = [n for n in src['arguments'] if n not in tgt['arguments']]
+    extra = [n for n in tgt['arguments'] if n not in src['arguments']]
+    if missing:
+        problems.append(f"missing placeholder(s) {', '.join(missing)}")
+    if extra:
+        problems.append(f"unknown placeholder(s) {', '.join(extra)}")
+    for name, kind in src['arguments'].items():
+        if name in tgt['arguments'] and tgt['arguments'][name] != kind:
+            problems.append(f"'{name}' is {kind or 'simple'} in the source, {tgt['arguments'][name] or 'simple'} here")
+    return problems
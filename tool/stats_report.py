@@ -1,9 +1,10 @@
 import json
 import os
-import glob
 import collections
 
-BASE_DIR = r"c:\Users\roman\Documents\apppklod\permacalendarv2\lib\l10n"
+from backup_store import load_manifest, latest_version, read_version
+
+BASE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "lib", "l10n")
 FILES = ["intl_en.arb", "intl_de.arb", "intl_es.arb", "intl_it.arb", "intl_pt.arb"]
 
 def load_keys(path):
@@ -12,18 +13,20 @@ def load_keys(path):
         data = json.load(f, object_pairs_hook=collections.OrderedDict)
         return set(data.keys())
 
+def parse_keys(content):
+    data = json.loads(content.decode('utf-8'), object_pairs_hook=collections.OrderedDict)
+    return set(data.keys())
+
 stats = []
+manifest = load_manifest()  # latest backup of each file: one manifest lookup (tool/backup_store.py)
 
 for filename in FILES:
     current_path = os.path.join(BASE_DIR, filename)
-    backups = glob.glob(os.path.join(BASE_DIR, f"{filename}.*.bak"))
-    backups.sort(key=os.path.getmtime, reverse=True)
-    
-    backup_path = backups[0] if backups else None
+    backup = latest_version(current_path, manifest=manifest)
     
     pre_keys_count = 0
-    if backup_path:
-        pre_keys = load_keys(backup_path)
+    if backup:
+        pre_keys = parse_keys(read_version(current_path, backup['sha256'], manifest=manifest))
         pre_keys_count = len(pre_keys)
     
     post_keys = load_keys(current_path)
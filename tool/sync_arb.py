@@ -1,14 +1,16 @@
 import json
 import os
-import shutil
 import collections
 import argparse
-import datetime
 import csv
 import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+from backup_store import snapshot
+from icu_message import has_arguments, compare_messages
 
 # Configuration
-BASE_DIR = r"c:\Users\roman\Documents\apppklod\permacalendarv2\lib\l10n"
+BASE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "lib", "l10n")
 SOURCE_FILE = os.path.join(BASE_DIR, "intl_fr.arb")
 TARGET_FILES = [
     os.path.join(BASE_DIR, "intl_en.arb"),
@@ -36,15 +38,118 @@ def calculate_hash(path):
     return sha256_hash.hexdigest()
 
 def check_icu_syntax(value):
-    """Simple check for ICU syntax usage like plurals or selects."""
-    if isinstance(value, str):
-        if "{count, plural," in value or "{select," in value or "{" in value:
-             return True
-    return False
+    """True when the message has placeholders or ICU plural/select syntax (or does not parse)."""
+    return has_arguments(value)
+
+def index_source(source_data):
+    """
+    Everything the targets need from the source, computed once: key order (metadata
+    keys included), message keys, a preview and the ICU flag of each key.
+    """
+    keys = [k for k in source_data if k != "@@locale"]
+    return {
+        "data": source_data,
+        "keys": keys,
+        "message_keys": frozenset(k for k in keys if not k.startswith("@")),
+        "previews": {k: str(source_data[k])[:50].replace("\n", " ") for k in keys},
+        "icu": {k: not k.startswith("@") and check_icu_syntax(source_data[k]) for k in keys},
+        "has_locale": "@@locale" in source_data,
+    }
+
+def sync_target(target_path, source, dry_run=False):
+    """
+    Syncs one target against the indexed source. The file (and its backup) is only
+    written when its content changes, i.e. when keys were added. Log lines are
+    returned with the result, so that concurrent targets print in a stable order.
+    """
+    name = os.path.basename(target_path)
+    lang_code = name.replace("intl_", "").replace(".arb", "")
+    result = {"file": name, "log": [], "report": [], "csv_rows": [], "saved": False}
+    log = result["log"].append
+
+    if not os.path.exists(target_path):
+        log(f"Warning: Target file {target_path} not found. Skipping.")
+        return result
+
+    target_data = load_arb(target_path)
+    new_target_data = collections.OrderedDict()
+
+    # Preserve @@locale
+    if "@@locale" in target_data:
+        new_target_data["@@locale"] = target_data["@@locale"]
+    elif source["has_locale"]:
+         # Try to smart-guess or just use filename code
+         new_target_data["@@locale"] = lang_code
+
+    # Check integrity before
+    missing_count_before = len(source["message_keys"].difference(target_data))
+    added_count = 0
+    source_data = source["data"]
+
+    # LOGIC:
+    # 1. If key exists in target, KEEP IT (Strict non-destructive)
+    # 2. If key is missing, COPY FROM SOURCE (metadata keys included)
+    for key in source["keys"]:
+        if key in target_data:
+            new_target_data[key] = target_data[key]
+            if key in source["message_keys"] and isinstance(target_data[key], str) \
+                    and isinstance(source_data[key], str):
+                problems = compare_messages(source_data[key], target_data[key])
+                if problems:
+                    detail = "; ".join(problems)
+                    log(f"  [WARNING] Key '{key}' placeholders differ from the source: {detail}")
+                    result["report"].append({
+                        "file": name,
+                        "key": key,
+                        "action": "Placeholder mismatch",
+                        "value_preview": detail,
+                        "icu_warning": True
+                    })
+                    result["csv_rows"].append([name, key, "Placeholder mismatch", detail, "YES"])
+            continue
+
+        new_target_data[key] = source_data[key]
+        added_count += 1
+        value_preview = source["previews"][key]
+        icu_warning = source["icu"][key]
+        if icu_warning:
+            log(f"  [WARNING] Added key '{key}' contains potential ICU/Placeholder syntax.")
+
+        result["report"].append({
+            "file": name,
+            "key": key,
+            "action": "Added",
+            "value_preview": value_preview,
+            "icu_warning": icu_warning
+        })
+        result["csv_rows"].append([name, key, "Added", value_preview, "YES" if icu_warning else ""])
+
+    log(f"  - Missing before: {missing_count_before}")
+    log(f"  - Added: {added_count}")
+
+    # Same keys, same order, same values: the file is already in sync
+    if list(new_target_data.items()) == list(target_data.items()):
+        log(f"  [Unchanged] {name} is up to date")
+    elif dry_run:
+        log(f"  [Dry-Run] Would save {name}")
+    else:
+        sha = snapshot(target_path, label="sync_arb")
+        log(f"  [Backup] Stored {name} as {sha[:12]} (tool/backup_store.py)")
+        save_arb(target_path, new_target_data)
+        result["saved"] = True
+        log(f"  [Saved] Updated {name}")
+    return result
+
+def sync_all(source_path=SOURCE_FILE, target_paths=TARGET_FILES, dry_run=False, workers=None):
+    """Parses the source once and syncs every target in a thread pool. Returns the results in target order."""
+    source = index_source(load_arb(source_path))
+    with ThreadPoolExecutor(max_workers=workers or len(target_paths) or 1) as pool:
+        return list(pool.map(lambda path: sync_target(path, source, dry_run), target_paths))
 
 def main():
     parser = argparse.ArgumentParser(description="Synchronize ARB files with intl_fr.arb as source.")
     parser.add_argument("--dry-run", action="store_true", help="Preview changes without modifying files.")
+    parser.add_argument("--workers", type=int, default=None, help="Threads used for the targets (default: one per target).")
     args = parser.parse_args()
 
     print(f"Loading source: {SOURCE_FILE}")
@@ -52,103 +157,17 @@ def main():
         print(f"Error: Source file {SOURCE_FILE} not found.")
         return
 
-    source_data = load_arb(SOURCE_FILE)
-    source_keys = list(source_data.keys())
-    
+    results = sync_all(dry_run=args.dry_run, workers=args.workers)
+
     report_data = [] # List of dicts for report
-    
     csv_rows = []
     csv_rows.append(["File", "Key", "Action", "Value Preview", "ICU Warning"])
-
-    for target_path in TARGET_FILES:
-        lang_code = os.path.basename(target_path).replace("intl_", "").replace(".arb", "")
-        print(f"\nProcessing {os.path.basename(target_path)}...")
-        
-        if not os.path.exists(target_path):
-            print(f"Warning: Target file {target_path} not found. Skipping.")
-            continue
-
-        target_data = load_arb(target_path)
-        
-        # 1. Backup if not dry-run
-        if not args.dry_run:
-            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_path = f"{target_path}.{timestamp}.bak"
-            shutil.copy2(target_path, backup_path)
-            print(f"  [Backup] Created {os.path.basename(backup_path)}")
-
-        new_target_data = collections.OrderedDict()
-        
-        # Preserve @@locale
-        if "@@locale" in target_data:
-            new_target_data["@@locale"] = target_data["@@locale"]
-        elif "@@locale" in source_data:
-             # Try to smart-guess or just use filename code
-             new_target_data["@@locale"] = lang_code 
-
-        added_count = 0
-        missing_count_before = 0
-        
-        # Check integrity before
-        target_keys_set = set(target_data.keys())
-        source_keys_set = set(k for k in source_keys if not k.startswith("@"))
-        missing_keys = source_keys_set - target_keys_set
-        missing_count_before = len(missing_keys)
-
-        for key in source_keys:
-            if key == "@@locale": continue
-            
-            # Identify if it is a metadata key
-            is_meta = key.startswith("@")
-            real_key = key[1:] if is_meta else key
-
-            # LOGIC:
-            # 1. If key exists in target, KEEP IT (Strict non-destructive)
-            # 2. If key is missing, COPY FROM SOURCE
-            # 3. If meta key matches an added real key, copy it.
-            # 4. If meta key is missing for an EXISTING real key, copy it (optional, good for consistency)
-            
-            action = "Skipped (Exists)"
-            value_preview = ""
-            icu_warning = False
-
-            if key in target_data:
-                new_target_data[key] = target_data[key]
-                # No action needed
-            else:
-                # Key MISSING in target
-                
-                # Special case: don't copy orphaned metadata if we didn't have the parent key? 
-                # Actually, if we are iterating source order, we reach real key first usually or we just copy everything missing.
-                
-                val = source_data[key]
-                new_target_data[key] = val
-                added_count += 1
-                action = "Added"
-                value_preview = str(val)[:50].replace("\n", " ")
-                
-                if not is_meta and check_icu_syntax(val):
-                    icu_warning = True
-                    print(f"  [WARNING] Added key '{key}' contains potential ICU/Placeholder syntax.")
-
-                report_item = {
-                    "file": os.path.basename(target_path),
-                    "key": key,
-                    "action": action,
-                    "value_preview": value_preview,
-                    "icu_warning": icu_warning
-                }
-                report_data.append(report_item)
-                csv_rows.append([os.path.basename(target_path), key, action, value_preview, "YES" if icu_warning else ""])
-
-        print(f"  - Missing before: {missing_count_before}")
-        print(f"  - Added: {added_count}")
-        
-        if not args.dry_run:
-            save_arb(target_path, new_target_data)
-            print(f"  [Saved] Updated {os.path.basename(target_path)}")
-        else:
-            print(f"  [Dry-Run] Would save {os.path.basename(target_path)}")
+    for result in results:
+        print(f"\nProcessing {result['file']}...")
+        for line in result["log"]:
+            print(line)
+        report_data.extend(result["report"])
+        csv_rows.extend(result["csv_rows"])
 
     # Write Reports
     report_file_json = "sync_report.json"
@@ -161,8 +180,9 @@ def main():
         writer = csv.writer(f)
         writer.writerows(csv_rows)
         
+    saved = sum(1 for r in results if r["saved"])
     print(f"\nReports generated: {report_file_json}, {report_file_csv}")
-    print("Synchronization process finished.")
+    print(f"Synchronization process finished ({saved}/{len(results)} file(s) rewritten).")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,430 @@
+"""
+Translation coverage of the ARB files and of the plant catalogs, as bitsets.
+
+Two matrices are built in one pass over the files, each one locale x key:
+  arb     lib/l10n/intl_<locale>.arb, keys are the message keys
+          (source: intl_fr.arb, field: the key prefix before the first '_')
+  plants  assets/data/json_multilangue_doc/plants_<locale>.json, keys are
+          '<plant id>/<field path>' for every leaf of every plant, nested objects
+          included and lists taken as one value, like scripts/audit_script.py
+          (source: plants.json, field: the field path)
+
+For each locale, `present` and `translated` are Python ints used as bitsets over the
+key index: bit i of present is set when key i has a non-empty value, bit i of
+translated when it is present and, if the key needs translation, differs from the
+source (an untranslated copy of the French text is present but not translated).
+Whether a key needs translation is decided from its source value alone, never from
+how far the other locales have got: text does, except code vocabularies (month
+abbreviations, enum tokens and identifiers, file paths, quantities like '14 days',
+conditions like 'humidity > 75', Latin family names), the catalog fields of
+CATALOG_DATA_FIELDS (scientific names, units, month lists...) and, for a locale, the
+words of COGNATES spelled the same in it ('Total' everywhere, 'Description' in en).
+Keys the source has no value for are left out, keys it does not have are kept apart
+as extras. With a duplicated plant id, the last copy wins, as in PlantHiveRepository.
+
+Queries are a few big-int operations plus a popcount: "missing in any locale",
+"percent translated per field" and the like take microseconds once the matrix is
+built.
+
+Usage:
+  python tool/translation_coverage.py                  # compact report
+  python tool/translation_coverage.py --missing de     # keys missing in de
+  python tool/translation_coverage.py --fields --json coverage.json
+  python tool/translation_coverage.py --verify         # bitsets against plain sets
+"""
+
+import os
+import re
+import sys
+import glob
+import json
+import time
+import argparse
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ARB_DIR = os.path.join(REPO_ROOT, "lib", "l10n")
+CATALOG_DIR = os.path.join(REPO_ROOT, "assets", "data", "json_multilangue_doc")
+SOURCE_CATALOG = os.path.join(REPO_ROOT, "assets", "data", "plants.json")
+SOURCE_LOCALE = "fr"
+
+ARB_RE = re.compile(r"intl_([a-z]{2}(?:_[A-Z]{2})?)\.arb$")
+CATALOG_RE = re.compile(r"plants_([a-z]{2})\.json$")
+
+# Values that are the same in every locale by design
+MONTH_CODES = {"Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"}
+CODE_RE = re.compile(
+    r"[^\W\d]\w*(?:_\w+)+"                                           # enum, identifier: SUN_FULL, no_rain_3_days
+    r"|\S*/\S*|[\w.-]+\.(?:png|jpe?g|webp|svg|json)"                 # path, URL, file name
+    r"|\d+(?:[.,]\d+)?(?:\s*-\s*\d+(?:[.,]\d+)?)?\s*[^\W\d]{0,6}"      # quantity: 14 days, 6.0-7.0
+    r"|\w+\s*[<>=!]=?\s*[\w.]+"                                      # condition: humidity > 75
+    r"|[A-Z][a-z]+aceae"                                              # Latin family name
+)
+PLACEHOLDER_RE = re.compile(r"\{\w+\}")
+# Source words spelled the same in a target language ('*': in all of them, with the
+# languages' own names); compared without placeholders, trailing ':' or '...'
+COGNATES = {
+    "*": {"Auto", "Antiox", "cm", "h", "kg", "Max", "Max DRI (%)", "Min", "min", "Min DRI (%)",
+          "Normal", "PDF", "Pos X", "Pos Y", "Sowing", "Total", "TOTAL", "Tropical", "Zoom",
+          "Deutsch", "English", "Español", "Français", "Italiano", "Português (Brasil)"},
+    "de": {"Aubergine", "Export", "EXPORT", "Optimal", "Tomate", "Version"},
+    "en": {"Application", "Attention", "Calcium", "Calibration", "Calories", "DATA", "Date",
+           "Description", "Endive", "Ex: 10.5", "ex: 4.50", "Export", "EXPORT", "Germination",
+           "Image", "Important", "Lupin", "Maintenance", "Melon", "minutes", "Modules", "Notes",
+           "Notes & Associations", "Notification", "Notifications", "NUTRITION", "Optimal",
+           "Potassium", "Reset Image Defaults", "Type", "Urgent", "Version", "Zinc"},
+    "es": {"Tomate", "Total disponible", "Zinc"},
+    "it": {"Bok choy"},
+    "pt": {"Ex: 10.5", "ex: 4.50", "Tomate", "Volume Total"},
+}
+# Catalog fields holding data rather than text
+CATALOG_DATA_FIELDS = re.compile(
+    r"scientificName|defaultUnit|image|metadata\..+|referenceProfile\..+|zoneProfiles\..+"
+    r"|(?:sowing|planting|harvest)Months3?|notificationSettings\.\w+\.(?:conditions|frequency)"
+)
+
+
+# --- Entries: {key: value} for one locale ---
+
+def arb_entries(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return {k: v for k, v in data.items() if not k.startswith("@")}
+
+def flatten(value, prefix, out):
+    if isinstance(value, dict):
+        for k, v in value.items():
+            flatten(v, f"{prefix}.{k}" if prefix else k, out)
+    else:
+        out[prefix] = value
+
+def catalog_entries(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    plants = data.get("plants", []) if isinstance(data, dict) else data
+    by_id = {}
+    for plant in plants:
+        if isinstance(plant, dict) and "id" in plant:
+            by_id[plant["id"]] = plant  # last copy of a duplicated id wins
+    entries = {}
+    for pid, plant in by_id.items():
+        leaves = {}
+        flatten({k: v for k, v in plant.items() if k != "id"}, "", leaves)
+        entries.update((f"{pid}/{field}", v) for field, v in leaves.items())
+    return entries
+
+def arb_field(key):
+    return key.split("_", 1)[0]
+
+def catalog_field(key):
+    return key.split("/", 1)[1]
+
+# --- Bitsets ---
+
+def is_empty(value):
+    return value is None or value == "" or value == [] or value == {}
+
+def is_text(value):
+    return isinstance(value, str) or (isinstance(value, list) and any(isinstance(v, str) for v in value))
+
+def bare_text(value):
+    """'{cm} cm' -> 'cm', 'Date: {date}' -> 'Date', 'Description...' -> 'Description'."""
+    return PLACEHOLDER_RE.sub("", value).strip().rstrip(".:").strip()
+
+def is_cognate(value, locale="*"):
+    """True for a source string spelled the same in locale (in every locale for '*')."""
+    if not isinstance(value, str):
+        return False
+    text = bare_text(value)
+    words = COGNATES["*"] | COGNATES.get(locale, set())
+    return text in words or text.strip("()") in words
+
+def is_code(value):
+    """True for a code vocabulary value or a common cognate (or a list of them), never translated."""
+    if isinstance(value, list):
+        return all(is_code(v) for v in value if isinstance(v, str))
+    text = bare_text(value)
+    return not text or text in MONTH_CODES or is_cognate(value) or CODE_RE.fullmatch(text) is not None
+
+def needs_translation(value):
+    return is_text(value) and not is_code(value)
+
+def to_mask(indexes, size):
+    """int with the given bits set (built through a byte buffer rather than one shift per bit)."""
+    buf = bytearray((size + 7) // 8)
+    for i in indexes:
+        buf[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(buf, "little")
+
+def iter_bits(mask):
+    """Indexes of the set bits, lowest first."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+def popcount(mask):
+    return mask.bit_count() if hasattr(mask, "bit_count") else bin(mask).count("1")
+
+def build_matrix(locales, source_locale, field_of, data_fields=None):
+    """
+    locales: {locale: {key: value}}, the source locale included; data_fields, a regex
+    of the fields that are never translated.
+    Returns {'keys', 'index', 'locales', 'source', 'all', 'present', 'translated',
+             'extra', 'fields'}; the masks are over the keys the source has a value for.
+    """
+    source = locales[source_locale]
+    keys = [k for k, v in source.items() if not is_empty(v)]
+    size = len(keys)
+    field_indexes = {}
+    for i, key in enumerate(keys):
+        field_indexes.setdefault(field_of(key), []).append(i)
+    matrix = {
+        "keys": keys,
+        "index": {k: i for i, k in enumerate(keys)},
+        "locales": sorted(locales),
+        "source": source_locale,
+        "all": (1 << size) - 1,
+        "present": {},
+        "translated": {},
+        "extra": {},
+        "fields": {f: to_mask(idx, size) for f, idx in field_indexes.items()},
+    }
+    differs = {}
+    for locale, entries in sorted(locales.items()):
+        present = [i for i, k in enumerate(keys) if k in entries and not is_empty(entries[k])]
+        matrix["present"][locale] = to_mask(present, size)
+        differs[locale] = to_mask((i for i in present if entries[keys[i]] != source[keys[i]]), size)
+        matrix["extra"][locale] = [k for k in entries if k not in source]
+
+    to_translate = to_mask((i for i, k in enumerate(keys) if needs_translation(source[k])), size)
+    if data_fields is not None:
+        for field, scope in matrix["fields"].items():
+            if data_fields.fullmatch(field):
+                to_translate &= ~scope
+    matrix["to_translate"] = to_translate
+    for locale, present in matrix["present"].items():
+        cognates = to_mask((i for i, k in enumerate(keys) if is_cognate(source[k], locale)), size)
+        pending = 0 if locale == source_locale else to_translate & ~differs[locale] & ~cognates
+        matrix["translated"][locale] = present & ~pending
+    return matrix
+
+def load_entries(arb_dir=ARB_DIR, catalog_dir=CATALOG_DIR, source_catalog=SOURCE_CATALOG):
+    """{'arb': {locale: entries}, 'plants': {locale: entries}}, each file read once."""
+    arb = {}
+    for path in sorted(glob.glob(os.path.join(arb_dir, "intl_*.arb"))):
+        m = ARB_RE.search(os.path.basename(path))
+        if m:
+            arb[m.group(1)] = arb_entries(path)
+    plants = {SOURCE_LOCALE: catalog_entries(source_catalog)}
+    for path in sorted(glob.glob(os.path.join(catalog_dir, "plants_*.json"))):
+        m = CATALOG_RE.search(os.path.basename(path))
+        if m and m.group(1) != SOURCE_LOCALE:
+            plants[m.group(1)] = catalog_entries(path)
+    return {"arb": arb, "plants": plants}
+
+def load_coverage(entries=None):
+    """Both matrices: {'arb': matrix, 'plants': matrix}."""
+    entries = entries or load_entries()
+    coverage = {}
+    if SOURCE_LOCALE in entries["arb"]:
+        coverage["arb"] = build_matrix(entries["arb"], SOURCE_LOCALE, arb_field)
+    coverage["plants"] = build_matrix(entries["plants"], SOURCE_LOCALE, catalog_field, CATALOG_DATA_FIELDS)
+    return coverage
+
+# --- Queries ---
+
+def missing_mask(matrix, locale=None, translated=False):
+    """Keys missing in locale (in any target locale when locale is None), as a bitset."""
+    masks = matrix["translated" if translated else "present"]
+    if locale is not None:
+        return matrix["all"] & ~masks[locale]
+    covered_everywhere = matrix["all"]
+    for loc in matrix["locales"]:
+        if loc != matrix["source"]:
+            covered_everywhere &= masks[loc]
+    return matrix["all"] & ~covered_everywhere
+
+def missing_keys(matrix, locale=None, translated=False):
+    keys = matrix["keys"]
+    return [keys[i] for i in iter_bits(missing_mask(matrix, locale, translated))]
+
+def coverage(matrix, locale, field=None, translated=False):
+    """(covered keys, total keys) for locale, over one field or all of them."""
+    scope = matrix["fields"][field] if field is not None else matrix["all"]
+    mask = matrix["translated" if translated else "present"][locale]
+    return popcount(mask & scope), popcount(scope)
+
+def field_coverage(matrix, locale, translated=True):
+    """{field: percent} for locale."""
+    result = {}
+    for field, scope in matrix["fields"].items():
+        total = popcount(scope)
+        mask = matrix["translated" if translated else "present"][locale]
+        result[field] = 100.0 * popcount(mask & scope) / total if total else 100.0
+    return result
+
+def percent(done, total):
+    return 100.0 * done / total if total else 100.0
+
+# --- Verification ---
+
+def plain_translated(locales, source_locale, field_of, data_fields=None):
+    """{locale: set of translated keys}, computed with plain dicts and sets, key by key."""
+    source = locales[source_locale]
+    result = {}
+    for locale, entries in locales.items():
+        done = set()
+        for key, value in source.items():
+            if is_empty(value) or key not in entries or is_empty(entries[key]):
+                continue
+            needs = (needs_translation(value) and not is_cognate(value, locale)
+                     and not (data_fields and data_fields.fullmatch(field_of(key))))
+            if locale == source_locale or not needs or entries[key] != value:
+                done.add(key)
+        result[locale] = done
+    return result
+
+def verify(entries=None):
+    """
+    Checks the bitset queries against plain_translated: keys missing (present and
+    translated) per locale and in any locale, and the en coverage of harvestMonths3,
+    whose month codes must not count as untranslated copies. Also checks that a new
+    string only en has translated yet is missing, not translated, in the others.
+    Returns the problems.
+    """
+    entries = entries or load_entries()
+    cov = load_coverage(entries)
+    problems = []
+    plain = {}
+    domains = {"arb": (arb_field, None), "plants": (catalog_field, CATALOG_DATA_FIELDS)}
+    for name, matrix in cov.items():
+        locales = entries[name]
+        keys = set(matrix["keys"])
+        translated = plain[name] = plain_translated(locales, matrix["source"], *domains[name])
+        present = {loc: {k for k in keys if k in e and not is_empty(e[k])} for loc, e in locales.items()}
+        for kind, sets in (("present", present), ("translated", translated)):
+            flag = kind == "translated"
+            for locale in matrix["locales"]:
+                if set(missing_keys(matrix, locale, flag)) != keys - sets[locale]:
+                    problems.append(f"{name}: {kind} keys of {locale} differ from the set computation")
+            any_missing = set()
+            for locale in matrix["locales"]:
+                if locale != matrix["source"]:
+                    any_missing |= keys - sets[locale]
+            if set(missing_keys(matrix, None, flag)) != any_missing:
+                problems.append(f"{name}: {kind} keys missing in any locale differ from the set computation")
+
+    plants = cov["plants"]
+    if "en" in plants["present"] and "harvestMonths3" in plants["fields"]:
+        field_keys = {k for k in plants["keys"] if catalog_field(k) == "harvestMonths3"}
+        expected = percent(len(field_keys & plain["plants"]["en"]), len(field_keys))
+        got = field_coverage(plants, "en")["harvestMonths3"]
+        if abs(got - expected) > 1e-9:
+            problems.append(f"plants: en harvestMonths3 is {got:.1f}% translated, {expected:.1f}% with sets")
+        present_pct = field_coverage(plants, "en", translated=False)["harvestMonths3"]
+        if got != present_pct:
+            problems.append(f"plants: en harvestMonths3 month codes counted as untranslated "
+                            f"({got:.1f}% translated, {present_pct:.1f}% present)")
+
+    fresh = {"fr": {"new_key": "Nouveau texte"}, "en": {"new_key": "New text"},
+             "de": {"new_key": "Nouveau texte"}, "es": {"new_key": "Nouveau texte"}}
+    if missing_keys(build_matrix(fresh, "fr", arb_field), "de", translated=True) != ["new_key"]:
+        problems.append("a French copy counts as translated because few locales translate the key")
+    return problems
+
+# --- Report ---
+
+def summary(matrix):
+    rows = []
+    for locale in matrix["locales"]:
+        present, total = coverage(matrix, locale)
+        translated, _ = coverage(matrix, locale, translated=True)
+        rows.append({
+            "locale": locale,
+            "keys": total,
+            "present": present,
+            "translated": translated,
+            "present_pct": round(percent(present, total), 1),
+            "translated_pct": round(percent(translated, total), 1),
+            "extra": len(matrix["extra"][locale]),
+        })
+    return rows
+
+def print_report(cov, show_fields=False, field_limit=5):
+    for name, matrix in cov.items():
+        print(f"{name}: {len(matrix['keys'])} keys x {len(matrix['locales'])} locales "
+              f"(source {matrix['source']}), missing in some locale: {popcount(missing_mask(matrix))}")
+        print(f"  {'locale':<7}{'present':>16}{'translated':>18}{'extra':>8}")
+        for row in summary(matrix):
+            print(f"  {row['locale']:<7}{row['present']:>8} {row['present_pct']:6.1f}%"
+                  f"{row['translated']:>10} {row['translated_pct']:6.1f}%{row['extra']:>8}")
+        if show_fields:
+            for locale in matrix["locales"]:
+                if locale == matrix["source"]:
+                    continue
+                worst = sorted(field_coverage(matrix, locale).items(), key=lambda kv: (kv[1], kv[0]))[:field_limit]
+                print(f"  {locale} least translated fields: "
+                      + ", ".join(f"{f} {pct:.0f}%" for f, pct in worst))
+
+def time_queries(cov, repeat=1000):
+    """Average time of one 'missing in any locale' + one per-locale coverage query, in microseconds."""
+    matrix = cov["plants"]
+    locale = next(l for l in matrix["locales"] if l != matrix["source"])
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        popcount(missing_mask(matrix))
+        coverage(matrix, locale, translated=True)
+    return (time.perf_counter() - t0) / repeat * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description="Translation coverage of the ARB files and plant catalogs")
+    parser.add_argument("--missing", metavar="LOCALE", nargs="?", const="*",
+                        help="List the keys missing in LOCALE (in any locale without a value)")
+    parser.add_argument("--domain", choices=["arb", "plants"], help="Only this matrix for --missing")
+    parser.add_argument("--untranslated", action="store_true", help="With --missing: count untranslated copies as missing")
+    parser.add_argument("--fields", action="store_true", help="Show the least translated fields per locale")
+    parser.add_argument("--json", help="Write the summary (and per-field coverage) to this file")
+    parser.add_argument("--verify", action="store_true", help="Check the bitset queries against plain set computations")
+    args = parser.parse_args()
+
+    if args.verify:
+        problems = verify()
+        for problem in problems:
+            print(f"MISMATCH {problem}")
+        print("Coverage verified." if not problems else f"{len(problems)} mismatch(es).")
+        if problems:
+            sys.exit(1)
+        return
+
+    t0 = time.perf_counter()
+    cov = load_coverage()
+    build_ms = (time.perf_counter() - t0) * 1000
+
+    if args.missing:
+        locale = None if args.missing == "*" else args.missing
+        for name, matrix in cov.items():
+            if args.domain and name != args.domain:
+                continue
+            if locale is not None and locale not in matrix["present"]:
+                print(f"{name}: no locale '{locale}'")
+                continue
+            keys = missing_keys(matrix, locale, args.untranslated)
+            print(f"{name}: {len(keys)} key(s)")
+            for key in keys:
+                print(f"  {key}")
+        return
+
+    print_report(cov, args.fields)
+    print(f"Matrices built in {build_ms:.0f} ms; a query takes {time_queries(cov):.1f} us")
+    if args.json:
+        out = {name: {"summary": summary(m),
+                      "fields": {loc: {f: round(p, 1) for f, p in field_coverage(m, loc).items()}
+                                 for loc in m["locales"] if loc != m["source"]},
+                      "extra": {loc: keys for loc, keys in m["extra"].items() if keys}}
+               for name, m in cov.items()}
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(out, f, indent=2, ensure_ascii=False)
+        print(f"Coverage written to {args.json}")
+
+if __name__ == "__main__":
+    main()
@@ -1,86 +1,202 @@
-import json
+"""
+Validates every lib/l10n/intl_*.arb file, in parallel (one process per file).
+
+Each check produces findings {file, key, rule, severity, message}:
+  file_missing, json_invalid, locale_missing, icu_syntax           error
+  metadata_missing, placeholder_undeclared, placeholder_mismatch   warning
+  icu_message                                                      info
+
+They are written as JSON (validation_results.json), as JUnit XML for CI
+(validation_results.xml: one testsuite per file, one testcase per rule) and as the
+readable validation_results.txt. The exit code is 1 when there is an error (or a
+warning, with --strict).
+
+Usage:
+  python tool/validate_arb.py
+  python tool/validate_arb.py --strict --junit build/arb.xml
+"""
+
 import os
-import re
+import sys
+import glob
+import json
+import time
+import argparse
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
 
-BASE_DIR = r"c:\Users\roman\Documents\apppklod\permacalendarv2\lib\l10n"
-FILES = [
-    "intl_en.arb", "intl_de.arb", "intl_es.arb", "intl_it.arb", "intl_pt.arb"
-]
+from icu_message import analyze, compare_messages
+
+BASE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "lib", "l10n")
+SOURCE_FILE = "intl_fr.arb"
+
+RULES = {
+    "file_missing": "error",
+    "json_invalid": "error",
+    "locale_missing": "error",
+    "icu_syntax": "error",
+    "metadata_missing": "warning",
+    "placeholder_undeclared": "warning",
+    "placeholder_mismatch": "warning",
+    "icu_message": "info",
+}
 
 def check_icu_syntax(value):
-    """Robust ICU syntax detection."""
-    if not isinstance(value, str): return False
-    # Look for {variable, plural/select, ...}
-    # Matches: { count, plural, ... } or { gender, select, ... }
-    # Relaxed regex to catch more: \{[^,]+,\s*(plural|select)
-    return bool(re.search(r'\{[^,]+,\s*(plural|select)', value))
-
-def validate_file(filename, output_file):
-    path = os.path.join(BASE_DIR, filename)
-    output_file.write(f"\nValidating {filename}...\n")
-    
+    """ICU plural/select detection, nested ones included (tool/icu_message.py)."""
+    if not isinstance(value, str) or "{" not in value: return False
+    return analyze(value)["icu"]
+
+def arb_files(base_dir=BASE_DIR):
+    return sorted(os.path.basename(p) for p in glob.glob(os.path.join(base_dir, "intl_*.arb")))
+
+def load_source(base_dir=BASE_DIR):
+    """Messages of the FR template, to compare each target's placeholders with."""
+    path = os.path.join(base_dir, SOURCE_FILE)
     if not os.path.exists(path):
-        output_file.write(f"  [ERROR] File not found: {path}\n")
-        return
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return {k: v for k, v in data.items() if not k.startswith("@") and isinstance(v, str)}
+
+def finding(filename, key, rule, message):
+    return {"file": filename, "key": key, "rule": rule, "severity": RULES[rule], "message": message}
+
+def validate_file(filename, source=None, base_dir=BASE_DIR):
+    """Findings of one ARB file: {'file', 'findings', 'keys', 'seconds'}. Runs in a worker process."""
+    t0 = time.perf_counter()
+    path = os.path.join(base_dir, filename)
+    result = {"file": filename, "findings": [], "keys": 0, "seconds": 0.0}
+    add = lambda key, rule, message: result["findings"].append(finding(filename, key, rule, message))
 
     try:
         with open(path, 'r', encoding='utf-8') as f:
             data = json.load(f)
-        output_file.write("  [OK] JSON Syntax Valid\n")
+    except FileNotFoundError:
+        add(None, "file_missing", f"File not found: {path}")
+        return result
     except json.JSONDecodeError as e:
-        output_file.write(f"  [ERROR] JSON Syntax Invalid: {e}\n")
-        return
+        add(None, "json_invalid", f"JSON Syntax Invalid: {e}")
+        return result
 
     # 1. Check @@locale
-    locale = data.get("@@locale")
-    if locale:
-        output_file.write(f"  [OK] @@locale found: {locale}\n")
-    else:
-        output_file.write("  [ERROR] @@locale MISSING\n")
+    if not data.get("@@locale"):
+        add("@@locale", "locale_missing", "@@locale MISSING")
 
-    # 2. Check Metadata Consistency and ICU
+    # 2. Check Metadata Consistency, ICU syntax and placeholders against the source
     keys = [k for k in data.keys() if not k.startswith("@")]
-    warnings = 0
-    icu_count = 0
-    
+    source = source or {}
+    result["keys"] = len(keys)
     for key in keys:
         value = data[key]
-        meta_key = f"@{key}"
-        
+        info = analyze(value if isinstance(value, str) and "{" in value else "")
+
+        if info["error"]:
+            add(key, "icu_syntax", f"Invalid ICU syntax: {info['error']}. Value: {value[:30]}...")
+
         # Check if metadata exists
-        if meta_key not in data:
-            if isinstance(value, str) and "{" in value:
-                 output_file.write(f"  [WARNING] Key '{key}' has placeholders but no metadata.\n")
-                 warnings += 1
+        meta = data.get(f"@{key}")
+        if meta is None:
+            if info["arguments"]:
+                add(key, "metadata_missing", "Has placeholders but no metadata.")
         else:
-            # Check placeholders in metadata
-            meta = data[meta_key]
-            if isinstance(value, str) and "{" in value:
-                placeholders = re.findall(r'\{(\w+)\}', value)
-                # Filter out 'plural', 'select' etc if matched by regex as placeholder
-                # actually \w+ matches 'count' in {count, plural, ...} which IS the variable.
-                # but 'plural' is not a variable.
-                
-                meta_placeholders = meta.get("placeholders", {})
-                for ph in placeholders:
-                    # Ignore standard ICU keywords if they get picked up? No, {plural} isn't valid syntax usually.
-                    if ph not in meta_placeholders:
-                         if not check_icu_syntax(value):
-                             output_file.write(f"  [WARNING] Key '{key}' uses placeholder '{ph}' but not defined in metadata. Value: {value[:30]}...\n")
-                             warnings += 1
-
-        # ICU Check
-        if check_icu_syntax(value):
-            output_file.write(f"  [ICU] Key '{key}' detected as ICU. Value: {value[:50]}...\n")
-            icu_count += 1
-            
-    output_file.write(f"  Validation complete. Warnings: {warnings}, ICU Keys: {icu_count}\n")
+            # Simple placeholders must be declared; plural/select arguments are not required
+            meta_placeholders = meta.get("placeholders", {}) if isinstance(meta, dict) else {}
+            for ph, kind in info["arguments"].items():
+                if kind is None and ph not in meta_placeholders:
+                    add(key, "placeholder_undeclared",
+                        f"Uses placeholder '{ph}' but not defined in metadata. Value: {value[:30]}...")
+
+        # Placeholders against the FR source
+        if key in source and isinstance(value, str) and not info["error"]:
+            problems = compare_messages(source[key], value)
+            if problems:
+                add(key, "placeholder_mismatch", f"Placeholders differ from {SOURCE_FILE}: {'; '.join(problems)}")
+
+        if info["icu"]:
+            add(key, "icu_message", f"Detected as ICU. Value: {value[:50]}...")
+
+    result["seconds"] = time.perf_counter() - t0
+    return result
+
+def validate_all(files=None, base_dir=BASE_DIR, workers=None):
+    """Validates the files in a process pool; results in file order."""
+    files = arb_files(base_dir) if files is None else files
+    source = load_source(base_dir)
+    if not files:
+        return []
+    with ProcessPoolExecutor(max_workers=workers or len(files)) as pool:
+        futures = [pool.submit(validate_file, f, source, base_dir) for f in files]
+        return [fut.result() for fut in futures]
+
+def count(result, severity):
+    return sum(1 for f in result["findings"] if f["severity"] == severity)
+
+def write_json(results, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({"files": results, "findings": [x for r in results for x in r["findings"]]},
+                  f, indent=2, ensure_ascii=False)
+
+def write_junit(results, path, strict=False):
+    """One testsuite per file, one testcase per rule; errors (and warnings with strict) fail it."""
+    failing = {"error", "warning"} if strict else {"error"}
+    suites = ET.Element("testsuites", name="validate_arb")
+    for r in results:
+        suite = ET.SubElement(suites, "testsuite", name=r["file"], time=f"{r['seconds']:.3f}")
+        failures = 0
+        for rule, severity in RULES.items():
+            if severity == "info":
+                continue
+            case = ET.SubElement(suite, "testcase", classname=r["file"], name=rule)
+            found = [f for f in r["findings"] if f["rule"] == rule]
+            if not found:
+                continue
+            text = "\n".join(f"{f['key'] or '-'}: {f['message']}" for f in found)
+            if severity in failing:
+                failures += 1
+                ET.SubElement(case, "failure", type=severity,
+                              message=f"{len(found)} {severity}(s)").text = text
+            else:
+                ET.SubElement(case, "system-out").text = text
+        suite.set("tests", str(sum(1 for s in RULES.values() if s != "info")))
+        suite.set("failures", str(failures))
+    ET.ElementTree(suites).write(path, encoding="utf-8", xml_declaration=True)
+
+def write_text(results, path):
+    labels = {"error": "ERROR", "warning": "WARNING", "info": "ICU"}
+    with open(path, "w", encoding="utf-8") as f:
+        for r in results:
+            f.write(f"\nValidating {r['file']}...\n")
+            for x in r["findings"]:
+                key = f"Key '{x['key']}' " if x["key"] and x["key"] != "@@locale" else ""
+                f.write(f"  [{labels[x['severity']]}] {key}{x['message']}\n")
+            f.write(f"  Validation complete. Errors: {count(r, 'error')}, Warnings: {count(r, 'warning')}, "
+                    f"ICU Keys: {count(r, 'info')}\n")
 
 def main():
-    with open("validation_results.txt", "w", encoding="utf-8") as f:
-        for filename in FILES:
-            validate_file(filename, f)
-    print("Validation finished. See validation_results.txt")
+    parser = argparse.ArgumentParser(description="Validate lib/l10n/intl_*.arb (ICU syntax, metadata, placeholders)")
+    parser.add_argument("files", nargs="*", help="ARB file names in lib/l10n (default: every intl_*.arb)")
+    parser.add_argument("--json", default="validation_results.json", help="JSON findings output")
+    parser.add_argument("--junit", default="validation_results.xml", help="JUnit XML output")
+    parser.add_argument("--text", default="validation_results.txt", help="Readable report output")
+    parser.add_argument("--strict", action="store_true", help="Fail on warnings too")
+    parser.add_argument("--workers", type=int, default=None, help="Processes (default: one per file)")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    results = validate_all(args.files or None, workers=args.workers)
+    elapsed = time.perf_counter() - t0
+    write_json(results, args.json)
+    write_junit(results, args.junit, args.strict)
+    write_text(results, args.text)
+
+    errors = sum(count(r, "error") for r in results)
+    warnings = sum(count(r, "warning") for r in results)
+    slowest = max((r["seconds"] for r in results), default=0.0)
+    print(f"Validated {len(results)} file(s) in {elapsed:.2f} s (slowest file {slowest:.2f} s): "
+          f"{errors} error(s), {warnings} warning(s).")
+    print(f"See {args.text}, {args.json}, {args.junit}")
+    if errors or (args.strict and warnings):
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,152 @@
+"""
+Incremental build of the plant data pipeline under assets/data.
+
+Each step declares its inputs (data files and its own scripts) and its outputs, as
+glob patterns relative to the repository root, and runs as a separate process from
+the root, like it would by hand. A step is skipped when the sha256 of every declared
+file (tool/sync_arb.calculate_hash) is the one recorded at the end of the last
+successful build; otherwise it runs, and the steps after it see its changes.
+
+Hashes are recorded once the whole build is done, not after each step: several steps
+rewrite the same files (inject_plant_data and propagate_data edit i18n/plants_fr.json,
+which transform_plants then regenerates), so only the final state is a fixed point.
+A failed step stops the build and nothing is recorded, so it runs again next time.
+
+Usage:
+  python tools/build_data.py             # run the steps whose files changed
+  python tools/build_data.py --dry-run   # only list them
+  python tools/build_data.py --force     # run every step
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / 'tool'))
+from sync_arb import calculate_hash  # noqa: E402
+
+STATE_FILE = REPO_ROOT / '.dart_tool' / 'data_build' / 'state.json'
+STATE_VERSION = 1
+
+CATALOGS = ['assets/data/plants.json', 'assets/data/json_multilangue_doc/plants_*.json']
+
+STEPS = [
+    {
+        'name': 'migrate',
+        'run': ['scripts/migrations.py'],
+        'inputs': CATALOGS + ['assets/data/i18n/plants_*.json',
+                              'scripts/migrations.py', 'scripts/migrate_to_zones.py',
+                              'scripts/plant_catalog.py', 'scripts/json_patch.py', 'tool/backup_store.py'],
+        'outputs': CATALOGS,
+    },
+    {
+        'name': 'inject_plant_data',
+        'run': ['scripts/inject_plant_data.py'],
+        'inputs': CATALOGS + ['scripts/inject_plant_data.py', 'scripts/month_masks.py',
+                              'scripts/plant_catalog.py', 'scripts/json_patch.py'],
+        'outputs': CATALOGS + ['assets/data/i18n/plants_fr.json'],
+    },
+    {
+        'name': 'propagate_data',
+        'run': ['scripts/propagate_data.py'],
+        'inputs': CATALOGS + ['scripts/propagate_data.py', 'scripts/plant_catalog.py', 'scripts/json_patch.py'],
+        'outputs': ['assets/data/json_multilangue_doc/plants_*.json', 'assets/data/i18n/plants_fr.json'],
+    },
+    {
+        'name': 'transform_plants',
+        'run': ['tools/transform_plants.py', '--locales'],
+        'inputs': CATALOGS + ['tools/transform_plants.py', 'tools/json_stream.py', 'tools/plant_store.py'],
+        'outputs': ['assets/data/plants_tokenized.json', 'assets/data/i18n/plants_*.json',
+                    'assets/data/plants.pack'],
+    },
+    {
+        'name': 'zone_calendar',
+        'run': ['scripts/zone_calendar.py'],
+        'inputs': ['assets/data/plants.json', 'assets/data/zones.json',
+                   'scripts/zone_calendar.py', 'scripts/month_masks.py'],
+        'outputs': ['assets/data/zone_calendar.bin'],
+    },
+]
+
+
+def step_files(step, root=REPO_ROOT):
+    """Declared files of a step, relative to root; a pattern matching nothing is kept as is."""
+    files = set()
+    for pattern in step['inputs'] + step['outputs']:
+        matches = [p.relative_to(root).as_posix() for p in root.glob(pattern)]
+        files.update(matches or [pattern])
+    return sorted(files)
+
+def hash_files(files, cache, root=REPO_ROOT):
+    """{file: sha256}; cache holds the hashes computed since the last step that ran."""
+    for f in files:
+        if f not in cache:
+            cache[f] = calculate_hash(str(root / f))
+    return {f: cache[f] for f in files}
+
+def load_state(path=STATE_FILE):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return state.get('steps', {}) if state.get('version') == STATE_VERSION else {}
+
+def save_state(steps, path=STATE_FILE):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'version': STATE_VERSION, 'steps': steps}, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+def run_step(step, root=REPO_ROOT):
+    cmd = [sys.executable] + [str(root / step['run'][0])] + step['run'][1:]
+    return subprocess.run(cmd, cwd=root).returncode == 0
+
+def build(steps=STEPS, root=REPO_ROOT, state_path=STATE_FILE, force=False, dry_run=False):
+    """Runs the out-of-date steps in order. Returns (names of the steps run, success)."""
+    recorded = load_state(state_path)
+    cache = {}
+    ran = []
+    for step in steps:
+        files = step_files(step, root)
+        if not force and recorded.get(step['name']) == hash_files(files, cache, root):
+            continue
+        ran.append(step['name'])
+        if dry_run:
+            continue
+        print(f"==> {step['name']}")
+        if not run_step(step, root):
+            print(f"Step {step['name']} failed, build state not updated.")
+            return ran, False
+        cache.clear()  # the step may have written any file
+
+    if ran and not dry_run:
+        save_state({step['name']: hash_files(step_files(step, root), cache, root) for step in steps}, state_path)
+    return ran, True
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the plant data files whose inputs changed")
+    parser.add_argument('--force', action='store_true', help="Run every step")
+    parser.add_argument('--dry-run', action='store_true', help="Only list the steps that would run")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    ran, ok = build(force=args.force, dry_run=args.dry_run)
+    elapsed = time.perf_counter() - t0
+    if args.dry_run:
+        print(f"Out of date: {', '.join(ran) or 'nothing'}")
+    elif not ran:
+        print(f"Up to date ({elapsed * 1000:.0f} ms)")
+    else:
+        print(f"Ran {', '.join(ran)} in {elapsed:.1f} s")
+    if not ok:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""
+Incremental reading and writing of large {"plants": [...]} JSON documents.
+
+iter_array_items reads the file by chunks and decodes one array item at a time with
+json.JSONDecoder.raw_decode, so only the current item (and one chunk) is in memory.
+The other top-level entries (schema_version, metadata, ...) are decoded and skipped.
+A top-level list is iterated the same way.
+
+dumps_item and document_with_array let a caller write, item by item, exactly what
+json.dump(..., indent=2, ensure_ascii=False) writes for the whole document.
+
+Usage:
+  from json_stream import iter_array_items
+  for plant in iter_array_items('assets/data/plants.json', 'plants'):
+      ...
+"""
+
+import json
+
+CHUNK_SIZE = 1 << 16
+WHITESPACE = ' \t\r\n'
+NUMBER_CHARS = '0123456789.eE+-'
+
+
+def iter_array_items(path, key='plants', chunk_size=CHUNK_SIZE):
+    """Yields the items of the top-level array `key` (or of a top-level list) one by one."""
+    decoder = json.JSONDecoder()
+    with open(path, 'r', encoding='utf-8') as f:
+        buf, pos, eof = '', 0, False
+
+        def refill():
+            nonlocal buf, pos, eof
+            chunk = f.read(chunk_size)
+            buf, pos, eof = buf[pos:] + chunk, 0, not chunk
+
+        def peek():
+            """Next non-whitespace character, reading more input as needed ('' at EOF)."""
+            nonlocal pos
+            while True:
+                while pos < len(buf) and buf[pos] in WHITESPACE:
+                    pos += 1
+                if pos < len(buf) or eof:
+                    return buf[pos:pos + 1]
+                refill()
+
+        def expect(chars):
+            nonlocal pos
+            c = peek()
+            if not c or c not in chars:
+                raise json.JSONDecodeError(f"Expecting one of {chars!r}", buf, pos)
+            pos += 1
+            return c
+
+        def value():
+            nonlocal pos
+            peek()
+            while True:
+                try:
+                    v, end = decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                    refill()  # value cut by the end of the chunk
+                    continue
+                if not eof and not buf[end:].strip(NUMBER_CHARS):
+                    refill()  # a number may go on in the next chunk ('2.' + '5e3')
+                    continue
+                pos = end
+                return v
+
+        def items():
+            nonlocal pos
+            if peek() == ']':
+                pos += 1
+                return
+            while True:
+                yield value()
+                if expect(',]') == ']':
+                    return
+
+        if expect('{[') == '[':
+            yield from items()
+            return
+        if peek() == '}':
+            return
+        while True:
+            name = value()
+            expect(':')
+            if name == key and peek() == '[':
+                pos += 1
+                yield from items()
+            else:
+                value()
+            if expect(',}') == '}':
+                return
+
+def indent_lines(text, prefix):
+    """Indents every line but the first (the first one follows a key or a list comma)."""
+    return text.replace('\n', '\n' + prefix)
+
+def dumps_item(obj, level):
+    """obj as json.dump(indent=2) writes it at nesting level `level`."""
+    return indent_lines(json.dumps(obj, indent=2, ensure_ascii=False), '  ' * level)
+
+def document_with_array(doc, key):
+    """
+    Splits json.dump(doc, indent=2) around its top-level array `key`: returns
+    (prefix, suffix) such that prefix + items + suffix is the whole document when
+    the array has at least one item (json.dump writes an empty one as []).
+    """
+    text = json.dumps({**doc, key: []}, indent=2, ensure_ascii=False)
+    marker = json.dumps(key) + ': []'
+    cut = text.rindex(marker) + len(marker) - 1
+    return text[:cut] + '\n', '\n  ' + text[cut:]
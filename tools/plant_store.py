@@ -0,0 +1,465 @@
+"""
+Compact columnar store for plants.json and its derived / locale variants.
+
+All datasets share one string table (keys and values interned once, zlib-compressed).
+For every plant record:
+  - numeric fields (daysToMaturity, spacing, depth, marketPricePerKg and every
+    nutritionPer100g.* value) go to typed float64 columns holding the rows that have
+    a value, with a presence bitmap and a bitmap of the rows whose value was an int;
+  - id and family go to uint32 columns of string indexes;
+  - the rest is a compact tagged encoding (varints, string indexes) in which the
+    columnar values are placeholders, so key order and int/float types round-trip.
+
+Layout: MAGIC, u32 header length, zlib JSON header (sections offsets), then the sections
+(string table and records are zlib-compressed, columns are stored raw).
+Identical sections are stored once (the locale files share their numeric columns).
+Columns can be read without decoding any record.
+
+The store is meant for column and record access: column() and record() read only
+what they need. Rebuilding a whole document (decode_document) decodes every record in
+Python and is about 2.5x slower than json.load of the JSON file, so whole documents are
+read from the JSON files; decode_document is there for the round-trip check.
+
+Usage:
+  python tools/plant_store.py            # pack the default datasets, then verify the round-trip
+  python tools/plant_store.py --verify   # only check an existing store against the JSON files
+"""
+
+import os
+import sys
+import json
+import zlib
+import time
+import struct
+import argparse
+from array import array
+
+DATA_DIR = r'assets/data'
+OUTPUT_STORE = r'assets/data/plants.pack'
+
+# Datasets packed by default (paths relative to DATA_DIR, also used as dataset names)
+DEFAULT_DATASETS = [
+    'plants.json',
+    'plants_tokenized.json',
+    'i18n/plants_fr.json',
+    'json_multilangue_doc/plants_de.json',
+    'json_multilangue_doc/plants_en.json',
+    'json_multilangue_doc/plants_es.json',
+    'json_multilangue_doc/plants_it.json',
+    'json_multilangue_doc/plants_pt.json',
+]
+
+NUMERIC_FIELDS = ('daysToMaturity', 'spacing', 'depth', 'marketPricePerKg')
+NUMERIC_GROUPS = ('nutritionPer100g',)  # every numeric value of these objects
+STRING_FIELDS = ('id', 'family')
+
+MAGIC = b'PLNTPACK'
+FORMAT_VERSION = 1
+NO_STRING = 0xFFFFFFFF
+MAX_EXACT_INT = 2 ** 53
+
+# Tags of the record encoding
+T_NULL, T_FALSE, T_TRUE, T_INT, T_FLOAT, T_STR, T_LIST, T_DICT, T_COLUMN, T_PLANTS = range(10)
+
+FLOAT = struct.Struct('<d')
+PLANTS_PLACEHOLDER = object()  # where the skeleton of a document holds its plant list
+
+
+def is_number(v):
+    if isinstance(v, bool):
+        return False
+    if isinstance(v, int):
+        return -MAX_EXACT_INT <= v <= MAX_EXACT_INT
+    return isinstance(v, float)
+
+def little_endian(arr):
+    if sys.byteorder == 'big':
+        arr.byteswap()
+    return arr
+
+def typed_array(typecode, buf):
+    """array read from a little-endian buffer (bytes or memoryview slice)."""
+    arr = array(typecode)
+    arr.frombytes(buf)
+    return little_endian(arr)
+
+# ---------------------------------------------------------
+# Writer
+# ---------------------------------------------------------
+
+def put_varint(out, n):
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+def encode_value(v, out, intern):
+    if v is None:
+        out.append(T_NULL)
+    elif v is True:
+        out.append(T_TRUE)
+    elif v is False:
+        out.append(T_FALSE)
+    elif isinstance(v, int):
+        out.append(T_INT)
+        put_varint(out, (v << 1) if v >= 0 else ((-v << 1) - 1))  # zigzag
+    elif isinstance(v, float):
+        out.append(T_FLOAT)
+        out += FLOAT.pack(v)
+    elif isinstance(v, str):
+        out.append(T_STR)
+        put_varint(out, intern(v))
+    elif isinstance(v, list):
+        out.append(T_LIST)
+        put_varint(out, len(v))
+        for item in v:
+            encode_value(item, out, intern)
+    elif isinstance(v, dict):
+        out.append(T_DICT)
+        put_varint(out, len(v))
+        for k, item in v.items():
+            put_varint(out, intern(k))
+            encode_value(item, out, intern)
+    else:
+        raise TypeError(f"Unsupported JSON value: {type(v).__name__}")
+
+def plant_records(doc):
+    """Plant list of a document ({'plants': [...]}), None for other shapes (packed as a whole)."""
+    if isinstance(doc, dict) and isinstance(doc.get('plants'), list):
+        return doc['plants']
+    return None
+
+def pack_dataset(doc, intern):
+    """Encodes one JSON document: skeleton, per-plant records and columns."""
+    records = plant_records(doc)
+    skeleton = bytearray()
+    if records is None:
+        encode_value(doc, skeleton, intern)
+        return {'skeleton': skeleton, 'records': [], 'columns': {}}
+
+    # Skeleton: the document with its plant list replaced by a placeholder
+    skeleton.append(T_DICT)
+    put_varint(skeleton, len(doc))
+    for k, v in doc.items():
+        put_varint(skeleton, intern(k))
+        if k == 'plants':
+            skeleton.append(T_PLANTS)
+        else:
+            encode_value(v, skeleton, intern)
+
+    rows = len(records)
+    columns = {}  # path -> {'index', 'kind', 'values', 'ints'}
+
+    def column_slot(path, kind):
+        col = columns.get(path)
+        if col is None:
+            col = columns[path] = {'index': len(columns), 'kind': kind, 'values': [None] * rows, 'ints': set()}
+        return col
+
+    def put_column(out, path, kind, row, value):
+        col = column_slot(path, kind)
+        col['values'][row] = value
+        if kind == 'd' and isinstance(value, int):
+            col['ints'].add(row)
+        out.append(T_COLUMN)
+        put_varint(out, col['index'])
+
+    encoded = []
+    for row, rec in enumerate(records):
+        out = bytearray()
+        if not isinstance(rec, dict):
+            encode_value(rec, out, intern)
+            encoded.append(out)
+            continue
+        out.append(T_DICT)
+        put_varint(out, len(rec))
+        for k, v in rec.items():
+            put_varint(out, intern(k))
+            if k in NUMERIC_FIELDS and is_number(v):
+                put_column(out, k, 'd', row, v)
+            elif k in STRING_FIELDS and isinstance(v, str):
+                put_column(out, k, 's', row, intern(v))
+            elif k in NUMERIC_GROUPS and isinstance(v, dict):
+                out.append(T_DICT)
+                put_varint(out, len(v))
+                for nk, nv in v.items():
+                    put_varint(out, intern(nk))
+                    if is_number(nv):
+                        put_column(out, f"{k}.{nk}", 'd', row, nv)
+                    else:
+                        encode_value(nv, out, intern)
+            else:
+                encode_value(v, out, intern)
+        encoded.append(out)
+    return {'skeleton': skeleton, 'records': encoded, 'columns': columns}
+
+def bitmap(rows, selected):
+    bits = bytearray((rows + 7) // 8)
+    for row in selected:
+        bits[row >> 3] |= 1 << (row & 7)
+    return bytes(bits)
+
+def bit(bits, row):
+    return bits[row >> 3] >> (row & 7) & 1
+
+def column_bytes(col, rows):
+    """(values, presence bitmap, int bitmap) of a column."""
+    if col['kind'] == 's':
+        values = array('I', (NO_STRING if v is None else v for v in col['values']))
+        return little_endian(values).tobytes(), b'', b''
+    present = [row for row, v in enumerate(col['values']) if v is not None]
+    values = array('d', (float(col['values'][row]) for row in present))
+    return little_endian(values).tobytes(), bitmap(rows, present), bitmap(rows, col['ints'])
+
+def write_store(datasets, store_path=OUTPUT_STORE, data_dir=DATA_DIR):
+    """
+    Packs the given datasets (paths relative to data_dir) into store_path.
+    Returns the header that was written.
+    """
+    strings = {}
+
+    def intern(s):
+        idx = strings.get(s)
+        if idx is None:
+            idx = strings[s] = len(strings)
+        return idx
+
+    packed = []
+    for name in datasets:
+        with open(os.path.join(data_dir, name), 'r', encoding='utf-8') as f:
+            packed.append((name, pack_dataset(json.load(f), intern)))
+
+    body = bytearray()
+    known_sections = {}
+
+    def section(data):
+        data = bytes(data)
+        ref = known_sections.get(data)
+        if ref is None:
+            ref = known_sections[data] = [len(body), len(data)]
+            body.extend(data)
+        return ref
+
+    # String table: NUL-separated UTF-8, zlib-compressed (split back in one C call)
+    if any('\0' in s for s in strings):
+        raise ValueError("Strings containing NUL cannot be packed")
+    header = {
+        'version': FORMAT_VERSION,
+        'strings': {'count': len(strings),
+                    'section': section(zlib.compress('\0'.join(strings).encode('utf-8'), 9))},
+        'datasets': [],
+    }
+
+    for name, ds in packed:
+        rows = len(ds['records'])
+        record_offsets = array('I', [0])
+        for rec in ds['records']:
+            record_offsets.append(record_offsets[-1] + len(rec))
+        entry = {
+            'name': name,
+            'rows': rows,
+            'skeleton': section(ds['skeleton']),
+            'record_offsets': section(little_endian(record_offsets).tobytes()),
+            'records': section(zlib.compress(b''.join(ds['records']), 9)),
+            'columns': [],
+        }
+        for path, col in sorted(ds['columns'].items(), key=lambda item: item[1]['index']):
+            values, present, ints = column_bytes(col, rows)
+            entry['columns'].append([path, col['kind'], section(values), section(present), section(ints)])
+        header['datasets'].append(entry)
+
+    header_bytes = zlib.compress(json.dumps(header, separators=(',', ':')).encode('utf-8'), 9)
+    os.makedirs(os.path.dirname(store_path) or '.', exist_ok=True)
+    tmp_path = store_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<I', len(header_bytes)))
+        f.write(header_bytes)
+        f.write(body)
+    os.replace(tmp_path, store_path)
+    return header
+
+# ---------------------------------------------------------
+# Reader
+# ---------------------------------------------------------
+
+def read_store(store_path=OUTPUT_STORE):
+    """
+    Reads a store: header and string table are decoded, datasets stay as raw
+    sections until column() / record() / decode_document() need them.
+    """
+    with open(store_path, 'rb') as f:
+        raw = f.read()
+    if raw[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{store_path} is not a plant store")
+    (header_len,) = struct.unpack_from('<I', raw, len(MAGIC))
+    start = len(MAGIC) + 4
+    header = json.loads(zlib.decompress(raw[start:start + header_len]))
+    if header['version'] != FORMAT_VERSION:
+        raise ValueError(f"Unsupported plant store version {header['version']}")
+    body = memoryview(raw)[start + header_len:]
+
+    def sect(ref):
+        return body[ref[0]:ref[0] + ref[1]]
+
+    count = header['strings']['count']
+    strings = zlib.decompress(sect(header['strings']['section'])).decode('utf-8').split('\0') if count else []
+    if len(strings) != count:
+        raise ValueError(f"{store_path}: corrupted string table")
+
+    datasets = {}
+    for entry in header['datasets']:
+        datasets[entry['name']] = {
+            'rows': entry['rows'],
+            'skeleton': sect(entry['skeleton']),
+            'record_offsets': typed_array('I', sect(entry['record_offsets'])),
+            'records': sect(entry['records']),
+            'columns': entry['columns'],
+            'column_paths': {c[0]: i for i, c in enumerate(entry['columns'])},
+            'decoded_columns': {},
+            'sect': sect,
+        }
+    return {'strings': strings, 'datasets': datasets}
+
+def dataset_columns(ds, strings):
+    """Decoded columns of a dataset (cached): list per column, None where absent."""
+    decoded = ds['decoded_columns']
+    if len(decoded) < len(ds['columns']):
+        sect = ds['sect']
+        for i, (_, kind, values_ref, present_ref, ints_ref) in enumerate(ds['columns']):
+            if i in decoded:
+                continue
+            if kind == 's':
+                decoded[i] = [None if v == NO_STRING else strings[v] for v in typed_array('I', sect(values_ref))]
+                continue
+            values = iter(typed_array('d', sect(values_ref)))
+            present, ints = sect(present_ref), sect(ints_ref)
+            column_values = [None] * ds['rows']
+            for row in range(ds['rows']):
+                if bit(present, row):
+                    v = next(values)
+                    column_values[row] = int(v) if bit(ints, row) else v
+            decoded[i] = column_values
+    return decoded
+
+def column(store, name, path):
+    """Values of one column (e.g. 'daysToMaturity', 'nutritionPer100g.energyKcal', 'id')."""
+    ds = store['datasets'][name]
+    index = ds['column_paths'][path]
+    return dataset_columns(ds, store['strings'])[index]
+
+def decode(buf, pos, strings, columns=None, row=0):
+    """Decodes the value at pos, returns (value, next pos)."""
+    tag = buf[pos]
+    pos += 1
+    if tag == T_STR or tag == T_INT or tag == T_LIST or tag == T_DICT or tag == T_COLUMN:
+        n = 0
+        shift = 0
+        while True:
+            b = buf[pos]
+            pos += 1
+            n |= (b & 0x7F) << shift
+            if b < 0x80:
+                break
+            shift += 7
+        if tag == T_STR:
+            return strings[n], pos
+        if tag == T_INT:
+            return (n >> 1) if not n & 1 else -((n + 1) >> 1), pos
+        if tag == T_COLUMN:
+            return columns[n][row], pos
+        if tag == T_LIST:
+            items = []
+            for _ in range(n):
+                item, pos = decode(buf, pos, strings, columns, row)
+                items.append(item)
+            return items, pos
+        obj = {}
+        for _ in range(n):
+            k = 0
+            shift = 0
+            while True:
+                b = buf[pos]
+                pos += 1
+                k |= (b & 0x7F) << shift
+                if b < 0x80:
+                    break
+                shift += 7
+            obj[strings[k]], pos = decode(buf, pos, strings, columns, row)
+        return obj, pos
+    if tag == T_NULL:
+        return None, pos
+    if tag == T_TRUE:
+        return True, pos
+    if tag == T_FALSE:
+        return False, pos
+    if tag == T_FLOAT:
+        return FLOAT.unpack_from(buf, pos)[0], pos + 8
+    if tag == T_PLANTS:
+        return PLANTS_PLACEHOLDER, pos
+    raise ValueError(f"Unknown tag {tag} at {pos - 1}")
+
+def record(store, name, row):
+    """One plant of a dataset, decoded on its own."""
+    ds = store['datasets'][name]
+    columns = dataset_columns(ds, store['strings'])
+    if isinstance(ds['records'], memoryview):
+        ds['records'] = zlib.decompress(ds['records'])  # once per dataset
+    offsets = ds['record_offsets']
+    return decode(ds['records'], offsets[row], store['strings'], columns, row)[0]
+
+def decode_document(store, name):
+    """Rebuilds the whole JSON document of a dataset from its skeleton and records."""
+    ds = store['datasets'][name]
+    doc, _ = decode(ds['skeleton'], 0, store['strings'])
+    if isinstance(doc, dict) and doc.get('plants') is PLANTS_PLACEHOLDER:
+        doc['plants'] = [record(store, name, row) for row in range(ds['rows'])]
+    return doc
+
+# ---------------------------------------------------------
+# Round-trip check
+# ---------------------------------------------------------
+
+def verify_store(datasets, store_path=OUTPUT_STORE, data_dir=DATA_DIR):
+    """
+    Compares every dataset rebuilt from the store with its JSON file: same values,
+    same key order and same int/float types (compared through json.dumps).
+    Returns the list of mismatching dataset names.
+    """
+    t0 = time.perf_counter()
+    store = read_store(store_path)
+    docs = {name: decode_document(store, name) for name in datasets}
+    decode_ms = (time.perf_counter() - t0) * 1000
+
+    t0 = time.perf_counter()
+    sources = {}
+    for name in datasets:
+        with open(os.path.join(data_dir, name), 'r', encoding='utf-8') as f:
+            sources[name] = json.load(f)
+    json_ms = (time.perf_counter() - t0) * 1000
+
+    failures = [name for name in datasets
+                if json.dumps(docs[name], ensure_ascii=False) != json.dumps(sources[name], ensure_ascii=False)]
+    json_size = sum(os.path.getsize(os.path.join(data_dir, name)) for name in datasets)
+    print(f"Round-trip {len(datasets) - len(failures)}/{len(datasets)} datasets OK")
+    print(f"Size: {json_size / 1024:.0f} KB of JSON -> {os.path.getsize(store_path) / 1024:.0f} KB packed")
+    print(f"Full load: json.load {json_ms:.1f} ms, decode_document {decode_ms:.1f} ms")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack plants.json and its variants into a columnar store")
+    parser.add_argument("--out", "-o", default=OUTPUT_STORE, help="Store path")
+    parser.add_argument("--verify", action="store_true", help="Only verify an existing store")
+    args = parser.parse_args()
+
+    if not args.verify:
+        print(f"Writing {args.out}...")
+        write_store(DEFAULT_DATASETS, args.out)
+    failures = verify_store(DEFAULT_DATASETS, args.out)
+    for name in failures:
+        print(f"MISMATCH: {name}")
+    if failures:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -2,13 +2,26 @@ import json
 import os
 import csv
 import re
+import shutil
+import argparse
+import unicodedata
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from functools import lru_cache
+
+from plant_store import DEFAULT_DATASETS, OUTPUT_STORE, write_store, verify_store
+from json_stream import iter_array_items, dumps_item, document_with_array
 
 # Configuration
 INPUT_FILE = r'assets/data/plants.json'
 OUTPUT_TOKENIZED = r'assets/data/plants_tokenized.json'
 OUTPUT_I18N_FR = r'assets/data/i18n/plants_fr.json'
 REPORT_CSV = r'plants_i18n_report.csv'
+# Full per-locale catalogs, and the slim i18n table extracted from each of them
+LOCALE_SOURCE = r'assets/data/json_multilangue_doc/plants_{lang}.json'
+OUTPUT_I18N = r'assets/data/i18n/plants_{lang}.json'
+LOCALES = ('de', 'en', 'es', 'it', 'pt')
 REPORT_MD = r'plants_json_migration_report.md'
 
 # Mappings (French -> Token)
@@ -39,6 +52,27 @@ SEASON_MAP = {
     "Hiver": "WINTER"
 }
 
+def fold(text):
+    """Lookup key of an enum label: casefold, no accents, straight apostrophes, single spaces."""
+    decomposed = unicodedata.normalize('NFKD', text.replace("’", "'").casefold())
+    return ' '.join(''.join(c for c in decomposed if not unicodedata.combining(c)).split())
+
+def compile_table(mapping):
+    """{folded label: token}; two labels folding to one key must agree on the token."""
+    table = {}
+    for label, token in mapping.items():
+        key = fold(label)
+        if table.setdefault(key, token) != token:
+            raise ValueError(f"'{label}' folds to '{key}', already mapped to {table[key]}")
+    return table
+
+# Lookup tables, compiled once
+SUN_EXPOSURE_TABLE = compile_table(SUN_EXPOSURE_MAP)
+WATER_NEEDS_TABLE = compile_table(WATER_NEEDS_MAP)
+SEASON_TABLE = compile_table(SEASON_MAP)
+FULL_PARTIAL_PARTS = {fold("Plein soleil"), fold("Mi-ombre")}
+WORD_RE = re.compile(r"[^\W\d_]+")
+
 # Regex to find numbers/values in messages for templating
 # Matches numbers like 25, 2.5, ranges 25-50, and simple units
 VALUE_REGEX = re.compile(r'(\d+(?:[.,]\d+)?(?:-\d+(?:[.,]\d+)?)?)\s*([°a-zA-Z%]+)?')
@@ -52,29 +86,208 @@ def templatisze_message(msg):
     # We will mark it as requiring manual review in the report if it looks like a template candidate.
     return msg
 
-def map_seasons(season_str):
+@lru_cache(maxsize=None)
+def sun_token(sun):
+    """Token of a sunExposure label, None if unknown."""
+    key = fold(sun)
+    if key in SUN_EXPOSURE_TABLE:
+        return SUN_EXPOSURE_TABLE[key]
+    # 'Plein soleil, Mi-ombre, ...' listed as parts
+    if ',' in key and FULL_PARTIAL_PARTS <= {part.strip() for part in key.split(',')}:
+        return "SUN_FULL_PARTIAL"
+    return None
+
+def water_key(water):
+    return fold(water.split('(')[0]) # Ignore comments like (surtout en été)
+
+@lru_cache(maxsize=None)
+def water_token(water):
+    """Token of a waterNeeds label, None if unknown."""
+    return WATER_NEEDS_TABLE.get(water_key(water))
+
+@lru_cache(maxsize=None)
+def season_token(part):
+    """Token of one season ('Automne', "Fin d'été", 'Printemps (selon variété)'), None if unknown."""
+    key = fold(part)
+    if key in SEASON_TABLE:
+        return SEASON_TABLE[key]
+    # Season named inside the part: the first one wins ('Automne ou Printemps' -> AUTUMN)
+    for word in WORD_RE.findall(key):
+        if word in SEASON_TABLE:
+            return SEASON_TABLE[word]
+    return None
+
+def unknown_token(unknown, field, key, label):
+    """
+    Counts an unknown label under its lookup key, so variants differing only in case,
+    accents or spacing are reported once; the token keeps the first label seen for
+    that key, as written in the catalog (the app shows it as is).
+    """
+    entry = unknown.setdefault((field, key), {'label': label, 'count': 0})
+    entry['count'] += 1
+    return "UNKNOWN_" + entry['label']
+
+def map_seasons(season_str, unknown, field):
     if not season_str: return []
-    parts = [s.strip() for s in season_str.split(',')]
     mapped = []
-    for p in parts:
-        pk = p.capitalize() # normalize
-        if pk in SEASON_MAP:
-            mapped.append(SEASON_MAP[pk])
-        else:
-             # Try simple fuzzy match
-             found = False
-             for k, v in SEASON_MAP.items():
-                 if k in pk: 
-                     mapped.append(v)
-                     found = True
-                     break
-             if not found:
-                mapped.append("UNKNOWN_" + p)
+    for p in season_str.split(','):
+        p = p.strip()
+        token = season_token(p)
+        if token is None:
+            token = unknown_token(unknown, field, fold(p), p)
+        mapped.append(token)
     return list(set(mapped)) # Dedup
 
-def main():
-    print(f"Reading {INPUT_FILE}...")
-    with open(INPUT_FILE, 'r', encoding='utf-8') as f:
+def unknown_report_lines(unknown):
+    """One line per unknown (field, label), most frequent first within each field."""
+    entries = sorted(((field, e['label'], e['count']) for (field, _), e in unknown.items()),
+                     key=lambda x: (x[0], -x[2], x[1]))
+    return [f"Unknown {field} '{label}' ({count} plant{'s' if count > 1 else ''})"
+            for field, label, count in entries]
+
+def unknown_summary(unknown):
+    per_field = Counter()
+    for (field, _), entry in unknown.items():
+        per_field[field] += entry['count']
+    return ', '.join(f"{field} {count}" for field, count in sorted(per_field.items())) or 'none'
+
+def transform_plant(p, unknown):
+    """
+    Splits one plant into its tokenized record and its French i18n entry.
+    Returns (p_out, i18n_entry, rows) where rows are the CSV report rows of the plant;
+    enum labels without a token are counted in unknown[(field, folded label)], a dict of
+    {'label': first label seen, 'count'} (see unknown_token).
+    """
+    rows = []
+    pid = p['id']
+    p_out = p.copy()
+    i18n_entry = {}
+
+    # 1. Common Name - Remove from tokenized (legacy field handling)
+    i18n_entry['commonName'] = p.get('commonName', '')
+    rows.append([pid, 'commonName', p.get('commonName', ''), 'Extracted'])
+    if 'commonName' in p_out: del p_out['commonName']
+    p_out['commonName_legacy_dev'] = p.get('commonName', '') # For debug purposes only
+
+    # 2. Description
+    if 'description' in p:
+        i18n_entry['description'] = p['description']
+        rows.append([pid, 'description', '...', 'Extracted'])
+        del p_out['description']
+    
+    # 3. Cultural Tips
+    if 'culturalTips' in p:
+        i18n_entry['culturalTips'] = p['culturalTips']
+        del p_out['culturalTips']
+
+    # 4. Biological Control
+    if 'biologicalControl' in p:
+        bc = p['biologicalControl']
+        i18n_entry['biologicalControl'] = {}
+        if 'preparations' in bc:
+            i18n_entry['biologicalControl']['preparations'] = bc['preparations']
+            del bc['preparations']
+        if 'beneficialInsects' in bc:
+            i18n_entry['biologicalControl']['beneficialInsects'] = bc['beneficialInsects']
+            del bc['beneficialInsects']
+        if 'companionPlants' in bc:
+            i18n_entry['biologicalControl']['companionPlants'] = bc['companionPlants']
+            del bc['companionPlants']
+        p_out['biologicalControl'] = bc 
+
+    # 5. Harvest Time
+    if 'harvestTime' in p:
+        i18n_entry['harvestTime'] = p['harvestTime']
+        del p_out['harvestTime']
+
+    # 6. Notifications
+    if 'notificationSettings' in p:
+        ns = p['notificationSettings']
+        i18n_entry['notificationSettings'] = {}
+        for notif_type, settings in ns.items():
+            if isinstance(settings, dict) and 'message' in settings:
+                original_msg = settings['message']
+                # Tokenize message ? For now extract full string.
+                i18n_entry['notificationSettings'][notif_type] = {'message': original_msg}
+                del settings['message']
+            
+            if notif_type == 'temperature_alert':
+                 i18n_entry['notificationSettings']['temperature_alert'] = {}
+                 for sub_key, sub_val in settings.items():
+                     if isinstance(sub_val, dict) and 'message' in sub_val:
+                         i18n_entry['notificationSettings']['temperature_alert'][sub_key] = {'message': sub_val['message']}
+                         del sub_val['message']
+        p_out['notificationSettings'] = ns
+
+    # 7. Enum Tokenization
+    
+    # Sun
+    sun = p.get('sunExposure')
+    if sun:
+        token = sun_token(sun)
+        if token is None:
+            token = unknown_token(unknown, 'sunExposure', fold(sun), sun.replace("’", "'").strip())
+        p_out['sunExposure'] = token
+
+    # Water
+    water = p.get('waterNeeds')
+    if water:
+        token = water_token(water)
+        if token is None:
+            token = unknown_token(unknown, 'waterNeeds', water_key(water), water.split('(')[0].strip())
+        p_out['waterNeeds'] = token
+
+    # Seasons
+    p_season = p.get('plantingSeason')
+    if p_season:
+         p_out['plantingSeason'] = map_seasons(p_season, unknown, 'plantingSeason')
+    
+    h_season = p.get('harvestSeason')
+    if h_season:
+         p_out['harvestSeason'] = map_seasons(h_season, unknown, 'harvestSeason')
+
+    # Watering fields cleanup (often has free text)
+    if 'watering' in p_out:
+        w = p_out['watering']
+        # We should move 'frequency', 'method', 'bestTime' to i18n instructions? 
+        # Yes, these are text. The DoD says "suppression/renommage des champs textuels résiduels".
+        # We'll extract them similarly to notification messages.
+        i18n_entry['watering'] = {}
+        for k in ['frequency', 'amount', 'method', 'bestTime']:
+            if k in w:
+                i18n_entry['watering'][k] = w[k]
+                del w[k]
+        p_out['watering'] = w # Should be empty or mostly empty now
+
+    return p_out, i18n_entry, rows
+
+def tokenized_document(plants, total):
+    return {
+        "schema_version": "2.2.0",
+        "metadata": {
+            "generated_at": datetime.now().isoformat(),
+            "source": "plants.json transformation v2",
+            "total_plants": total
+        },
+        "plants": plants
+    }
+
+def write_md_report(unknown):
+    print(f"Unknown enum values: {unknown_summary(unknown)}")
+    with open(REPORT_MD, 'w', encoding='utf-8') as f:
+        f.write("# Plans JSON Migration Report V2\n\n")
+        f.write(f"Generated at: {datetime.now()}\n\n")
+        f.write("## Warnings / Ambiguities\n")
+        lines = unknown_report_lines(unknown)
+        if lines:
+            for line in lines:
+                f.write(f"- {line}\n")
+        else:
+            f.write("No warnings generated.\n")
+
+def transform_batch(input_file=INPUT_FILE):
+    print(f"Reading {input_file}...")
+    with open(input_file, 'r', encoding='utf-8') as f:
         data = json.load(f)
 
     plants_in = data.get('plants', [])
@@ -82,145 +295,20 @@ def main():
     i18n_fr = {}
     
     report_rows = []
-    audit_log = []
+    unknown = {}
 
     print(f"Processing {len(plants_in)} plants...")
 
     for p in plants_in:
-        pid = p['id']
-        p_out = p.copy()
-        i18n_entry = {}
-
-        # 1. Common Name - Remove from tokenized (legacy field handling)
-        i18n_entry['commonName'] = p.get('commonName', '')
-        report_rows.append([pid, 'commonName', p.get('commonName', ''), 'Extracted'])
-        if 'commonName' in p_out: del p_out['commonName']
-        p_out['commonName_legacy_dev'] = p.get('commonName', '') # For debug purposes only
-
-        # 2. Description
-        if 'description' in p:
-            i18n_entry['description'] = p['description']
-            report_rows.append([pid, 'description', '...', 'Extracted'])
-            del p_out['description']
-        
-        # 3. Cultural Tips
-        if 'culturalTips' in p:
-            i18n_entry['culturalTips'] = p['culturalTips']
-            del p_out['culturalTips']
-
-        # 4. Biological Control
-        if 'biologicalControl' in p:
-            bc = p['biologicalControl']
-            i18n_entry['biologicalControl'] = {}
-            if 'preparations' in bc:
-                i18n_entry['biologicalControl']['preparations'] = bc['preparations']
-                del bc['preparations']
-            if 'beneficialInsects' in bc:
-                i18n_entry['biologicalControl']['beneficialInsects'] = bc['beneficialInsects']
-                del bc['beneficialInsects']
-            if 'companionPlants' in bc:
-                i18n_entry['biologicalControl']['companionPlants'] = bc['companionPlants']
-                del bc['companionPlants']
-            p_out['biologicalControl'] = bc 
-
-        # 5. Harvest Time
-        if 'harvestTime' in p:
-            i18n_entry['harvestTime'] = p['harvestTime']
-            del p_out['harvestTime']
-
-        # 6. Notifications
-        if 'notificationSettings' in p:
-            ns = p['notificationSettings']
-            i18n_entry['notificationSettings'] = {}
-            for notif_type, settings in ns.items():
-                if isinstance(settings, dict) and 'message' in settings:
-                    original_msg = settings['message']
-                    # Tokenize message ? For now extract full string.
-                    i18n_entry['notificationSettings'][notif_type] = {'message': original_msg}
-                    del settings['message']
-                
-                if notif_type == 'temperature_alert':
-                     i18n_entry['notificationSettings']['temperature_alert'] = {}
-                     for sub_key, sub_val in settings.items():
-                         if isinstance(sub_val, dict) and 'message' in sub_val:
-                             i18n_entry['notificationSettings']['temperature_alert'][sub_key] = {'message': sub_val['message']}
-                             del sub_val['message']
-            p_out['notificationSettings'] = ns
-
-        # 7. Enum Tokenization
-        
-        # Sun
-        sun = p.get('sunExposure')
-        if sun:
-            # Normalize
-            sun_norm = sun.replace("’", "'").strip()
-            if sun_norm in SUN_EXPOSURE_MAP:
-                p_out['sunExposure'] = SUN_EXPOSURE_MAP[sun_norm]
-            else:
-                # Try simple comma logic
-                if "," in sun_norm:
-                     parts = [s.strip() for s in sun_norm.split(',')]
-                     if "Plein soleil" in parts and "Mi-ombre" in parts:
-                         p_out['sunExposure'] = "SUN_FULL_PARTIAL"
-                     else:
-                         p_out['sunExposure'] = "UNKNOWN_" + sun_norm
-                         audit_log.append(f"WARNING: Unknown sunExposure '{sun}' for {pid}")
-                else:
-                    p_out['sunExposure'] = "UNKNOWN_" + sun_norm
-                    audit_log.append(f"WARNING: Unknown sunExposure '{sun}' for {pid}")
-
-        # Water
-        water = p.get('waterNeeds')
-        if water:
-            water_norm = water.split('(')[0].strip() # Remove comments like (surtout en été)
-            if water_norm in WATER_NEEDS_MAP:
-                p_out['waterNeeds'] = WATER_NEEDS_MAP[water_norm]
-            else:
-                 found = False
-                 for k,v in WATER_NEEDS_MAP.items():
-                     if k.lower() == water_norm.lower(): 
-                         p_out['waterNeeds'] = v
-                         found = True
-                 if not found:
-                     p_out['waterNeeds'] = "UNKNOWN_" + water
-                     audit_log.append(f"WARNING: Unknown waterNeeds '{water}' for {pid}")
-
-        # Seasons
-        p_season = p.get('plantingSeason')
-        if p_season:
-             p_out['plantingSeason'] = map_seasons(p_season)
-        
-        h_season = p.get('harvestSeason')
-        if h_season:
-             p_out['harvestSeason'] = map_seasons(h_season)
-
-        # Watering fields cleanup (often has free text)
-        if 'watering' in p_out:
-            w = p_out['watering']
-            # We should move 'frequency', 'method', 'bestTime' to i18n instructions? 
-            # Yes, these are text. The DoD says "suppression/renommage des champs textuels résiduels".
-            # We'll extract them similarly to notification messages.
-            i18n_entry['watering'] = {}
-            for k in ['frequency', 'amount', 'method', 'bestTime']:
-                if k in w:
-                    i18n_entry['watering'][k] = w[k]
-                    del w[k]
-            p_out['watering'] = w # Should be empty or mostly empty now
+        p_out, i18n_entry, rows = transform_plant(p, unknown)
+        report_rows.extend(rows)
 
         # Add to local map
-        i18n_fr[pid] = i18n_entry
+        i18n_fr[p['id']] = i18n_entry
         plants_out.append(p_out)
 
     # Output writing...
-    output_tech = {
-        "schema_version": "2.2.0",
-        "metadata": {
-            "generated_at": datetime.now().isoformat(),
-            "source": "plants.json transformation v2",
-            "total_plants": len(plants_out)
-        },
-        "plants": plants_out
-    }
+    output_tech = tokenized_document(plants_out, len(plants_out))
 
     print(f"Writing {OUTPUT_TOKENIZED}...")
     with open(OUTPUT_TOKENIZED, 'w', encoding='utf-8') as f:
@@ -236,15 +324,125 @@ def main():
         writer.writerow(['PlantID', 'Field', 'ValueSnippet', 'Action'])
         writer.writerows(report_rows)
 
-    with open(REPORT_MD, 'w', encoding='utf-8') as f:
-        f.write("# Plans JSON Migration Report V2\n\n")
-        f.write(f"Generated at: {datetime.now()}\n\n")
-        f.write("## Warnings / Ambiguities\n")
-        if audit_log:
-            for line in audit_log:
-                f.write(f"- {line}\n")
+    write_md_report(unknown)
+
+def transform_streaming(input_file=INPUT_FILE):
+    """
+    Same outputs as transform_batch, written while the plants are read one by one from
+    input_file: memory stays flat whatever the catalog size. The tokenized plants go to
+    a temporary file first, since total_plants is written before them.
+    """
+    print(f"Streaming {input_file}...")
+    plants_tmp = OUTPUT_TOKENIZED + '.plants.tmp'
+    count = 0
+    unknown = {}  # one entry per distinct unknown label, not per plant
+
+    with open(plants_tmp, 'w', encoding='utf-8') as f_plants, \
+         open(OUTPUT_I18N_FR, 'w', encoding='utf-8') as f_i18n, \
+         open(REPORT_CSV, 'w', newline='', encoding='utf-8') as f_csv:
+        writer = csv.writer(f_csv)
+        writer.writerow(['PlantID', 'Field', 'ValueSnippet', 'Action'])
+
+        f_i18n.write('{')
+        for p in iter_array_items(input_file, 'plants'):
+            p_out, i18n_entry, rows = transform_plant(p, unknown)
+            f_plants.write((',\n' if count else '') + '    ' + dumps_item(p_out, 2))
+            f_i18n.write((',\n  ' if count else '\n  ') + json.dumps(p['id'], ensure_ascii=False) + ': '
+                         + dumps_item(i18n_entry, 1))
+            writer.writerows(rows)
+            count += 1
+        f_i18n.write('\n}' if count else '}')
+    write_md_report(unknown)
+
+    print(f"Writing {OUTPUT_TOKENIZED} ({count} plants)...")
+    doc = tokenized_document([], count)
+    with open(OUTPUT_TOKENIZED, 'w', encoding='utf-8') as f:
+        if count:
+            prefix, suffix = document_with_array(doc, 'plants')
+            f.write(prefix)
+            with open(plants_tmp, 'r', encoding='utf-8') as f_plants:
+                shutil.copyfileobj(f_plants, f)
+            f.write(suffix)
         else:
-            f.write("No warnings generated.\n")
+            json.dump(doc, f, indent=2, ensure_ascii=False)
+    os.remove(plants_tmp)
+
+def extract_locale(lang, core_ids):
+    """
+    Process pool worker: reads the full catalog of one locale plant by plant and writes
+    only its i18n table (the technical fields come from the shared tokenized core).
+    Plants outside the core are skipped; for a repeated id the last copy wins, as in
+    the app's sync. Returns (lang, entries, skipped ids, repeated ids).
+    """
+    i18n = {}
+    skipped = []
+    repeated = set()
+    for p in iter_array_items(LOCALE_SOURCE.format(lang=lang), 'plants'):
+        pid = p.get('id')
+        if pid not in core_ids:
+            skipped.append(pid)
+            continue
+        if pid in i18n:
+            repeated.add(pid)
+        i18n[pid] = transform_plant(p, {})[1]  # enum labels are resolved by the core
+
+    with open(OUTPUT_I18N.format(lang=lang), 'w', encoding='utf-8') as f:
+        json.dump(i18n, f, indent=2, ensure_ascii=False)
+    return lang, len(i18n), skipped, sorted(repeated)
+
+def transform_locales(input_file, locales, stream=False, workers=None):
+    """
+    Tokenized core and French table from input_file (in this process), and the i18n
+    table of every other locale in parallel in a process pool.
+    """
+    core_ids = frozenset(p['id'] for p in iter_array_items(input_file, 'plants'))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(extract_locale, lang, core_ids) for lang in locales]
+        if stream:
+            transform_streaming(input_file)
+        else:
+            transform_batch(input_file)
+        for future in futures:
+            lang, count, skipped, repeated = future.result()
+            print(f"Wrote {OUTPUT_I18N.format(lang=lang)} ({count} plants)")
+            if skipped:
+                print(f"WARNING: {lang}: {len(skipped)} plants not in {input_file}: {', '.join(map(str, skipped))}")
+            if repeated:
+                print(f"WARNING: {lang}: {len(repeated)} ids listed more than once (last copy kept): "
+                      f"{', '.join(repeated)}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Split plants.json into tokenized plants and French i18n")
+    parser.add_argument('--input', '-i', default=INPUT_FILE, help="Source catalog")
+    parser.add_argument('--stream', action='store_true',
+                        help="Read and write plant by plant (flat memory, for large catalogs)")
+    parser.add_argument('--locales', nargs='?', const=','.join(LOCALES), default=None,
+                        help=f"Also extract i18n/plants_<lang>.json for these locales, in parallel "
+                             f"(default list: {','.join(LOCALES)})")
+    parser.add_argument('--workers', type=int, default=None, help="Process pool size for --locales")
+    parser.add_argument('--verify-store', action='store_true',
+                        help=f"Check that {OUTPUT_STORE} round-trips every dataset after writing it")
+    args = parser.parse_args()
+
+    if args.locales:
+        # French is the source of the core, its table is always written
+        locales = [lang.strip() for lang in args.locales.split(',') if lang.strip() not in ('', 'fr')]
+        transform_locales(args.input, locales, stream=args.stream, workers=args.workers)
+    elif args.stream:
+        transform_streaming(args.input)
+    else:
+        transform_batch(args.input)
+
+    if args.stream:
+        # The columnar store packs whole documents: build it separately if needed
+        print(f"Skipping {OUTPUT_STORE} in streaming mode (run tools/plant_store.py).")
+    else:
+        # Compact columnar store of plants.json, the outputs above and the locale files
+        print(f"Writing {OUTPUT_STORE}...")
+        write_store(DEFAULT_DATASETS, OUTPUT_STORE)
+        if args.verify_store:
+            for name in verify_store(DEFAULT_DATASETS, OUTPUT_STORE):
+                print(f"WARNING: {OUTPUT_STORE} does not round-trip {name}")
 
     print("Done (v2).")
 